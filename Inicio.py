@@ -1,9 +1,9 @@
 #Librerías necesarias
+from utils.profiling import PageProfiler
+perfil_arranque = PageProfiler("Inicio")
 import streamlit as st
-import pandas as pd
-import geopandas as gpd
-import pydeck as pdk
-import json
+
+perfil_arranque.mark("imports")
 
 #Título y descripción de la página
 st.set_page_config(page_title="Dashboard Vivienda", layout="wide")
@@ -21,16 +21,11 @@ La web dispone de varios apartados a los que se puede acceder a través del men
 - **Datos**: descripción de los datasets y variables utilizadas  
 - **Análisis histórico**: patrones temporales y espaciales del mercado  
 - **Modelización**: comparación y evaluación de los modelos predictivos  
-- **Predicción de precio**: simulación interactiva del precio de una vivienda  """)
+- **Predicción de precio**: simulación interactiva del precio de una vivienda  
+- **Mapa de precios**: precio estimado por m² en todo el municipio para perfiles de vivienda típicos  """)
 
 st.divider()
 
 st.title("Memoria del TFG")
 
-
-
-
-
-
-
-
+perfil_arranque.finish()
@@ -0,0 +1,54 @@
+# Benchmark de rendimiento: predicción por lotes frente a la predicción fila a fila
+# Uso: python -m benchmarks.bench_batch [--sizes 1000 100000 1000000]
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.prediction import FEATURES, predict_batch
+
+# Filas usadas para medir el bucle fila a fila (se extrapola a rows/sec)
+LOOP_ROWS = 300
+
+
+def make_batch(df, n, seed=42):
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(df), size=n)
+    return df.iloc[idx].reset_index(drop=True)
+
+
+def bench_batch(model, df):
+    t0 = time.perf_counter()
+    predict_batch(model, df)
+    return len(df) / (time.perf_counter() - t0)
+
+
+# Misma ruta que la página: un DataFrame de una fila y model.predict por vivienda
+def bench_loop(model, df):
+    rows = df[FEATURES].head(LOOP_ROWS).to_dict("records")
+    t0 = time.perf_counter()
+    for row in rows:
+        model.predict(pd.DataFrame({k: [v] for k, v in row.items()}))
+    return len(rows) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--model", default="modelo_xgb_final.pkl")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    df = pd.read_csv("data/modelos_final.csv")
+
+    loop_rps = bench_loop(model, df)
+    print(f"{'filas':>10} | {'lotes (filas/s)':>16} | {'bucle (filas/s)':>16} | {'speedup':>8}")
+    for n in args.sizes:
+        batch_rps = bench_batch(model, make_batch(df, n))
+        print(f"{n:>10,} | {batch_rps:>16,.0f} | {loop_rps:>16,.0f} | {batch_rps / loop_rps:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Benchmark del índice de comparables con un dataset ampliado (copias del
+# original con la localización desplazada unos metros): construcción, latencia
+# de consulta y actualización incremental al añadir viviendas.
+# Uso: python -m benchmarks.bench_comparables [--scale 100] [--queries 2000]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.comparables import ComparablesIndex, listing_vectors
+from utils.data_store import load_dataset
+
+
+def scale_dataset(df, factor, seed=42):
+    rng = np.random.default_rng(seed)
+    big = pd.concat([df] * factor, ignore_index=True)
+    big["Latitude"] = big["Latitude"] + rng.normal(0, 0.002, len(big))
+    big["Longitude"] = big["Longitude"] + rng.normal(0, 0.002, len(big))
+    return big
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--append", type=float, default=0.01, help="Fracción de viviendas añadidas")
+    args = parser.parse_args()
+
+    base = load_dataset("modelos")
+    df = scale_dataset(base, args.scale)
+    n_append = int(len(df) * args.append)
+    head = df.iloc[:len(df) - n_append].reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    index = ComparablesIndex.build(head)
+    print(f"Construcción con {len(head):,} viviendas: {time.perf_counter() - t0:.2f} s")
+
+    t0 = time.perf_counter()
+    index, estado = index.update(df)
+    print(f"Actualización con {n_append:,} viviendas añadidas ({estado}): {time.perf_counter() - t0:.2f} s")
+
+    vectors, _ = listing_vectors(df.sample(args.queries, random_state=1))
+    for label, idx in [("árbol + delta", index), ("árbol completo", ComparablesIndex.build(df))]:
+        times = []
+        for v in vectors:
+            t0 = time.perf_counter()
+            idx.query(v)
+            times.append((time.perf_counter() - t0) * 1000)
+        p50, p99 = np.percentile(times, [50, 99])
+        print(f"Consulta k=5 ({label}): p50 {p50:.3f} ms | p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
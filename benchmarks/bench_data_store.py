@@ -0,0 +1,31 @@
+# Benchmark de carga: CSV con pd.read_csv frente al almacén Feather tipado.
+# Uso: python -m benchmarks.bench_data_store
+import time
+
+import pandas as pd
+
+from utils.data_store import SCHEMAS, _read_store, csv_path
+
+REPETICIONES = 5
+
+
+def timeit(fn):
+    t0 = time.perf_counter()
+    for _ in range(REPETICIONES):
+        df = fn()
+    return (time.perf_counter() - t0) / REPETICIONES * 1000, df
+
+
+def main():
+    print(f"{'dataset':>20} | {'ms CSV':>7} | {'ms Feather':>10} | {'KB CSV':>8} | {'KB Feather':>10}")
+    for name in SCHEMAS:
+        t_csv, df_csv = timeit(lambda: pd.read_csv(csv_path(name)))
+        t_store, df_store = timeit(lambda: _read_store(name))
+        print(
+            f"{name:>20} | {t_csv:>7.1f} | {t_store:>10.1f} | "
+            f"{df_csv.memory_usage(deep=True).sum() / 1024:>8,.0f} | "
+            f"{df_store.memory_usage(deep=True).sum() / 1024:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
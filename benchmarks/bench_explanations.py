@@ -0,0 +1,53 @@
+# Benchmark de las explicaciones: coste por vivienda de las contribuciones (una a
+# una, en lote y con la caché) frente a la predicción puntual, con el mismo
+# modelo que usa la página de predicción (el compacto si está al día).
+# Uso: python -m benchmarks.bench_explanations [--n 200] [--batch 256]
+import argparse
+import time
+
+import numpy as np
+
+from utils.explanations import ExplanationCache, contributions
+from utils.features import FEATURES
+from utils.model_registry import get_entry, resolve_model_path
+from utils.training import load_training_data
+
+
+def per_row_ms(fn, n):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200, help="Viviendas medidas una a una")
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    model_path = resolve_model_path()
+    booster = get_entry(model_path).booster
+    X, _ = load_training_data()
+    rows = X[:args.n]
+    viviendas = [dict(zip(FEATURES, r.tolist())) for r in rows]
+
+    point = per_row_ms(lambda: [booster.inplace_predict(r[None, :]) for r in rows], args.n)
+    single = per_row_ms(lambda: [contributions(booster, r[None, :]) for r in rows], args.n)
+    batch = per_row_ms(lambda: contributions(booster, X[:args.batch]), args.batch)
+
+    cache = ExplanationCache(model_path)
+    miss = per_row_ms(lambda: [cache.explain_many([v]) for v in viviendas], args.n)
+    hit = per_row_ms(lambda: [cache.explain_many([v]) for v in viviendas], args.n)
+    table = per_row_ms(lambda: [cache.explain(v) for v in viviendas], args.n)
+
+    print(f"Modelo: {model_path}")
+    print(f"Predicción puntual:                {point:8.3f} ms/vivienda")
+    print(f"Explicación una a una:             {single:8.3f} ms/vivienda (+{single - point:.3f} ms)")
+    print(f"Explicación en lote de {args.batch:<5}      {batch:8.3f} ms/vivienda")
+    print(f"Caché (primera vez / repetida):    {miss:8.3f} / {hit:.3f} ms/vivienda")
+    print(f"Caché + tabla para la página:      {table:8.3f} ms/vivienda")
+    print(f"Tasa de acierto de la caché: {cache.stats()['Tasa de acierto (%)']} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Benchmark de la construcción de variables: matriz por columnas (utils.features)
+# frente a la ruta anterior con pandas (log en un DataFrame copiado y to_numpy) y
+# frente al cálculo vivienda a vivienda. Mide filas/s y memoria pico.
+# Uso: python -m benchmarks.bench_features [--sizes 100000 1000000 5000000]
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import load_dataset
+from utils.features import FEATURES, feature_matrix, vivienda_features
+
+# Filas usadas para medir el bucle vivienda a vivienda (se extrapola a filas/s)
+LOOP_ROWS = 2000
+
+
+def make_input(df, n, seed=42):
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(df), size=n)
+    cols = ["Surface"] + [c for c in FEATURES if c != "log_surface"]
+    return df[cols].iloc[idx].reset_index(drop=True)
+
+
+def pandas_path(df):
+    df = df.copy()
+    df["log_surface"] = np.log(pd.to_numeric(df["Surface"]).astype(np.float64))
+    for c in FEATURES:
+        df[c] = pd.to_numeric(df[c])
+    return np.ascontiguousarray(df[FEATURES].to_numpy(dtype=np.float32))
+
+
+def columnar_path(df):
+    return feature_matrix(df)[0]
+
+
+def measure(fn, df):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    X = fn(df)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return X, len(df) / elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    df = load_dataset("modelos")
+    df = df[df["Surface"] > 0]
+
+    rows = make_input(df, LOOP_ROWS).to_dict("records")
+    t0 = time.perf_counter()
+    for row in rows:
+        vivienda_features(row)
+    loop_rps = len(rows) / (time.perf_counter() - t0)
+    print(f"Vivienda a vivienda: {loop_rps:,.0f} filas/s")
+
+    print(f"{'filas':>10} | {'pandas filas/s':>15} | {'pico MB':>8} | {'columnas filas/s':>17} | {'pico MB':>8} | {'matriz MB':>9}")
+    for n in args.sizes:
+        batch = make_input(df, n)
+        X_old, rps_old, peak_old = measure(pandas_path, batch)
+        X_new, rps_new, peak_new = measure(columnar_path, batch)
+        assert np.array_equal(X_old, X_new)
+        print(f"{n:>10,} | {rps_old:>15,.0f} | {peak_old:>8.1f} | {rps_new:>17,.0f} | {peak_new:>8.1f} | {X_new.nbytes / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Benchmark de las previsiones: ajuste completo de todas las series frente a la
+# actualización incremental al llegar un periodo nuevo, y error de la previsión
+# a un paso y a un año sobre los últimos periodos (cobertura del intervalo).
+# Uso: python -m benchmarks.bench_forecasting [--holdout 4] [--repeat 5]
+import argparse
+import time
+
+import numpy as np
+
+from utils.data_store import load_dataset
+from utils.forecasting import LEVEL, SERIES, forecast_table, update_level
+
+
+def median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--holdout", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sufijo = round(LEVEL * 100)
+
+    for nivel, cfg in SERIES.items():
+        df = load_dataset(cfg["dataset"])
+        periodos = np.sort(df[cfg["tiempo"]].unique())
+        anterior = df[df[cfg["tiempo"]] < periodos[-1]]
+        estado_anterior, _ = update_level(nivel, df=anterior, force=True, n_jobs=1)
+
+        completo = median_time(lambda: update_level(nivel, df=df, force=True, n_jobs=1), args.repeat)
+        incremental = median_time(lambda: update_level(nivel, estado_anterior, df=df, n_jobs=1), args.repeat)
+        n_series = len(estado_anterior["series"])
+        print(f"{nivel} ({n_series} series): ajuste completo {completo * 1000:.1f} ms, "
+              f"periodo nuevo incremental {incremental * 1000:.1f} ms")
+
+        # Previsión desde holdout periodos antes del final frente a lo observado
+        corte = periodos[-args.holdout - 1] if len(periodos) > args.holdout else periodos[0]
+        datos, _ = update_level(nivel, df=df[df[cfg["tiempo"]] <= corte], force=True, n_jobs=1)
+        tabla = forecast_table(datos)
+        real = df.groupby([cfg["serie"], cfg["tiempo"]], observed=True)[cfg["valor"]].mean()
+        tabla["Real"] = [real.get((s, t), np.nan) for s, t in zip(tabla[cfg["serie"]], tabla[cfg["tiempo"]])]
+        tabla = tabla.dropna(subset=["Real"])
+        for h, g in tabla.groupby("Horizonte"):
+            mape = float(np.mean(np.abs(g["Prevision"] / g["Real"] - 1)) * 100)
+            cobertura = float(((g["Real"] >= g[f"Min_{sufijo}"]) & (g["Real"] <= g[f"Max_{sufijo}"])).mean())
+            print(f"  horizonte {h}: error medio {mape:.1f} %, cobertura {cobertura:.2f} ({len(g)} series)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Benchmark de los intervalos de predicción: cobertura real y ancho medio en una
+# partición de prueba que no se usa para calibrar (tabla por tramos frente a un
+# único cuantil global) y coste añadido al puntuar lotes grandes.
+# Uso: python -m benchmarks.bench_intervals [--test-size 0.2] [--rows 1000000]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.intervals import LEVELS, build_table, log_interval, oof_predictions
+from utils.model_registry import get_entry
+from utils.prediction import predict_batch
+from utils.training import RANDOM_STATE, load_training_data, make_model
+
+
+def coverage(y, lo, hi):
+    return float(((y >= lo) & (y <= hi)).mean()), float(np.mean(np.exp(hi) - np.exp(lo)))
+
+
+def load_training_data_frame(n, seed=42):
+    df = pd.read_csv("data/modelos_final.csv")
+    rng = np.random.default_rng(seed)
+    return df.iloc[rng.integers(0, len(df), size=n)].reset_index(drop=True)
+
+
+def median_time(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    from sklearn.model_selection import train_test_split
+
+    X, y = load_training_data()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=RANDOM_STATE)
+
+    # Calibración solo con la parte de entrenamiento, igual que scripts.calibrate_intervals
+    table = build_table(oof_predictions(X_train, y_train), y_train)
+    table["_cortes"] = np.asarray(table["cortes"])
+    table["_cuantiles"] = {k: np.asarray(v) for k, v in table["cuantiles"].items()}
+    model = make_model("xgb").fit(X_train, y_train)
+    pred = model.predict(X_test)
+
+    print(f"{'nivel':>6} | {'cobertura tramos':>16} | {'ancho medio €':>14} | {'cobertura global':>16} | {'ancho medio €':>14}")
+    for level in LEVELS:
+        cov_bins, width_bins = coverage(y_test, *log_interval(pred, table, level))
+        q = table["global"][f"{level:.2f}"]
+        cov_global, width_global = coverage(y_test, pred - q, pred + q)
+        print(f"{level:>6.0%} | {cov_bins:>16.3f} | {width_bins:>14,.0f} | {cov_global:>16.3f} | {width_global:>14,.0f}")
+
+    # Coste de añadir intervalos a la predicción por lotes (mediana de 3 repeticiones)
+    booster = get_entry("modelo_xgb_final.pkl").booster
+    df = load_training_data_frame(args.rows)
+    t_point = median_time(lambda: predict_batch(booster, df))
+    t_interval = median_time(lambda: predict_batch(booster, df, intervals=table))
+    log_price = predict_batch(booster, df)["log_price_pred"].to_numpy()
+    t_only = median_time(lambda: log_interval(log_price, table))
+    print(f"Lote de {len(df):,} filas: {t_point:.2f} s sin intervalos, {t_interval:.2f} s con intervalos; "
+          f"el cálculo del intervalo solo: {t_only * 1000:.1f} ms ({t_only / len(df) * 1e9:.0f} ns/fila)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Benchmark de los niveles de detalle del mapa: vértices, bytes enviados al
+# navegador y tiempo de construcción y serialización de la figura animada.
+# Uso: python -m benchmarks.bench_niveles
+import time
+
+import plotly.express as px
+
+from utils.geo import NIVELES, count_vertices, geometrias_path, load_geometrias, load_valores
+
+REPETICIONES = 3
+
+
+def build_figure(valores, geojson):
+    return px.choropleth_mapbox(
+        valores,
+        geojson=geojson,
+        locations="muni_key",
+        featureidkey="properties.muni_key",
+        color="Valor_Tasado",
+        animation_frame="Año",
+        mapbox_style="carto-positron",
+        zoom=8.5,
+        center={"lat": 40.3468, "lon": -3.7038})
+
+
+def main():
+    valores = load_valores()
+    print(f"{'nivel':>6} | {'vértices':>9} | {'KB figura':>10} | {'ms figura':>10} | {'ms json':>8}")
+    for nivel in NIVELES:
+        geojson = load_geometrias(geometrias_path(nivel))
+        t_fig = t_json = 0.0
+        for _ in range(REPETICIONES):
+            t0 = time.perf_counter()
+            fig = build_figure(valores, geojson)
+            t1 = time.perf_counter()
+            payload = fig.to_json()
+            t2 = time.perf_counter()
+            t_fig += t1 - t0
+            t_json += t2 - t1
+        print(
+            f"{nivel:>6} | {count_vertices(geojson):>9,} | {len(payload) / 1024:>10,.0f} | "
+            f"{t_fig / REPETICIONES * 1000:>10.0f} | {t_json / REPETICIONES * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Benchmark del servicio de predicción: arranca el servidor en este proceso,
+# lanza peticiones individuales concurrentes desde varios clientes y un lote en
+# streaming, y muestra latencias y el tamaño medio de los lotes agrupados.
+# Uso: python -m benchmarks.bench_scoring_service [--clients 1 8 32] [--requests 2000]
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.prediction import FEATURES
+from utils.scoring_service import ScoringClient, start_in_thread
+
+
+def make_viviendas(n, seed=42):
+    df = pd.read_csv("data/modelos.csv")
+    df = df[df["Surface"] > 0]
+    rng = np.random.default_rng(seed)
+    sample = df.iloc[rng.integers(0, len(df), size=n)]
+    cols = ["Surface"] + [c for c in FEATURES if c != "log_surface"]
+    return sample[cols].to_dict("records")
+
+
+def run_clients(port, viviendas, n_clients):
+    def worker(chunk):
+        client = ScoringClient(port=port)
+        times = []
+        for v in chunk:
+            t0 = time.perf_counter()
+            status, _ = client.predict(v)
+            times.append((time.perf_counter() - t0) * 1000)
+            assert status == 200
+        client.close()
+        return times
+
+    chunks = [viviendas[i::n_clients] for i in range(n_clients)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(n_clients) as pool:
+        times = [t for ts in pool.map(worker, chunks) for t in ts]
+    return len(viviendas) / (time.perf_counter() - t0), np.percentile(times, [50, 95, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    args = parser.parse_args()
+
+    service, port, stop = start_in_thread()
+    viviendas = make_viviendas(max(args.requests, args.batch))
+    try:
+        print(f"{'clientes':>8} | {'pet/s':>8} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'filas/llamada':>13}")
+        for n_clients in args.clients:
+            calls0, rows0 = service.metrics.booster_calls, service.metrics.rows_scored
+            rps, (p50, p95, p99) = run_clients(port, viviendas[:args.requests], n_clients)
+            rows_per_call = (service.metrics.rows_scored - rows0) / max(1, service.metrics.booster_calls - calls0)
+            print(f"{n_clients:>8} | {rps:>8,.0f} | {p50:>7.2f} | {p95:>7.2f} | {p99:>7.2f} | {rows_per_call:>13.1f}")
+
+        client = ScoringClient(port=port, timeout=300)
+        t0 = time.perf_counter()
+        status, rows = client.predict_batch(viviendas[:args.batch])
+        elapsed = time.perf_counter() - t0
+        assert status == 200, rows
+        print(f"Lote de {len(rows):,} viviendas en streaming: {elapsed:.2f} s ({len(rows) / elapsed:,.0f} filas/s)")
+        client.close()
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Benchmark de la validación espacial: rectángulo frente a contención exacta en el
+# polígono del municipio y localización del municipio de cada punto.
+# Uso: python -m benchmarks.bench_spatial [--sizes 10000 1000000]
+import argparse
+import time
+
+import numpy as np
+
+from utils.prediction import LAT_MAX, LAT_MIN, LON_MAX, LON_MIN, is_in_madrid
+from utils.spatial import get_validator
+
+
+def timeit(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    t_init, validator = timeit(get_validator)
+    print(f"Construcción del índice: {t_init * 1000:.0f} ms")
+    print(f"{'puntos':>10} | {'rectángulo (pts/s)':>19} | {'polígono (pts/s)':>17} | {'municipio (pts/s)':>18} | {'rechazados':>10}")
+
+    rng = np.random.default_rng(42)
+    for n in args.sizes:
+        # Puntos en un área algo mayor que el rectángulo del municipio
+        lat = rng.uniform(LAT_MIN - 0.05, LAT_MAX + 0.05, n)
+        lon = rng.uniform(LON_MIN - 0.05, LON_MAX + 0.05, n)
+        t_box, box = timeit(lambda: is_in_madrid(lat, lon))
+        t_poly, poly = timeit(lambda: validator.in_madrid(lat, lon))
+        t_loc, _ = timeit(lambda: validator.municipio(lat, lon))
+        print(
+            f"{n:>10,} | {n / t_box:>19,.0f} | {n / t_poly:>17,.0f} | {n / t_loc:>18,.0f} | "
+            f"{int((box & ~poly).sum()):>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Benchmark del modelo compacto (NumPy) frente al pipeline de joblib/xgboost:
+# arranque en frío (proceso nuevo: imports + carga + primera predicción) y
+# latencia por fila, tanto fila a fila como por lotes.
+# Uso: python -m benchmarks.bench_tree_model
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from utils.data_store import load_dataset
+from utils.model_registry import MODEL_PATH, compact_path, get_entry
+from utils.prediction import to_matrix
+
+COLD_START = {
+    "pipeline (.pkl)": (
+        "import joblib, numpy as np; import sklearn, xgboost; "
+        f"m = joblib.load('{MODEL_PATH}'); "
+        "b = m.named_steps['model'].get_booster(); b.inplace_predict(np.zeros((1, 13), np.float32))"),
+    "compacto (.npz)": (
+        "import numpy as np; from utils.tree_model import TreeEnsemble; "
+        f"t = TreeEnsemble.load('{compact_path(MODEL_PATH)}'); t.inplace_predict(np.zeros((1, 13), np.float32))"),
+}
+REPETICIONES = 3
+SINGLE_ROWS = 500
+
+
+def cold_start(code):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def main():
+    X = to_matrix(load_dataset("modelos_final"))
+    X = np.ascontiguousarray(np.resize(X, (100_000, X.shape[1])))
+    modelos = {
+        "pipeline (.pkl)": get_entry(MODEL_PATH).booster,
+        "compacto (.npz)": get_entry(compact_path(MODEL_PATH)).booster,
+    }
+
+    print(f"{'modelo':>16} | {'arranque (s)':>12} | {'µs/fila (1 fila)':>16} | {'µs/fila (lote 100k)':>19}")
+    for nombre, booster in modelos.items():
+        t0 = time.perf_counter()
+        for i in range(SINGLE_ROWS):
+            booster.inplace_predict(X[i:i + 1])
+        single = (time.perf_counter() - t0) / SINGLE_ROWS * 1e6
+        t0 = time.perf_counter()
+        booster.inplace_predict(X)
+        batch = (time.perf_counter() - t0) / len(X) * 1e6
+        print(f"{nombre:>16} | {cold_start(COLD_START[nombre]):>12.2f} | {single:>16.1f} | {batch:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 #Librerías
+from utils.profiling import PageProfiler
+perfil_arranque = PageProfiler("1_Datos")
 import streamlit as st
-import pandas as pd
-import geopandas as gpd
-import os
-import json
+from utils.geo import load_limites_tabla
+from utils.data_store import load_dataset
+from utils.table_view import PAGE_SIZES, filter_spec, query_table
+
+perfil_arranque.mark("imports")
 
 st.set_page_config(layout="wide")
 
@@ -11,37 +14,79 @@ st.set_page_config(layout="wide")
 st.title("📁 Datos")
 st.write("A continuación se muestran todas las bases de datos tratadas que han sido utilizadas para la creación de visualizaciones, desarrollo del análisis y de los modelos.")
 
+#Tabla paginada: los filtros, el orden y las columnas se aplican en el servidor
+#y solo se envía al navegador la página visible. Los rangos completos no filtran
+#(así se conservan las filas sin valor)
+def tabla_paginada(df, key):
+    spec = filter_spec(df)
+    filters = {"categorias": {}}
+
+    with st.expander("Filtros y orden"):
+        c1, c2 = st.columns(2)
+        for col, values in spec["categorias"].items():
+            filters["categorias"][col] = c1.multiselect(col, values, key=f"{key}_{col}")
+        if spec["año"] is not None and spec["año"][0] < spec["año"][1]:
+            rango = c2.slider("Año", spec["año"][0], spec["año"][1], spec["año"], key=f"{key}_año")
+            if rango != spec["año"]:
+                filters["año"] = rango
+        if spec["precio"] is not None:
+            col, lo, hi = spec["precio"]
+            if lo < hi:
+                rango = c2.slider(col, lo, hi, (lo, hi), key=f"{key}_precio")
+                if rango != (lo, hi):
+                    filters["precio"] = (col, *rango)
+        if spec["extras"]:
+            filters["extras"] = c1.multiselect("Con extras", spec["extras"], key=f"{key}_extras")
+
+        c3, c4, c5 = st.columns([2, 1, 3])
+        sort_by = c3.selectbox("Ordenar por", [None] + list(df.columns), key=f"{key}_orden",
+                               format_func=lambda c: "(sin orden)" if c is None else c)
+        ascending = c4.radio("Sentido", ["Asc", "Desc"], key=f"{key}_sentido", horizontal=True) == "Asc"
+        columns = c5.multiselect("Columnas", list(df.columns), default=list(df.columns), key=f"{key}_cols")
+
+    c6, c7 = st.columns([1, 1])
+    page_size = c6.selectbox("Filas por página", PAGE_SIZES, index=1, key=f"{key}_tam")
+    pedida = c7.number_input("Página", min_value=1, value=1, step=1, key=f"{key}_pag")
+
+    page_df, total, n_pages, page = query_table(
+        df, filters, sort_by=sort_by, ascending=ascending, columns=columns,
+        page=pedida, page_size=page_size)
+    if page != pedida:
+        st.info(f"La página {pedida} no existe: se muestra la página {page} de {n_pages}.")
+    st.dataframe(page_df, hide_index=True)
+    if total:
+        start = (page - 1) * page_size + 1
+        st.caption(f"Filas {start}–{start + len(page_df) - 1} de {total} (página {page} de {n_pages})")
+    else:
+        st.caption("Ningún registro cumple los filtros")
+
 #Cargar df de municipios
-df_municipios = pd.read_csv("data/municipios.csv")
+df_municipios = load_dataset("municipios")
 
 #Cargar df de medias
-df_medias = pd.read_csv("data/medias.csv")
+df_medias = load_dataset("medias")
 
 #Cargar df merged
-df_merge = pd.read_csv("data/precios_municipios.csv")
+df_merge = load_dataset("precios_municipios")
 
 #Cargar df de distritos
-df_distritos = pd.read_csv("data/distritos.csv")
+df_distritos = load_dataset("distritos")
 
 #Cargar df límites
-@st.cache_resource
+@st.cache_data
 def load_limites_geo():
-    path = os.path.join(os.path.dirname(__file__), "..", "data", "limites_madrid.geojson")
-    path = os.path.abspath(path)
-    with open(path, "r", encoding="utf-8") as f:
-        geo = json.load(f)
-    return gpd.GeoDataFrame.from_features(geo["features"], crs="EPSG:4326")
+    return load_limites_tabla()
 
-gdf = load_limites_geo()
+df_limites = load_limites_geo()
 
 #Cargar df mercado inmobiliario para modelos
-df_modelos = pd.read_csv("data/modelos.csv")
+df_modelos = load_dataset("modelos")
 
 #df municipios
 st.title("📊 Valor tasado medio (€/m²)")
 st.write("Base de datos con el valor tasado medio por metro cuadrado de cada municipio de la Comunidad de Madrid.\
          Incluye los Municipios de más de 25000 habitantes del año 2005 al 2025 por trimestres, además del valor tasado y el número de tasaciones.")
-st.dataframe(df_municipios)
+tabla_paginada(df_municipios, "municipios")
 st.caption("Fuente: Ministerio de Transportes, Movilidad y Agenda Urbana (MITMA)")
 
 st.divider()
@@ -50,7 +95,7 @@ st.divider()
 st.title("📊 Medias de España y Comunidad de Madrid")
 st.write("Base de datos con las medias del valor tasado medio por metro cuadrado en España y en la Comunidad de Madrid.\
          Incluye los datos desde el año 1995 al 2025 por trimestres.")
-st.dataframe(df_medias)
+tabla_paginada(df_medias, "medias")
 st.caption("Fuente: Ministerio de Transportes, Movilidad y Agenda Urbana (MITMA)")
 
 st.divider()
@@ -58,7 +103,7 @@ st.divider()
 #df_merge
 st.title("📊 Datos combinados")
 st.write("Base de datos combinada que incluye el valor tasado medio por metro cuadrado de cada municipio de la Comunidad de Madrid junto con las medias de España y la Comunidad de Madrid.")
-st.dataframe(df_merge)
+tabla_paginada(df_merge, "merge")
 
 st.divider()
 
@@ -66,15 +111,15 @@ st.divider()
 st.title("📊 Precio medio declarado (€/m²)")
 st.write("Base de datos con el precio medio declarado por metro cuadrado de cada distrito del Municipio de Madrid.\
          Incluye los datos desde el año 2007 al 2024 por años.")
-st.dataframe(df_distritos)
+tabla_paginada(df_distritos, "distritos")
 st.caption("Fuente: Colegio de Registradores de España")
 
 st.divider()
 
 #df límites
 st.title("📊 Límites Municipales")
-st.write("Datos geoespaciales que contienen los límites municipales de toda España (Se muestran solo las primeras 50 entradas). Se incluye también el valor tasado de cada año para los distintos municipios, ya que será usado conjuntamente con los límites para la creación de mapas.")
-st.dataframe(gdf.drop(columns="geometry").head(50))
+st.write("Datos geoespaciales que contienen los límites municipales de toda España (Se muestran por páginas). Se incluye también el valor tasado de cada año para los distintos municipios, ya que será usado conjuntamente con los límites para la creación de mapas.")
+tabla_paginada(df_limites, "limites")
 st.caption("Fuente: Instituto Geográfico Nacional (IGN)")
 
 st.divider()
@@ -82,11 +127,8 @@ st.divider()
 #df modelos
 st.title("📊 Dataset de Portal Inmobiliario para Modelización")
 st.write("Base de datos utilizada para el entrenamiento de los modelos de aprendizaje automático. Incluye variables estructurales y de localización del inmueble.")
-st.dataframe(df_modelos)
+tabla_paginada(df_modelos, "modelos")
 
 st.caption("Fuente: Kaggle")
 
-
-
-
-
+perfil_arranque.finish()
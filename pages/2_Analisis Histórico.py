@@ -1,12 +1,19 @@
 #Librerias
+from utils.profiling import FragmentTimer, PageProfiler
+perfil_arranque = PageProfiler("2_Analisis Histórico")
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import json
-import geopandas as gpd
-import unicodedata
-import os
+from utils.geo import nivel_para_zoom
+from utils.data_store import load_dataset
+from utils.aggregates import get_ranking, get_ranking_years, get_crecimiento
+from utils.map_frames import MODOS, ZOOM, get_map_figure
+from utils.forecasting import LEVEL, forecast_table, get_forecasts
+
+perfil_arranque.mark("imports")
+
+PAGINA = "2_Analisis Histórico"
 
 st.set_page_config(layout="wide")
 
@@ -15,9 +22,9 @@ st.title("📈 Análisis Histórico del Mercado")
 st.write("A continuación se exponen las principales visualizaciones y conclusiones de la evolución del precio del mercado inmobiliario en la Comunidad de Madrid")
 
 #Dfs necesarios
-df_municipios = pd.read_csv("data/municipios.csv")
-df_medias = pd.read_csv("data/medias.csv")
-df_distritos = pd.read_csv("data/distritos.csv")
+df_municipios = load_dataset("municipios")
+df_medias = load_dataset("medias")
+df_distritos = load_dataset("distritos")
 
 st.divider()
 
@@ -26,35 +33,51 @@ st.divider()
 st.subheader("Evolución del precio medio en España y Comunidad de Madrid")
 st.text("El siguiente gráfico muestra la evolución del valor tasado medio por metro cuadrado en España y en la Comunidad de Madrid desde 1995 hasta 2025.")
 
-# Filtrar dataframes
-mad = df_medias[df_medias["Region"] == "Madrid"].sort_values("Fecha")
-esp = df_medias[df_medias["Region"] == "España"].sort_values("Fecha")
-# Crear figura
-fig = go.Figure()
-# Línea Madrid
-fig.add_trace(go.Scatter(
-    x=mad["Fecha"], 
-    y=mad["Valor_Tasado"],
-    mode="lines",
-    name="Media Madrid",
-    line=dict(width=3, color="#1f77b4")))
-# Línea España
-fig.add_trace(go.Scatter(
-    x=esp["Fecha"], 
-    y=esp["Valor_Tasado"],
-    mode="lines",
-    name="Media España",
-    line=dict(width=3, color="#ff7f0e")))
-# Layout
-fig.update_layout(
-    title="Evolución del valor tasado medio: España vs Comunidad de Madrid",
-    xaxis_title="Fecha",
-    yaxis_title="Valor Tasado (€)",
-    hovermode="x unified",
-    template="plotly_white",
-    height=500,)
+#Las figuras se construyen en funciones cacheadas: una interacción solo vuelve a
+#calcular el gráfico del fragmento que la contiene. Los datos se pasan como
+#argumento para que la caché se invalide si se actualizan. Se usa cache_resource
+#porque las figuras solo se leen (así no se copian en cada ejecución); la caché
+#es compartida por todas las sesiones, así que se limita a MAX_FIGURAS por función
+#(cada selección nueva de municipios o distritos añade una figura)
+MAX_FIGURAS = 32
+
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_medias(df_medias):
+    # Filtrar dataframes
+    mad = df_medias[df_medias["Region"] == "Madrid"].sort_values("Fecha")
+    esp = df_medias[df_medias["Region"] == "España"].sort_values("Fecha")
+    # Crear figura
+    fig = go.Figure()
+    # Línea Madrid
+    fig.add_trace(go.Scatter(
+        x=mad["Fecha"], 
+        y=mad["Valor_Tasado"],
+        mode="lines",
+        name="Media Madrid",
+        line=dict(width=3, color="#1f77b4")))
+    # Línea España
+    fig.add_trace(go.Scatter(
+        x=esp["Fecha"], 
+        y=esp["Valor_Tasado"],
+        mode="lines",
+        name="Media España",
+        line=dict(width=3, color="#ff7f0e")))
+    # Layout
+    fig.update_layout(
+        title="Evolución del valor tasado medio: España vs Comunidad de Madrid",
+        xaxis_title="Fecha",
+        yaxis_title="Valor Tasado (€)",
+        hovermode="x unified",
+        template="plotly_white",
+        height=500,)
+    return fig
+
 # Mostrar en Streamlit
-st.plotly_chart(fig, use_container_width=True)
+with FragmentTimer(PAGINA, "medias") as t:
+    fig = fig_medias(df_medias)
+    t.lap("calculo")
+    st.plotly_chart(fig, use_container_width=True)
+    t.lap("serializacion")
 
 st.text("Se observa una evolución similar en ambas series, siendo la media de Madrid consistentemente más alta que la media nacional. \n\
 Ambas series muestran un crecimiento sostenido hasta 2008, seguido de una caída pronunciada hasta 2013. A partir de 2014, ambas series inician una recuperación gradual que se acelera a partir de 2020.")
@@ -67,23 +90,74 @@ st.subheader("Evolución del precio medio en la Comunidad de Madrid por municipi
 st.markdown("""Este gráfico interactivo permite seleccionar los municipios deseados para ver su evolución de los años 2005-2025  
 *Nota: En el estudio solo se incluyen los municipios de más de 25000 habitantes*""")
 
-# Selector de municipios
-municipios = df_municipios["Municipio"].unique()
-seleccion = st.multiselect(
-    "Selecciona uno o varios municipios:",
-    options=municipios,
-    default=["Madrid"])
-# Filtramos solo para este gráfico
-df_lineas = df_municipios[df_municipios["Municipio"].isin(seleccion)]
-# Gráfico de líneas
-fig_lineas = px.line(
-    df_lineas,
-    x="Fecha",
-    y="Valor_Tasado",
-    color="Municipio",
-    markers=True,
-    title="Evolución del valor tasado por municipio",)
-st.plotly_chart(fig_lineas, use_container_width=True)
+#Previsión hasta un año vista de las series seleccionadas (modelo de Holt por
+#serie con parámetros en caché): línea discontinua desde el último dato y banda
+#con el intervalo, del mismo color que la serie
+def añadir_prevision(fig, previsiones, serie, tiempo):
+    nivel = round(LEVEL * 100)
+    trazas = {t.name: t for t in fig.data}
+    for nombre, df_prev in previsiones.groupby(serie, sort=False):
+        traza = trazas.get(nombre)
+        if traza is None:
+            continue
+        color = traza.line.color
+        x = list(df_prev[tiempo])
+        fig.add_scatter(
+            x=x + x[::-1],
+            y=list(df_prev[f"Max_{nivel}"]) + list(df_prev[f"Min_{nivel}"])[::-1],
+            fill="toself",
+            fillcolor=color,
+            opacity=0.2,
+            line=dict(width=0),
+            hoverinfo="skip",
+            showlegend=False)
+        fig.add_scatter(
+            x=[traza.x[-1]] + x,
+            y=[traza.y[-1]] + list(df_prev["Prevision"]),
+            mode="lines+markers",
+            name=f"{nombre} (previsión)",
+            line=dict(color=color, dash="dot"))
+    return fig
+
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_municipios(df_municipios, seleccion, previsiones):
+    # Filtramos solo para este gráfico
+    df_lineas = df_municipios[df_municipios["Municipio"].isin(seleccion)]
+    # Gráfico de líneas
+    fig = px.line(
+        df_lineas,
+        x="Fecha",
+        y="Valor_Tasado",
+        color="Municipio",
+        markers=True,
+        title="Evolución del valor tasado por municipio",)
+    if previsiones is not None:
+        añadir_prevision(fig, previsiones, "Municipio", "Fecha")
+    return fig
+
+@st.fragment
+def fragmento_municipios():
+    # Selector de municipios
+    municipios = df_municipios["Municipio"].unique()
+    seleccion = st.multiselect(
+        "Selecciona uno o varios municipios:",
+        options=municipios,
+        default=["Madrid"],
+        key="historico_municipios")
+    prevision = st.toggle(
+        f"Mostrar previsión a un año (intervalo al {round(LEVEL * 100)} %)",
+        value=True,
+        key="historico_prevision_municipios")
+    with FragmentTimer(PAGINA, "municipios") as t:
+        previsiones = forecast_table(get_forecasts("municipios"), list(seleccion)) if prevision else None
+        fig_lineas = fig_municipios(df_municipios, tuple(seleccion), previsiones)
+        t.lap("calculo")
+        st.plotly_chart(fig_lineas, use_container_width=True)
+        t.lap("serializacion")
+    if prevision:
+        st.caption("Previsión de un modelo de Holt amortiguado ajustado a cada serie sobre el logaritmo del valor tasado.")
+
+fragmento_municipios()
 
 st.divider()
 
@@ -92,81 +166,34 @@ st.divider()
 st.subheader("Mapa histórico del valor tasado e incremento anual en la Comunidad de Madrid")
 st.markdown("""Este mapa interactivo permite seleccionar entre valor tasado (€ / m²) o incremento anual (%) para observar de forma visual la evolución de los municipios. Seleccione el año de su interés o haga click en el botón de *play* para ver la evolución desde el 2005.""")
 
-@st.cache_data
-def load_limites_geo():
-    path = "data/limites_madrid.geojson"
-    with open(path, "r", encoding="utf-8") as f:
-        geojson = json.load(f)
-    gdf = gpd.GeoDataFrame.from_features(geojson["features"])
-    gdf = gdf.set_crs(epsg=4326)
-    return gdf, geojson
-gdf, geojson = load_limites_geo()
-
-#Calcular incremento anual
-gdf_all = gdf.sort_values(["NAMEUNIT", "Año"])
-gdf_all["Incremento_%"] = (
-    gdf_all
-    .groupby("NAMEUNIT")["Valor_Tasado"]
-    .pct_change() * 100)
-
-#Crear selector
-modo = st.radio(
-    "Selecciona el tipo de visualización:",
-    ["Valor tasado (€ / m²)", "Incremento anual (%)"],
-    horizontal=True)
-
-#Lógica del modo
-if modo == "Valor tasado (€ / m²)":
-    color_var = "Valor_Tasado"
-    color_scale = "YlOrRd"
-    range_color = None
-    titulo = "Valor tasado por municipio – Comunidad de Madrid (2005–2025)"
-    label_color = "€/m²"
-
-else:
-    color_var = "Incremento_%"
-    color_scale = "RdYlGn"
-    range_color = (-20, 15)
-    titulo = "Incremento anual del valor tasado por municipio (%) – Comunidad de Madrid"
-    label_color = "Incremento anual (%)"
-
-# Filtrado según modo
-if modo == "Incremento anual (%)":
-    gdf_plot = gdf_all[gdf_all["Año"] > 2005]
-else:
-    gdf_plot = gdf_all.copy()
-
-#Crear mapa
-fig = px.choropleth_mapbox(
-    gdf_plot,
-    geojson=geojson,
-    locations="id",
-    featureidkey="properties.id",
-    color=color_var,
-    animation_frame="Año",
-    mapbox_style="carto-positron",
-    zoom=8.5,
-    height=700,
-    center={"lat": 40.3468, "lon": -3.7038},
-    opacity=0.7,
-    color_continuous_scale=color_scale,
-    range_color=range_color,
-    labels={color_var: label_color},
-    hover_name="NAMEUNIT",
-    hover_data={
-        "NAMEUNIT": False,
-        color_var: ":.2f" if modo == "Incremento anual (%)" else ":.0f",
-        "Valor_Tasado": ":.0f",
-        "id": False
-    }
-)
-
-fig.update_layout(
-    title=titulo,
-    margin=dict(r=0, l=0, t=40, b=0)
-)
-
-st.plotly_chart(fig, use_container_width=True)
+#Mapa animado: las figuras de cada modo y nivel de detalle se generan una vez
+#por versión de los datos (scripts.build_map_frames) y aquí solo se leen. Cada
+#fotograma lleva solo los valores del año; las geometrías van una sola vez
+@st.fragment
+def fragmento_mapa():
+    #Nivel de detalle de las geometrías (automático según el zoom del mapa)
+    nivel_sel = st.select_slider(
+        "Nivel de detalle del mapa:",
+        ["Automático", "bajo", "medio", "alto"],
+        value="Automático",
+        key="historico_nivel")
+    nivel = nivel_para_zoom(ZOOM) if nivel_sel == "Automático" else nivel_sel
+
+    #Crear selector
+    modo = st.radio(
+        "Selecciona el tipo de visualización:",
+        list(MODOS),
+        format_func=lambda m: MODOS[m]["etiqueta"],
+        horizontal=True,
+        key="historico_modo")
+
+    with FragmentTimer(PAGINA, "mapa") as t:
+        fig = get_map_figure(modo, nivel)
+        t.lap("calculo")
+        st.plotly_chart(fig, use_container_width=True)
+        t.lap("serializacion")
+
+fragmento_mapa()
 
 st.divider()
 
@@ -179,28 +206,47 @@ Además de ser la capital de la Comunidad, representa casi al 50% de la poblaci
 
 st.subheader("Evolución del precio medio por distrito en el Municipio de Madrid")
 
-distritos_sel = st.multiselect(
-    "Selecciona uno o varios distritos:",
-    sorted(df_distritos["Distrito"].unique()),
-    default=["Salamanca", "Centro"])
-
-df_ciudad = df_distritos[df_distritos["Distrito"] == "Ciudad de Madrid"][["Año", "€/m²"]]
-df_solo_distritos = df_distritos[df_distritos["Distrito"] != "Ciudad de Madrid"]
-
-fig = px.line(
-    df_solo_distritos[df_solo_distritos["Distrito"].isin(distritos_sel)],
-    x="Año",
-    y="€/m²",
-    color="Distrito",)
-
-fig.add_scatter(
-    x=df_ciudad["Año"],
-    y=df_ciudad["€/m²"],
-    mode="lines",
-    name="Ciudad de Madrid",
-    line=dict(color="green", dash="dash"))
-
-st.plotly_chart(fig, use_container_width=True)
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_distritos(df_distritos, distritos_sel, previsiones):
+    df_ciudad = df_distritos[df_distritos["Distrito"] == "Ciudad de Madrid"][["Año", "€/m²"]]
+    df_solo_distritos = df_distritos[df_distritos["Distrito"] != "Ciudad de Madrid"]
+
+    fig = px.line(
+        df_solo_distritos[df_solo_distritos["Distrito"].isin(distritos_sel)],
+        x="Año",
+        y="€/m²",
+        color="Distrito",)
+
+    fig.add_scatter(
+        x=df_ciudad["Año"],
+        y=df_ciudad["€/m²"],
+        mode="lines",
+        name="Ciudad de Madrid",
+        line=dict(color="green", dash="dash"))
+    if previsiones is not None:
+        añadir_prevision(fig, previsiones, "Distrito", "Año")
+    return fig
+
+@st.fragment
+def fragmento_distritos():
+    distritos_sel = st.multiselect(
+        "Selecciona uno o varios distritos:",
+        sorted(df_distritos["Distrito"].unique()),
+        default=["Salamanca", "Centro"],
+        key="historico_distritos")
+    prevision = st.toggle(
+        f"Mostrar previsión del próximo año (intervalo al {round(LEVEL * 100)} %)",
+        value=True,
+        key="historico_prevision_distritos")
+    with FragmentTimer(PAGINA, "distritos") as t:
+        series = list(distritos_sel) + ["Ciudad de Madrid"]
+        previsiones = forecast_table(get_forecasts("distritos"), series) if prevision else None
+        fig = fig_distritos(df_distritos, tuple(distritos_sel), previsiones)
+        t.lap("calculo")
+        st.plotly_chart(fig, use_container_width=True)
+        t.lap("serializacion")
+
+fragmento_distritos()
 
 st.divider()
 
@@ -208,109 +254,89 @@ st.divider()
 
 st.subheader("Precio medio por distrito en el Municipio de Madrid")
 
-year_sel = st.slider(
-    "Selecciona el año",
-    int(df_distritos["Año"].min()),
-    int(df_distritos["Año"].max()),
-    2024)
-
-df_rank = (
-    df_distritos[
-        (df_distritos["Año"] == year_sel) &
-        (df_distritos["Distrito"] != "Ciudad de Madrid")
-        ]
-    .sort_values("€/m²", ascending=False))
-
-df_rank["Distrito"] = pd.Categorical(
-    df_rank["Distrito"],
-    categories=df_rank["Distrito"],
-    ordered=True)
-
-n_distritos = df_rank.shape[0]
-altura = max(400, n_distritos * 35)
-
-fig = px.bar(
-    df_rank,
-    x="€/m²",
-    y="Distrito",
-    orientation="h",
-    height=altura)
-
-fig.update_layout(
-    yaxis=dict(autorange="reversed"),
-    xaxis_title="€/m²",
-    yaxis_title="Distrito",
-    margin=dict(l=120)
-)
-
-st.plotly_chart(fig, use_container_width=True)
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_ranking(df_rank):
+    df_rank = df_rank.copy()
+
+    df_rank["Distrito"] = pd.Categorical(
+        df_rank["Distrito"],
+        categories=df_rank["Distrito"],
+        ordered=True)
+
+    n_distritos = df_rank.shape[0]
+    altura = max(400, n_distritos * 35)
+
+    fig = px.bar(
+        df_rank,
+        x="€/m²",
+        y="Distrito",
+        orientation="h",
+        height=altura)
+
+    fig.update_layout(
+        yaxis=dict(autorange="reversed"),
+        xaxis_title="€/m²",
+        yaxis_title="Distrito",
+        margin=dict(l=120)
+    )
+    return fig
+
+@st.fragment
+def fragmento_ranking():
+    #Solo los años con ranking precalculado
+    años = get_ranking_years()
+    year_sel = st.slider(
+        "Selecciona el año",
+        años[0],
+        años[-1],
+        min(2024, años[-1]),
+        key="historico_año")
+    with FragmentTimer(PAGINA, "ranking") as t:
+        #Ranking precalculado del año seleccionado
+        df_rank = get_ranking(year_sel)
+        if df_rank.empty:
+            st.info(f"No hay datos de distritos para {year_sel}.")
+            return
+        fig = fig_ranking(df_rank)
+        t.lap("calculo")
+        st.plotly_chart(fig, use_container_width=True)
+        t.lap("serializacion")
+
+fragmento_ranking()
 
 st.divider()
 
 # Incremento acumulado desde 2015
 
-year_base = 2015
-year_last = df_distritos["Año"].max()
-
-df_growth = (
-    df_distritos[
-        (df_distritos["Año"].isin([2015, year_last])) &
-        (df_distritos["Distrito"] != "Ciudad de Madrid")
-    ]
-    .pivot(index="Distrito", columns="Año", values="€/m²")
-    .dropna()
-)
-
-df_growth["Incremento_%"] = (df_growth[year_last] / df_growth[2015] - 1) * 100
-
-df_growth = df_growth.sort_values("Incremento_%", ascending=False)
-
-# Convertir índice en categórico
-df_growth.index = pd.Categorical(
-    df_growth.index,
-    categories=df_growth.index,
-    ordered=True)
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_crecimiento(df_growth):
+    n_distritos = df_growth.shape[0]
+    altura = max(400, n_distritos * 35)
+
+    fig = px.bar(
+        df_growth,
+        x="Incremento_%",
+        y="Distrito",
+        orientation="h",
+        height=altura,
+        color_discrete_sequence=["#2ca02c"]
+    )
+
+    fig.update_layout(
+        yaxis=dict(autorange="reversed"),
+        margin=dict(l=140)
+    )
+    return fig
 
 # Gráfico
 
 st.subheader("Incremento acumulado del precio medio por distrito (2015-2024)")
 
-df_growth = df_growth.reset_index()
-df_growth = df_growth.rename(columns={"index": "Distrito"})
-
-n_distritos = df_growth.shape[0]
-altura = max(400, n_distritos * 35)
-
-fig = px.bar(
-    df_growth,
-    x="Incremento_%",
-    y="Distrito",
-    orientation="h",
-    height=altura,
-    color_discrete_sequence=["#2ca02c"]
-)
-
-fig.update_layout(
-    yaxis=dict(autorange="reversed"),
-    margin=dict(l=140)
-)
-
-st.plotly_chart(fig, use_container_width=True)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+with FragmentTimer(PAGINA, "crecimiento") as t:
+    #Tabla precalculada (año base 2015 frente al último año disponible)
+    fig = fig_crecimiento(get_crecimiento())
+    t.lap("calculo")
+    st.plotly_chart(fig, use_container_width=True)
+    t.lap("serializacion")
 
+perfil_arranque.finish()
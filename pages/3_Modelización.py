@@ -1,12 +1,56 @@
+from utils.profiling import PageProfiler
+perfil_arranque = PageProfiler("3_Modelización")
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from utils.data_store import load_dataset
+from utils.training import load_results, results_markdown
+from utils.plot_summaries import histogram_figure, scatter_figure, box_figure
+from utils.explanations import load_importances
+
+perfil_arranque.mark("imports")
 
 st.set_page_config(layout="wide")
 
 #Importar datos
-df_modelos = pd.read_csv("data/modelos.csv")
-df_modelos_final = pd.read_csv("data/modelos_final.csv")
+df_modelos = load_dataset("modelos")
+df_modelos_final = load_dataset("modelos_final")
+
+#Gráficos: por encima de ROW_THRESHOLD filas se envían resúmenes calculados en el servidor.
+#Los datos se pasan como argumento para que la caché se invalide si se actualizan
+#(cache_resource: las figuras solo se leen, así no se copian en cada ejecución;
+#la caché es compartida por todas las sesiones y se limita a MAX_FIGURAS por función)
+MAX_FIGURAS = 32
+
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_histograma(df):
+    fig = histogram_figure(df, "log_price", labels={"log_price": "Log Precio"})
+    fig.update_layout(height=400)
+    return fig
+
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_dispersion(df):
+    fig = scatter_figure(
+        df,
+        "log_surface",
+        "log_price",
+        labels={
+            "log_surface": "Log Superficie",
+            "log_price": "Log Precio"},)
+    fig.update_layout(height=450)
+    return fig
+
+@st.cache_resource(max_entries=MAX_FIGURAS)
+def fig_cajas(df, col):
+    fig = box_figure(
+        df,
+        col,
+        "log_price",
+        labels={
+            col: col,
+            "log_price": "Log Precio"
+        },
+        title=f"Distribución del precio según {col}")
+    fig.update_layout(height=400)
+    return fig
 
 st.title("🧠 Modelización")
 st.write("""En esta sección se presentan los modelos de aprendizaje automático utilizados para
@@ -44,13 +88,7 @@ st.divider()
 #Distribución precios
 st.subheader("Distribución del precio de la vivienda")
 
-fig = px.histogram(
-    df_modelos_final,
-    x="log_price",
-    nbins=50,
-    labels={"log_price": "Log Precio"},)
-
-fig.update_layout(height=400)
+fig = fig_histograma(df_modelos_final)
 st.plotly_chart(fig, use_container_width=True)
 st.write("""Se observa que, tras aplicar una escala logarítmica, la distribución del precio presenta una
 forma aproximadamente unimodal, lo que indica que la transformación reduce significativamente
@@ -61,16 +99,7 @@ st.divider()
 #Superficie vs Precio
 st.subheader("Relación entre superficie y precio")
 
-fig = px.scatter(
-    df_modelos_final,
-    x="log_surface",
-    y="log_price",
-    opacity=0.4,
-    labels={
-        "log_surface": "Log Superficie",
-        "log_price": "Log Precio"},)
-
-fig.update_layout(height=450)
+fig = fig_dispersion(df_modelos_final)
 st.plotly_chart(fig, use_container_width=True)
 st.write("Se observa una relación lineal positiva muy clara entre la superficie y el precio")
 
@@ -83,17 +112,7 @@ col = st.selectbox(
     "Selecciona una variable:",
     ["Elevator", "Air_Conditioner", "Heater", "Parking", "Balcony", "Terrace", "Swimming_Pool"])
 
-fig = px.box(
-    df_modelos_final,
-    x=col,
-    y="log_price",
-    labels={
-        col: col,
-        "log_price": "Log Precio"
-    },
-    title=f"Distribución del precio según {col}")
-
-fig.update_layout(height=400)
+fig = fig_cajas(df_modelos_final, col)
 st.plotly_chart(fig, use_container_width=True)
 
 st.write("""Las variables cualitativas muestran diferencias sistemáticas en el nivel de precios.
@@ -154,7 +173,19 @@ en la modelización realizada.""")
 st.divider()
 
 st.subheader("Resultados de validación cruzada")
-st.markdown("""| Modelo | R² (mean) | RMSE (mean) |
+
+#Resultados reproducibles (python -m scripts.run_cv); si no existen se muestran los del estudio
+cv_resultados = load_results()
+if cv_resultados is not None:
+    st.markdown(results_markdown(cv_resultados))
+    nota = ("Validación cruzada de 5 pliegues. XGBoost con los hiperparámetros del modelo final y "
+            "el resto de modelos con los valores por defecto de scikit-learn. "
+            "Tiempos medidos en la última ejecución de `scripts.run_cv`.")
+    if "Fit_en_cache" in cv_resultados and cv_resultados["Fit_en_cache"].any():
+        nota += " \\* Ajustes reutilizados de la caché: su tiempo es el de la ejecución que los entrenó."
+    st.caption(nota)
+else:
+    st.markdown("""| Modelo | R² (mean) | RMSE (mean) |
 |:------:|:-------------:|:---------------:|
 | Regresión lineal | 0.7767 | 0.3802 |
 | Decision Tree | 0.900 | 0.254 |
@@ -168,6 +199,20 @@ contenida en las variables explicativas es capturada de forma consistente por di
 métodos no paramétricos. Esto refuerza la validez de las conclusiones obtenidas y pone 
 de manifiesto la robustez del análisis realizado.""")
 
-
-
-
+#Importancia de las variables (precalculada con python -m scripts.build_explanations)
+importancias = load_importances()
+if importancias is not None:
+    st.divider()
+    st.subheader("Importancia de las variables en el modelo final")
+    st.bar_chart(
+        importancias.set_index("Factor")["Importancia"].sort_values(),
+        horizontal=True,
+        x_label="Efecto medio absoluto sobre el log-precio",
+        y_label="")
+    st.caption("Contribuciones TreeSHAP exactas de XGBoost sobre una muestra de 2.000 viviendas.")
+    principales = [f"**{f}**" for f in importancias["Factor"].head(3)]
+    st.write(
+        f"Los factores que más mueven la estimación del modelo XGBoost son "
+        f"{', '.join(principales[:-1])} y {principales[-1]}.")
+
+perfil_arranque.finish()
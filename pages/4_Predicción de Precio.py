@@ -1,11 +1,18 @@
+from utils.profiling import PageProfiler
+perfil_arranque = PageProfiler("4_Predicción de Precio")
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
-from geopy.geocoders import Nominatim
-import sklearn
-import xgboost
-import os
+from utils.prediction import build_features, read_batch_file, predict_batch
+from utils.spatial import get_validator
+from utils.model_registry import get_entry, model_info, resolve_batch_model_path, resolve_model_path
+from utils.geocoding import CALLEJERO_PATH, build_geocoder
+from utils.prediction_cache import get_prediction_cache
+from utils.comparables import find_comparables
+from utils.intervals import load_table, price_interval
+from utils.explanations import get_explanation_cache
+
+perfil_arranque.mark("imports")
 
 st.set_page_config(layout="wide")
 
@@ -15,21 +22,19 @@ de una vivienda a partir de sus características estructurales y de localizació
 La predicción se obtiene utilizando el modelo **XGBoost**, seleccionado como modelo
 final del estudio por su mayor capacidad predictiva y estabilidad.""")
 
-#Límites geográficos del Municipio de Madrid
-def is_in_madrid(lat, lon):
-    return (
-        40.3120 <= lat <= 40.5630 and
-        -3.8880 <= lon <= -3.5170)
+# Cargar modelo (una vez por proceso; se recarga solo si cambia el fichero).
+# La predicción puntual y su explicación usan la versión compacta exportada si
+# existe (arranque rápido, solo NumPy); los lotes usan el booster nativo
+MODEL_FILE = resolve_model_path("modelo_xgb_final.pkl")
+get_entry(MODEL_FILE)
 
-# Cargar modelo
-def load_model():
-    return joblib.load("modelo_xgb_final.pkl")
-model = load_model()
+# Intervalos de predicción calibrados (python -m scripts.calibrate_intervals); None si no hay tabla
+intervalos = load_table(MODEL_FILE)
 
-# Geocoder (dirección → lat/lon)
+# Geocoder (dirección → lat/lon): caché en disco, callejero local y Nominatim como respaldo
 @st.cache_resource
 def get_geocoder():
-    return Nominatim(user_agent="tfg_real_state_app")
+    return build_geocoder()
 geolocator = get_geocoder()
 
 # Entradas del usuario
@@ -52,12 +57,21 @@ with col2:
             "Dirección",
             "Calle de Serrano, Madrid")
 
+        # El callejero local no se distribuye con la app (python -m scripts.build_callejero)
+        if geolocator.gazetteer is None and geolocator.remote is None:
+            st.warning(
+                f"No hay callejero local (`{CALLEJERO_PATH}`) y la búsqueda remota está "
+                "desactivada: solo se encuentran direcciones ya guardadas en la caché. "
+                "Genera el callejero con `python -m scripts.build_callejero` o introduce las coordenadas.")
+        elif geolocator.gazetteer is None:
+            st.caption(f"Sin callejero local (`{CALLEJERO_PATH}`): las direcciones se buscan en Nominatim.")
+
         if st.button("📍 Usar dirección"):
             location = geolocator.geocode(address)
             if location:
                 st.session_state["latitude"] = location.latitude
                 st.session_state["longitude"] = location.longitude
-                st.success("Ubicación encontrada correctamente")
+                st.success(f"Ubicación encontrada correctamente ({location.source})")
                 st.write(
                     f"Latitud: {location.latitude:.6f} | "
                     f"Longitud: {location.longitude:.6f}")
@@ -93,36 +107,39 @@ if st.button("🔮 Predecir precio"):
     # Comprobar que hay coordenadas
     if "latitude" not in st.session_state or "longitude" not in st.session_state:
         st.warning("Introduce una dirección o coordenadas antes de predecir.")
-        st.stop()
+        perfil_arranque.stop()
 
     latitude = st.session_state["latitude"]
     longitude = st.session_state["longitude"]
 
     # Validación límites del municipio de Madrid
-    if not is_in_madrid(latitude, longitude):
+    validator = get_validator()
+    if not validator.in_madrid(latitude, longitude):
+        municipio = validator.municipio(latitude, longitude)[0]
         st.error(
-            "La ubicación introducida está fuera del municipio de Madrid. "
+            "La ubicación introducida está fuera del municipio de Madrid"
+            + (f" ({municipio}). " if municipio else ". ") +
             "El modelo solo es válido para viviendas situadas dentro de la ciudad.")
-        st.stop()
-
-    # Crear DataFrame con columnas del modelo
-    input_data = pd.DataFrame({
-        "log_surface": [np.log(surface)],
-        "Rooms": [rooms],
-        "Bathrooms": [bathrooms],
-        "Floor": [floor],
-        "Latitude": [latitude],
-        "Longitude": [longitude],
-        "Elevator": [int(elevator)],
-        "Air_Conditioner": [int(air)],
-        "Heater": [int(heater)],
-        "Parking": [int(parking)],
-        "Balcony": [int(balcony)],
-        "Terrace": [int(terrace)],
-        "Swimming_Pool": [int(pool)]})
-
-    # Predicción en log-precio
-    log_price_pred = model.predict(input_data)[0]
+        perfil_arranque.stop()
+
+    # Variables del modelo
+    input_data = build_features({
+        "Surface": surface,
+        "Rooms": rooms,
+        "Bathrooms": bathrooms,
+        "Floor": floor,
+        "Latitude": latitude,
+        "Longitude": longitude,
+        "Elevator": elevator,
+        "Air_Conditioner": air,
+        "Heater": heater,
+        "Parking": parking,
+        "Balcony": balcony,
+        "Terrace": terrace,
+        "Swimming_Pool": pool})
+
+    # Predicción en log-precio (con caché de predicciones repetidas)
+    log_price_pred = get_prediction_cache(MODEL_FILE).predict_log_price(input_data)
 
     # Volver a euros
     price_pred = np.exp(log_price_pred)
@@ -132,6 +149,24 @@ if st.button("🔮 Predecir precio"):
     st.metric(
         label="Precio estimado (€)",
         value=f"{price_pred:,.0f} €")
+    if intervalos is not None:
+        precio_min, precio_max = price_interval([log_price_pred], intervalos)
+        st.write(f"Intervalo de predicción al 90 %: **{precio_min[0]:,.0f} € – {precio_max[0]:,.0f} €**")
+
+    # Factores que más influyen en la predicción (contribuciones del modelo, en caché)
+    cache_explicaciones = get_explanation_cache(MODEL_FILE)
+    explicacion, base = cache_explicaciones.explain(input_data)
+    st.markdown("**¿Por qué este precio?** Factores con más peso en la estimación:")
+    top = explicacion.head(5)
+    st.markdown("\n".join(
+        f"- **{factor}**: {efecto:+.1f} %"
+        for factor, efecto in zip(top["Factor"], top["Efecto_%"])))
+    st.caption(
+        f"Efecto de cada factor sobre el precio frente a una vivienda media del dataset "
+        f"({np.exp(base):,.0f} €)."
+        + (" Contribuciones aproximadas (método de Saabas): pueden atribuir más peso del "
+           "real a las variables que el modelo usa en sus primeros cortes."
+           if cache_explicaciones.approximate() else ""))
 
     st.caption(
         "La estimación se basa en patrones aprendidos a partir de datos históricos "
@@ -139,19 +174,55 @@ if st.button("🔮 Predecir precio"):
 
         "El resultado tiene carácter orientativo y no constituye una valoración oficial.")
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    # Viviendas comparables del dataset (cercanas y con características parecidas)
+    st.subheader("🏘️ Viviendas comparables")
+    comparables = find_comparables(input_data)
+    st.dataframe(
+        comparables[["Price", "€/m²", "Surface", "Rooms", "Bathrooms", "Floor", "Distancia_km"]],
+        hide_index=True,
+        column_config={
+            "Price": st.column_config.NumberColumn("Precio (€)", format="%d"),
+            "€/m²": st.column_config.NumberColumn("€/m²", format="%d"),
+            "Surface": "Superficie (m²)",
+            "Rooms": "Habitaciones",
+            "Bathrooms": "Baños",
+            "Floor": "Planta",
+            "Distancia_km": st.column_config.NumberColumn("Distancia (km)", format="%.2f")})
+    st.caption("Anuncios del dataset más parecidos por ubicación, superficie, distribución y equipamientos.")
+
+st.divider()
+
+# Predicción por lotes
+st.subheader("📦 Predicción por lotes")
+st.write("""Permite valorar muchas viviendas a la vez subiendo un fichero CSV o Parquet con las
+columnas del modelo (`log_surface` o `Surface`, `Rooms`, `Bathrooms`, `Floor`, `Latitude`,
+`Longitude` y los equipamientos con valores 0/1; los que falten se toman como 0). Las filas situadas fuera del municipio de
+Madrid o con valores incompletos se marcan como no válidas y no se predicen.""")
+
+batch_file = st.file_uploader("Fichero de viviendas", type=["csv", "parquet"])
+
+if batch_file is not None:
+    try:
+        batch_booster = get_entry(resolve_batch_model_path("modelo_xgb_final.pkl")).booster
+        df_batch = predict_batch(batch_booster, read_batch_file(batch_file), intervals=intervalos)
+    except ValueError as e:
+        st.error(str(e))
+    else:
+        n_validas = int(df_batch["Valida"].sum())
+        st.success(f"{n_validas:,} de {len(df_batch):,} viviendas valoradas correctamente")
+        st.dataframe(df_batch.head(200))
+        st.download_button(
+            "⬇️ Descargar resultados (CSV)",
+            df_batch.to_csv(index=False).encode("utf-8"),
+            file_name="predicciones.csv",
+            mime="text/csv")
+
+# Información del modelo cargado
+with st.expander("ℹ️ Información del modelo"):
+    st.table(pd.Series(model_info(MODEL_FILE), name="Valor").astype(str))
+    st.caption("Caché de predicciones")
+    st.table(pd.Series(get_prediction_cache(MODEL_FILE).stats(), name="Valor").astype(str))
+    st.caption("Caché de explicaciones")
+    st.table(pd.Series(get_explanation_cache(MODEL_FILE).stats(), name="Valor").astype(str))
+
+perfil_arranque.finish()
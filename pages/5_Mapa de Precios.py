@@ -0,0 +1,78 @@
+#Librerías
+from utils.profiling import PageProfiler
+perfil_arranque = PageProfiler("5_Mapa de Precios")
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+from utils.price_grid import PriceGrid, PROFILES, GRID_PATH
+
+perfil_arranque.mark("imports")
+
+st.set_page_config(layout="wide")
+
+#Título y descripción de la página
+st.title("🗺️ Mapa de Precios Estimados")
+st.write("""Este mapa muestra el precio por metro cuadrado que estima el modelo **XGBoost** en todo el
+Municipio de Madrid para varios perfiles de vivienda típicos. Los valores están precalculados sobre
+una rejilla de coordenadas, por lo que explorar el mapa no requiere volver a ejecutar el modelo.""")
+
+#Cargar rejilla precalculada
+@st.cache_resource
+def load_grid():
+    return PriceGrid.load(GRID_PATH)
+grid = load_grid()
+
+if not grid.is_current():
+    st.warning("La rejilla se generó con una versión anterior del modelo. "
+               "Ejecuta `python -m scripts.build_price_grid` para actualizarla.")
+
+#Selector de perfil
+perfil = st.selectbox("Perfil de vivienda:", grid.profiles)
+surface = PROFILES[perfil]["Surface"] if perfil in PROFILES else None
+
+#Mapa de calor
+fig = go.Figure(go.Heatmap(
+    x=grid.lons,
+    y=grid.lats,
+    z=grid.layer(perfil),
+    colorscale="YlOrRd",
+    colorbar=dict(title="€/m²"),
+    hovertemplate="Lat: %{y:.4f}<br>Lon: %{x:.4f}<br>%{z:,.0f} €/m²<extra></extra>"))
+
+fig.update_layout(
+    title=f"€/m² estimado – {perfil}",
+    xaxis_title="Longitud",
+    yaxis_title="Latitud",
+    yaxis=dict(scaleanchor="x", scaleratio=1.3),
+    height=700,
+    margin=dict(r=0, l=0, t=40, b=0))
+
+evento = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points")
+
+st.divider()
+
+#Consulta de un punto (clic en el mapa o coordenadas)
+st.subheader("Consulta de un punto")
+puntos = evento.selection.points if evento else []
+if puntos:
+    lat_def, lon_def = puntos[0]["y"], puntos[0]["x"]
+else:
+    lat_def, lon_def = 40.4168, -3.7038
+
+col1, col2 = st.columns(2)
+with col1:
+    latitude = st.number_input("Latitud", value=float(lat_def), format="%.6f")
+with col2:
+    longitude = st.number_input("Longitud", value=float(lon_def), format="%.6f")
+
+precio_m2 = float(grid.lookup(perfil, latitude, longitude))
+if np.isnan(precio_m2):
+    st.info("El punto seleccionado está fuera del Municipio de Madrid.")
+else:
+    st.metric("Precio estimado (€/m²)", f"{precio_m2:,.0f} €")
+    if surface:
+        st.metric("Precio estimado de la vivienda (€)", f"{precio_m2 * surface:,.0f} €")
+
+st.caption("Valores orientativos calculados con el modelo final sobre una rejilla de aproximadamente 250 m.")
+
+perfil_arranque.finish()
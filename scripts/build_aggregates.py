@@ -0,0 +1,20 @@
+# Recalcula las tablas agregadas del análisis histórico cuyo origen ha cambiado.
+# Uso: python -m scripts.build_aggregates [--force]
+import argparse
+
+from utils.aggregates import SOURCES, agg_path, build_aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    rebuilt = build_aggregates(force=args.force)
+    for name in SOURCES:
+        estado = "recalculado" if name in rebuilt else "sin cambios"
+        print(f"{name}: {estado} -> {agg_path(name)}")
+
+
+if __name__ == "__main__":
+    main()
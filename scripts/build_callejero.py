@@ -0,0 +1,52 @@
+# Genera el callejero local (data/callejero_madrid.csv) a partir del fichero de
+# numeraciones del callejero oficial del Ayuntamiento de Madrid (portal de datos
+# abiertos). Las coordenadas pueden venir en grados o en UTM ETRS89 huso 30.
+# Uso: python -m scripts.build_callejero numeraciones.csv [--sep ";"] [--encoding latin-1]
+import argparse
+
+import pandas as pd
+
+from utils.geocoding import CALLEJERO_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("src")
+    parser.add_argument("--out", default=CALLEJERO_PATH)
+    parser.add_argument("--sep", default=";")
+    parser.add_argument("--encoding", default="latin-1")
+    parser.add_argument("--clase", default="VIA_CLASE")
+    parser.add_argument("--particula", default="VIA_PAR")
+    parser.add_argument("--nombre", default="VIA_NOMBRE")
+    parser.add_argument("--numero", default="NUMERO")
+    parser.add_argument("--x", default="UTMX_ETRS", help="Columna X (UTM) o longitud")
+    parser.add_argument("--y", default="UTMY_ETRS", help="Columna Y (UTM) o latitud")
+    parser.add_argument("--grados", action="store_true", help="Las columnas x/y ya son longitud/latitud")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.src, sep=args.sep, encoding=args.encoding, dtype=str)
+    via = (
+        df[args.clase].fillna("") + " " +
+        df[args.particula].fillna("") + " " +
+        df[args.nombre].fillna("")).str.split().str.join(" ").str.title()
+
+    x = pd.to_numeric(df[args.x].str.replace(",", "."), errors="coerce")
+    y = pd.to_numeric(df[args.y].str.replace(",", "."), errors="coerce")
+    if args.grados:
+        lon, lat = x, y
+    else:
+        from pyproj import Transformer
+        transformer = Transformer.from_crs("EPSG:25830", "EPSG:4326", always_xy=True)
+        lon, lat = transformer.transform(x.to_numpy(), y.to_numpy())
+
+    out = pd.DataFrame({
+        "Via": via,
+        "Numero": pd.to_numeric(df[args.numero].str.extract(r"(\d+)")[0], errors="coerce").astype("Int32"),
+        "Latitude": lat,
+        "Longitude": lon}).dropna(subset=["Latitude", "Longitude"])
+    out.to_csv(args.out, index=False)
+    print(f"{len(out):,} portales en {out['Via'].nunique():,} vías -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# Construye (o pone al día) el índice de viviendas comparables de la página de
+# Predicción de Precio a partir del dataset modelos.
+# Uso: python -m scripts.build_comparables [--full]
+import argparse
+import time
+
+from utils.comparables import INDEX_PATH, ComparablesIndex
+from utils.data_store import load_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true", help="Reconstruir el árbol completo")
+    parser.add_argument("--out", default=INDEX_PATH)
+    args = parser.parse_args()
+
+    df = load_dataset("modelos")
+    t0 = time.perf_counter()
+    index = None if args.full else ComparablesIndex.load(args.out)
+    if index is None:
+        index, estado = ComparablesIndex.build(df), "reconstruido"
+    else:
+        index, estado = index.update(df)
+    index.save(args.out)
+    print(f"Índice {estado} en {time.perf_counter() - t0:.2f} s: "
+          f"{len(index.rows):,} viviendas en el árbol, {len(index.delta):,} pendientes -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# Convierte los CSV de data/ a ficheros Feather tipados en data/store/ y
+# recalcula los agregados que dependen de ellos.
+# Uso: python -m scripts.build_data_store
+import os
+
+from utils.aggregates import build_aggregates
+from utils.data_store import convert_all, csv_path, store_path
+
+
+def main():
+    for name, df in convert_all().items():
+        print(
+            f"{name}: {len(df):,} filas, "
+            f"{os.path.getsize(csv_path(name)) / 1024:,.0f} KB CSV -> "
+            f"{os.path.getsize(store_path(name)) / 1024:,.0f} KB {store_path(name)}")
+    for name in build_aggregates():
+        print(f"Agregado recalculado: {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# Precalcula las importancias globales del modelo final (contribuciones de
+# XGBoost sobre una muestra de modelos_final) para la página de Modelización.
+# Uso: python -m scripts.build_explanations [--model modelo_xgb_final.pkl] [--n 2000]
+import argparse
+import time
+
+from utils.explanations import GLOBAL_SAMPLE, global_importances, importances_path, save_importances
+from utils.model_registry import MODEL_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--n", type=int, default=GLOBAL_SAMPLE, help="Filas de la muestra (0 = todas)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df = global_importances(args.model, args.n)
+    save_importances(df, args.model)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"{time.perf_counter() - t0:.1f} s -> {importances_path(args.model)}")
+
+
+if __name__ == "__main__":
+    main()
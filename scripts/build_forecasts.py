@@ -0,0 +1,27 @@
+# Ajusta o pone al día los modelos de previsión de cada municipio y distrito y
+# guarda sus parámetros (data/store/previsiones_<nivel>.json). Solo se reajustan
+# las series nuevas o cambiadas; --force reajusta todas.
+# Uso: python -m scripts.build_forecasts [--force] [--n-jobs -1]
+import argparse
+import time
+
+from utils.forecasting import SERIES, forecast_path, update_forecasts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    resumenes = update_forecasts(force=args.force, n_jobs=args.n_jobs)
+    for nivel in SERIES:
+        r = resumenes[nivel]
+        print(f"{nivel}: {r['actual']} al día, {r['incremental']} actualizadas, "
+              f"{r['reajuste']} reajustadas, {r['sin datos']} sin datos -> {forecast_path(nivel)}")
+    print(f"Tiempo total: {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
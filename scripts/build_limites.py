@@ -0,0 +1,21 @@
+# Preprocesado de los límites municipales: una geometría por municipio y una tabla
+# compacta de valores año x municipio.
+# Uso: python -m scripts.build_limites
+import os
+import time
+
+from utils.geo import LIMITES_PATH, GEOMETRIAS_PATH, VALORES_PATH, build_limites
+
+
+def main():
+    t0 = time.perf_counter()
+    geom_geojson, valores = build_limites()
+    print(f"Geometrías: {len(geom_geojson['features'])} -> {GEOMETRIAS_PATH}")
+    print(f"Valores: {len(valores)} filas -> {VALORES_PATH}")
+    for path in [LIMITES_PATH, GEOMETRIAS_PATH, VALORES_PATH]:
+        print(f"  {path}: {os.path.getsize(path) / 1024:,.0f} KB")
+    print(f"Tiempo: {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
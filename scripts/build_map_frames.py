@@ -0,0 +1,25 @@
+# Genera las figuras animadas del mapa histórico (valor e incremento, en cada
+# nivel de detalle) cuyos datos han cambiado.
+# Uso: python -m scripts.build_map_frames [--force]
+import argparse
+import os
+
+from utils.geo import NIVELES
+from utils.map_frames import MODOS, build_map_specs, spec_path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    rebuilt = build_map_specs(force=args.force)
+    for nivel in NIVELES:
+        for modo in MODOS:
+            path = spec_path(modo, nivel)
+            estado = "generada" if f"{modo}/{nivel}" in rebuilt else "sin cambios"
+            print(f"{modo}/{nivel}: {estado} -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# Genera los niveles de detalle simplificados de las geometrías municipales,
+# conservando las fronteras compartidas entre municipios.
+# Uso: python -m scripts.build_niveles (después de scripts.build_limites)
+import os
+
+from utils.geo import NIVELES, build_niveles, count_vertices, geometrias_path, load_geometrias
+
+
+def main():
+    original = load_geometrias()
+    print(f"alto: {count_vertices(original):,} vértices")
+    for nivel, (simple, invalidos) in build_niveles().items():
+        path = geometrias_path(nivel)
+        print(
+            f"{nivel}: tolerancia {NIVELES[nivel]['tolerancia']}, "
+            f"{count_vertices(simple):,} vértices, "
+            f"{os.path.getsize(path) / 1024:,.1f} KB -> {path}"
+            + (f" ({invalidos} polígonos sin simplificar)" if invalidos else ""))
+
+
+if __name__ == "__main__":
+    main()
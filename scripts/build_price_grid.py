@@ -0,0 +1,30 @@
+# Precalcula el €/m² estimado por el modelo en una rejilla lat/lon del Municipio
+# de Madrid para los perfiles de vivienda típicos, repartiendo el trabajo entre
+# varios procesos. Hay que volver a ejecutarlo cuando cambie modelo_xgb_final.pkl.
+# Uso: python -m scripts.build_price_grid [--step 0.0025] [--workers 4]
+import argparse
+import os
+import time
+
+from utils.price_grid import GRID_PATH, GRID_STEP, build_grid
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--step", type=float, default=GRID_STEP)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=GRID_PATH)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    grid = build_grid(step=args.step, workers=args.workers)
+    grid.save(args.out)
+    n = grid.values.size
+    print(
+        f"{len(grid.profiles)} perfiles x {len(grid.lats)} x {len(grid.lons)} celdas "
+        f"({n:,} predicciones) en {time.perf_counter() - t0:.1f} s -> "
+        f"{args.out} ({os.path.getsize(args.out) / 1024:,.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
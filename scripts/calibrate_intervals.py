@@ -0,0 +1,29 @@
+# Calibra los intervalos de predicción del modelo final con residuos fuera de
+# pliegue sobre modelos_final y guarda la tabla junto al modelo.
+# Uso: python -m scripts.calibrate_intervals [--model modelo_xgb_final.pkl] [--bins 5] [--n-jobs -1]
+import argparse
+
+from utils.intervals import LEVELS, N_BINS, calibrate, intervals_path, save_table
+from utils.model_registry import MODEL_PATH
+from utils.training import N_SPLITS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--levels", type=float, nargs="+", default=LEVELS)
+    parser.add_argument("--bins", type=int, default=N_BINS)
+    parser.add_argument("--folds", type=int, default=N_SPLITS)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    table = calibrate(args.model, args.levels, args.bins, args.folds, args.n_jobs)
+    save_table(table, args.model)
+    for level, qs in table["cuantiles"].items():
+        anchos = ", ".join(f"±{q:.3f}" for q in qs)
+        print(f"Nivel {level}: global ±{table['global'][level]:.3f} | por tramo {anchos}")
+    print(f"{table['n_calibracion']:,} residuos -> {intervals_path(args.model)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Exporta modelo_xgb_final.pkl a un ensamble de árboles compacto (arrays de nodos
+# en .npz) que se evalúa solo con NumPy, y comprueba que reproduce al booster.
+# Uso: python -m scripts.export_model [--model modelo_xgb_final.pkl]
+import argparse
+import os
+
+import numpy as np
+
+from utils.data_store import load_dataset
+from utils.model_registry import MODEL_PATH, compact_path, file_signature, get_entry
+from utils.prediction import FEATURES, to_matrix
+from utils.tree_model import TreeEnsemble, from_booster
+
+TOLERANCE = 1e-4
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    booster = get_entry(args.model).booster
+    out = compact_path(args.model)
+    from_booster(booster, FEATURES, file_signature(args.model)).save(out)
+
+    ensemble = TreeEnsemble.load(out)
+    X = to_matrix(load_dataset("modelos_final"))
+    diff = np.abs(ensemble.inplace_predict(X) - booster.inplace_predict(X)).max()
+    print(
+        f"{ensemble.n_trees} árboles, profundidad {ensemble.max_depth}, "
+        f"{os.path.getsize(out) / 1024:,.0f} KB -> {out}")
+    print(f"Diferencia máxima con el booster (log-precio): {diff:.2e}")
+
+    # Las contribuciones (explicaciones de la página de predicción) deben
+    # coincidir con las aproximadas de XGBoost
+    import xgboost as xgb
+    muestra = X[:2000]
+    ref = booster.predict(xgb.DMatrix(muestra), pred_contribs=True, approx_contribs=True)
+    contribs, bias = ensemble.contributions(muestra)
+    diff_contribs = max(np.abs(contribs - ref[:, :-1]).max(), np.abs(bias - ref[:, -1]).max())
+    print(f"Diferencia máxima en las contribuciones: {diff_contribs:.2e}")
+    if max(diff, diff_contribs) > TOLERANCE:
+        raise SystemExit(f"La diferencia supera la tolerancia ({TOLERANCE})")
+
+
+if __name__ == "__main__":
+    main()
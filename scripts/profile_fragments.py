@@ -0,0 +1,58 @@
+# Resume los tiempos por fragmento registrados con PROFILE_FRAGMENTS=1
+# (logs/fragments.jsonl): mediana y p95 del cálculo y de la serialización.
+# Con --simulate ejecuta antes la página de Análisis Histórico en un proceso de
+# prueba cambiando sus controles para generar registros.
+# Uso: python -m scripts.profile_fragments [--simulate] [--reruns 5]
+import argparse
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from utils.profiling import FRAGMENT_LOG_PATH, read_log
+
+SIMULATION = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("pages/2_Analisis Histórico.py", default_timeout=600)
+at.run()
+for i in range(int(sys.argv[1])):
+    at.multiselect(key="historico_municipios").set_value(["Madrid", "Getafe"][:1 + i % 2])
+    at.multiselect(key="historico_distritos").set_value(["Salamanca", "Retiro"][:1 + i % 2])
+    at.slider(key="historico_año").set_value(2015 + i % 10)
+    at.radio(key="historico_modo").set_value(["valor", "incremento"][i % 2])
+    at.run()
+if at.exception:
+    raise SystemExit(str(at.exception[0].value))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--simulate", action="store_true")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--log", default=FRAGMENT_LOG_PATH)
+    args = parser.parse_args()
+
+    if args.simulate:
+        env = dict(os.environ, PROFILE_FRAGMENTS="1", PROFILE_STARTUP="0", FRAGMENT_LOG=args.log)
+        subprocess.run([sys.executable, "-c", SIMULATION, str(args.reruns)], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    records = read_log(args.log)
+    if not records:
+        print(f"No hay registros en {args.log} (ejecuta la app con PROFILE_FRAGMENTS=1)")
+        return
+
+    df = pd.DataFrame(records).fillna(0.0)
+    fases = [c for c in df.columns if c.endswith("_s")]
+    resumen = df.groupby(["pagina", "fragmento"], sort=False)[fases].agg(
+        ["median", lambda v: v.quantile(0.95)]) * 1000
+    resumen.columns = [f"{c[:-2]} {'p50' if a == 'median' else 'p95'} ms" for c, a in resumen.columns]
+    resumen.insert(0, "n", df.groupby(["pagina", "fragmento"], sort=False).size())
+    print(resumen.to_string(float_format=lambda v: f"{v:.1f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Mide el arranque en frío de cada página: lanza un proceso nuevo por página con
+# streamlit.testing, lee el registro de logs/startup.jsonl y compara los tiempos
+# con la línea base guardada. Marca las páginas que empeoran más de un 20 %.
+# Uso: python -m scripts.profile_startup [--repeat 3] [--save-baseline] [--threshold 0.2]
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from utils.profiling import read_log
+
+BASELINE_PATH = os.path.join("logs", "startup_baseline.json")
+PAGES = ["Inicio.py"] + sorted(glob.glob(os.path.join("pages", "*.py")))
+
+RUNNER = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.run()
+if at.exception:
+    raise SystemExit(str(at.exception[0].value))
+"""
+
+
+def profile_page(path, log_path):
+    env = dict(os.environ, PROFILE_STARTUP="1", STARTUP_LOG=log_path)
+    proc = subprocess.run([sys.executable, "-c", RUNNER, path], env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{path}: {proc.stderr.strip() or proc.stdout.strip()}")
+    records = read_log(log_path)
+    return records[-1] if records else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="Arranques por página (se usa la mediana)")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in PAGES:
+            runs = []
+            for i in range(args.repeat):
+                record = profile_page(path, os.path.join(tmp, f"startup_{len(results)}_{i}.jsonl"))
+                if record is not None:
+                    runs.append(record)
+            if not runs:
+                continue
+            runs.sort(key=lambda r: r["render_s"])
+            record = runs[len(runs) // 2]
+            page = record["pagina"]
+            results[page] = {"imports_s": record["imports_s"], "render_s": record["render_s"]}
+
+            line = f"{page:<28} imports {record['imports_s']:7.3f} s   render {record['render_s']:7.3f} s"
+            base = baseline.get(page)
+            if base:
+                change = record["render_s"] / base["render_s"] - 1
+                line += f"   ({change:+.0%} vs base)"
+                if change > args.threshold:
+                    regressions.append(page)
+                    line += "  <-- REGRESIÓN"
+            print(line)
+            print(f"{'':<28} módulos: {', '.join(record['modulos_nuevos']) or '-'}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+
+    if regressions:
+        print(f"Páginas más de un {args.threshold:.0%} más lentas: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Actualización incremental de los datos con un nuevo trimestre del MITMA o un
+# nuevo año del Colegio de Registradores. Es idempotente: repetir la misma carga
+# no modifica nada.
+# Uso:
+#   python -m scripts.refresh mitma --periodo T3A2025 --municipios nuevos.csv \
+#       --espana 2110.4 --madrid 3702.3
+#   python -m scripts.refresh registradores --year 2025 --distritos distritos_2025.csv
+import argparse
+import time
+
+import pandas as pd
+
+from utils.refresh import append_periodo, append_year_distritos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="fuente", required=True)
+
+    mitma = sub.add_parser("mitma", help="Nuevo trimestre del valor tasado (MITMA)")
+    mitma.add_argument("--periodo", required=True, help="Periodo con formato T<trimestre>A<año>, p. ej. T3A2025")
+    mitma.add_argument("--municipios", required=True, help="CSV con Municipio, Valor_Tasado y Num_Tasaciones")
+    mitma.add_argument("--espana", type=float, help="Valor tasado medio de España en el periodo")
+    mitma.add_argument("--madrid", type=float, help="Valor tasado medio de la Comunidad de Madrid en el periodo")
+
+    reg = sub.add_parser("registradores", help="Nuevo año del precio declarado por distrito")
+    reg.add_argument("--year", type=int, required=True)
+    reg.add_argument("--distritos", required=True, help="CSV con Distrito y €/m²")
+
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+
+    if args.fuente == "mitma":
+        medias = {}
+        if args.espana is not None:
+            medias["España"] = args.espana
+        if args.madrid is not None:
+            medias["Madrid"] = args.madrid
+        resumen = append_periodo(args.periodo, pd.read_csv(args.municipios), medias)
+    else:
+        resumen = append_year_distritos(args.year, pd.read_csv(args.distritos))
+
+    for fichero, estado in resumen.items():
+        print(f"{fichero}: {estado}")
+    print(f"Tiempo: {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# Reproduce la tabla de validación cruzada de la página de Modelización: entrena
+# los cinco modelos sobre modelos_final con los pliegues en paralelo y guarda las
+# métricas y los tiempos en data/cv_resultados.csv.
+# Uso: python -m scripts.run_cv [--models lineal arbol svr rf xgb] [--n-jobs -1] [--no-cache]
+import argparse
+
+from utils.training import CACHE_DIR, MODEL_NAMES, N_SPLITS, RESULTS_PATH, run_cv
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", choices=list(MODEL_NAMES), default=list(MODEL_NAMES))
+    parser.add_argument("--folds", type=int, default=N_SPLITS)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--no-cache", action="store_true", help="No reutilizar pliegues ya ajustados")
+    parser.add_argument("--out", default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    results, wall = run_cv(
+        args.models, n_splits=args.folds, n_jobs=args.n_jobs,
+        cache_dir=None if args.no_cache else CACHE_DIR)
+    results.to_csv(args.out, index=False)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"Tiempo total: {wall:.1f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
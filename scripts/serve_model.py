@@ -0,0 +1,25 @@
+# Servicio HTTP local de predicción con el mismo modelo y las mismas variables
+# que la página de Predicción de Precio.
+# Uso: python -m scripts.serve_model [--host 127.0.0.1] [--port 8502] [--model modelo_xgb_final.pkl]
+import argparse
+import asyncio
+
+from utils.model_registry import MODEL_PATH, resolve_batch_model_path
+from utils.scoring_service import serve
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, resolve_batch_model_path(args.model)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# Búsqueda de hiperparámetros del XGBoost (objetivo log_price, 13 variables del
+# predictor) con successive halving y early stopping, ensayos en paralelo y
+# puntos de control para reanudar. Elige el modelo en el frente de Pareto
+# precisión/latencia y lo guarda en modelo_xgb_tuned.pkl.
+# Uso: python -m scripts.tune_xgb [--n-configs 27] [--eta 3] [--workers 4] [--reset]
+import argparse
+import os
+
+from utils.tuning import (
+    CHECKPOINT_PATH, TUNED_MODEL_PATH, fit_final, pareto_front, select_model, successive_halving)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-configs", type=int, default=27)
+    parser.add_argument("--min-rounds", type=int, default=100)
+    parser.add_argument("--max-rounds", type=int, default=2700)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rmse-tolerance", type=float, default=0.01)
+    parser.add_argument("--reset", action="store_true", help="Descartar el punto de control")
+    parser.add_argument("--out", default=TUNED_MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
+
+    finalists, _ = successive_halving(
+        args.n_configs, args.min_rounds, args.max_rounds, args.eta, args.workers)
+    front = pareto_front(finalists)
+
+    print("Frente de Pareto:")
+    for r in front:
+        print(f"  config {r['id']}: RMSE {r['rmse']:.4f}, {r['best_iteration']} árboles, "
+              f"{r['latency_us']:.2f} µs/fila, {r['config']}")
+
+    chosen = select_model(front, args.rmse_tolerance)
+    fit_final(chosen, args.out)
+    print(f"Elegido: config {chosen['id']} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from utils.geocoding import Gazetteer, GeocodeCache, Geocoder
+
+
+def _gazetteer():
+    return Gazetteer(pd.DataFrame({
+        "Via": ["Calle De Toledo", "Calle De Toledo", "Ronda De Toledo", "Calle De Serrano"],
+        "Numero": [12, 14, 12, 45],
+        "Latitude": [40.4100, 40.4098, 40.4060, 40.4300],
+        "Longitude": [-3.7080, -3.7082, -3.7110, -3.6870]}))
+
+
+def test_vias_que_solo_difieren_en_el_tipo():
+    geocoder = Geocoder(gazetteer=_gazetteer())
+    calle = geocoder.geocode("Calle de Toledo 12")
+    ronda = geocoder.geocode("Ronda de Toledo 12")
+    assert (calle.latitude, calle.longitude) == (40.4100, -3.7080)
+    assert (ronda.latitude, ronda.longitude) == (40.4060, -3.7110)
+    assert Geocoder.cache_key("Calle de Toledo 12") != Geocoder.cache_key("Ronda de Toledo 12")
+
+
+def test_cache_no_mezcla_tipos(tmp_path):
+    geocoder = Geocoder(GeocodeCache(str(tmp_path / "cache.sqlite")), _gazetteer())
+    geocoder.geocode("C/ Toledo 12")
+    ronda = geocoder.geocode("Rda. de Toledo 12")
+    assert ronda.source == "callejero"
+    assert ronda.latitude == 40.4060
+
+
+def test_sin_tipo_o_aproximado_usa_el_nombre():
+    gazetteer = _gazetteer()
+    assert gazetteer.geocode("Serrano 45").latitude == 40.4300
+    assert gazetteer.geocode("Avenida de Serrano 45").latitude == 40.4300
+    assert gazetteer.geocode("Calle Seranno 45").latitude == 40.4300
@@ -0,0 +1,24 @@
+import numpy as np
+
+from utils.price_grid import PriceGrid
+
+
+def _grid():
+    lats = np.linspace(40.30, 40.60, 4)
+    lons = np.linspace(-3.90, -3.50, 5)
+    values = np.arange(20, dtype=np.float32).reshape(1, 4, 5) + 1000
+    return PriceGrid(values, lats, lons, ["piso"])
+
+
+def test_lookup_dentro_de_la_rejilla():
+    grid = _grid()
+    assert grid.lookup("piso", 40.30, -3.90) == 1000
+    assert grid.lookup("piso", 40.60, -3.50) == 1019
+
+
+def test_lookup_fuera_de_la_rejilla_es_nan():
+    grid = _grid()
+    assert np.isnan(grid.lookup("piso", 41.5, -3.70))
+    precios = grid.lookup("piso", [40.40, 40.40, 39.0, np.nan], [-3.70, -2.0, -3.70, -3.70])
+    assert np.isfinite(precios[0])
+    assert np.isnan(precios[1:]).all()
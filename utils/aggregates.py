@@ -0,0 +1,163 @@
+#Librerías
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+from utils.data_store import STORE_DIR, csv_path, load_dataset, store_path
+from utils.geo import VALORES_PATH, load_valores
+
+CIUDAD = "Ciudad de Madrid"
+YEAR_BASE = 2015
+
+SIGNATURE_PATH = os.path.join(STORE_DIR, "agregados.json")
+
+# Ficheros de origen de cada agregado
+SOURCES = {
+    "incremento": [VALORES_PATH],
+    "ranking": ["distritos"],
+    "crecimiento": ["distritos"],
+}
+
+
+def agg_path(name):
+    return os.path.join(STORE_DIR, f"agg_{name}.feather")
+
+
+def _source_file(source):
+    if source.endswith(".csv") or source.endswith(".geojson"):
+        return source
+    return store_path(source) if os.path.exists(store_path(source)) else csv_path(source)
+
+
+# Huella del contenido de los ficheros de origen (independiente del mtime)
+def source_signature(name):
+    h = hashlib.sha1()
+    for source in SOURCES[name]:
+        with open(_source_file(source), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# Incremento anual (%) del valor tasado por municipio
+def build_incremento(valores):
+    df = valores.sort_values(["NAMEUNIT", "Año"]).reset_index(drop=True)
+    df["Incremento_%"] = df.groupby("NAMEUNIT")["Valor_Tasado"].pct_change() * 100
+    return df
+
+
+# Distritos ordenados por €/m² dentro de cada año (sin la media de la ciudad)
+def build_ranking(distritos):
+    df = distritos[distritos["Distrito"] != CIUDAD].copy()
+    df["Distrito"] = df["Distrito"].astype(str)
+    df = df.sort_values(["Año", "€/m²"], ascending=[True, False]).reset_index(drop=True)
+    df["Posicion"] = df.groupby("Año").cumcount() + 1
+    return df
+
+
+# Incremento acumulado por distrito entre el año base y el último año
+def build_crecimiento(distritos, year_base=YEAR_BASE):
+    year_last = int(distritos["Año"].max())
+    df = distritos[
+        (distritos["Año"].isin([year_base, year_last])) &
+        (distritos["Distrito"] != CIUDAD)].copy()
+    df["Distrito"] = df["Distrito"].astype(str)
+    df = df.pivot(index="Distrito", columns="Año", values="€/m²").dropna()
+
+    out = pd.DataFrame({
+        "Distrito": df.index,
+        "Año_base": year_base,
+        "Año_final": year_last,
+        "Valor_base": df[year_base].to_numpy(),
+        "Valor_final": df[year_last].to_numpy()})
+    out["Incremento_%"] = (out["Valor_final"] / out["Valor_base"] - 1) * 100
+    return out.sort_values("Incremento_%", ascending=False).reset_index(drop=True)
+
+
+def _build(name):
+    if name == "incremento":
+        return build_incremento(load_valores())
+    if name == "ranking":
+        return build_ranking(load_dataset("distritos"))
+    return build_crecimiento(load_dataset("distritos"))
+
+
+def _read_signatures():
+    try:
+        with open(SIGNATURE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Recalcula y guarda los agregados cuyo origen ha cambiado
+def build_aggregates(force=False):
+    import pyarrow.feather as feather
+    os.makedirs(STORE_DIR, exist_ok=True)
+    signatures = _read_signatures()
+    rebuilt = []
+    for name in SOURCES:
+        signature = source_signature(name)
+        if not force and signatures.get(name) == signature and os.path.exists(agg_path(name)):
+            continue
+        feather.write_feather(_build(name), agg_path(name), compression="uncompressed")
+        signatures[name] = signature
+        rebuilt.append(name)
+    with open(SIGNATURE_PATH, "w", encoding="utf-8") as f:
+        json.dump(signatures, f, indent=2)
+    return rebuilt
+
+
+# Tablas y diccionarios de consulta cargados una vez por proceso
+_cache = {}
+_lock = threading.Lock()
+
+
+def _stat_key(name):
+    files = [_source_file(source) for source in SOURCES[name]]
+    return tuple((os.path.getmtime(f), os.path.getsize(f)) for f in files)
+
+
+def _load(name):
+    import pyarrow.feather as feather
+    key = _stat_key(name)
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(name)
+        if cached is None or cached[0] != key:
+            signature = source_signature(name)
+            if _read_signatures().get(name) == signature and os.path.exists(agg_path(name)):
+                df = feather.read_table(agg_path(name), memory_map=True).to_pandas()
+            else:
+                df = _build(name)
+            if name == "ranking":
+                lookup = {int(k): g for k, g in df.groupby("Año", sort=False)}
+            else:
+                lookup = None
+            cached = (key, (df, lookup))
+            _cache[name] = cached
+    return cached[1]
+
+
+def get_incremento():
+    return _load("incremento")[0]
+
+
+# Ranking de un año; sin filas (mismas columnas) si el año no tiene distritos
+def get_ranking(year):
+    df, lookup = _load("ranking")
+    ranking = lookup.get(int(year))
+    return df.iloc[:0] if ranking is None else ranking
+
+
+def get_ranking_years():
+    return sorted(_load("ranking")[1])
+
+
+def get_crecimiento():
+    return _load("crecimiento")[0]
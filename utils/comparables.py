@@ -0,0 +1,162 @@
+#Librerías
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from utils.data_store import load_dataset
+from utils.features import BIN_FEATURES, FEATURES, feature_matrix, vivienda_features
+
+INDEX_PATH = "data/comparables_index.pkl"
+# Versión del formato guardado (un índice de otra versión se reconstruye)
+INDEX_VERSION = 1
+K = 5
+
+# Pesos del espacio de búsqueda en "km equivalentes": la localización se pasa a
+# km y cada diferencia estructural cuenta como si la vivienda estuviera más lejos
+KM_LAT = 111.32
+KM_LON = 111.32 * np.cos(np.radians(40.42))
+WEIGHTS = {
+    "Latitude": KM_LAT,
+    "Longitude": KM_LON,
+    "log_surface": 3.0,
+    "Rooms": 0.5,
+    "Bathrooms": 0.5,
+    **{c: 0.25 for c in BIN_FEATURES},
+}
+COLUMNS = [FEATURES.index(c) for c in WEIGHTS]
+SCALE = np.array(list(WEIGHTS.values()), dtype=np.float64)
+
+# Las viviendas añadidas van a un árbol pequeño aparte hasta que suponen esta
+# fracción del índice; entonces se reconstruye el árbol completo
+REBUILD_FRACTION = 0.1
+
+
+# Vectores escalados de las viviendas válidas y su posición en el dataset
+def listing_vectors(df, start=0):
+    X, valid = feature_matrix(df.iloc[start:] if start else df)
+    rows = np.flatnonzero(valid)
+    return X[rows][:, COLUMNS].astype(np.float64) * SCALE, rows + start
+
+
+def query_vector(vivienda):
+    return vivienda_features(vivienda)[0, COLUMNS].astype(np.float64) * SCALE
+
+
+# Huella de las primeras n filas (para saber si solo se han añadido filas al final)
+def prefix_signature(df, n):
+    X, _ = feature_matrix(df.iloc[:n])
+    return hashlib.sha1(X.tobytes()).hexdigest()
+
+
+def _make_tree(vectors):
+    from scipy.spatial import cKDTree
+    return cKDTree(vectors, leafsize=32, balanced_tree=False, compact_nodes=False)
+
+
+# Índice KD-tree de viviendas comparables. Las filas añadidas al dataset después
+# de construir el árbol principal se indexan en un árbol pequeño aparte (delta)
+class ComparablesIndex:
+    def __init__(self, tree, rows, n_rows, signature, delta=None, delta_rows=None):
+        self.tree = tree
+        self.rows = rows
+        self.n_rows = n_rows
+        self.signature = signature
+        self.version = INDEX_VERSION
+        self.delta = delta if delta is not None else np.empty((0, len(COLUMNS)))
+        self.delta_rows = delta_rows if delta_rows is not None else np.empty(0, dtype=np.int64)
+        self.delta_tree = _make_tree(self.delta) if len(self.delta) else None
+
+    @classmethod
+    def build(cls, df):
+        vectors, rows = listing_vectors(df)
+        return cls(_make_tree(vectors), rows, len(df), prefix_signature(df, len(df)))
+
+    def save(self, path=INDEX_PATH):
+        import joblib
+        joblib.dump(self, path)
+
+    # Índice guardado, o None si no existe, no se puede leer o es de otra versión
+    @staticmethod
+    def load(path=INDEX_PATH):
+        import joblib
+        if not os.path.exists(path):
+            return None
+        try:
+            index = joblib.load(path)
+        except Exception:
+            return None
+        return index if getattr(index, "version", None) == INDEX_VERSION else None
+
+    # Pone el índice al día con el dataset. Devuelve "actual", "incremental" o
+    # "reconstruido" según lo que haya hecho falta
+    def update(self, df):
+        if len(df) == self.n_rows and prefix_signature(df, self.n_rows) == self.signature:
+            return self, "actual"
+        if len(df) < self.n_rows or prefix_signature(df, self.n_rows) != self.signature:
+            return ComparablesIndex.build(df), "reconstruido"
+
+        vectors, rows = listing_vectors(df, start=self.n_rows)
+        delta = np.vstack([self.delta, vectors])
+        delta_rows = np.concatenate([self.delta_rows, rows])
+        if len(delta) > REBUILD_FRACTION * len(self.rows):
+            return ComparablesIndex.build(df), "reconstruido"
+        signature = prefix_signature(df, len(df))
+        return ComparablesIndex(self.tree, self.rows, len(df), signature, delta, delta_rows), "incremental"
+
+    # Las k viviendas más cercanas al vector: (posiciones en el dataset, distancias)
+    def query(self, vector, k=K):
+        k_tree = min(k, len(self.rows))
+        dist, idx = self.tree.query(vector, k=k_tree)
+        dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+        rows = self.rows[idx]
+        if self.delta_tree is not None:
+            d_delta, i_delta = self.delta_tree.query(vector, k=min(k, len(self.delta_rows)))
+            dist = np.concatenate([dist, np.atleast_1d(d_delta)])
+            rows = np.concatenate([rows, self.delta_rows[np.atleast_1d(i_delta)]])
+            order = np.argsort(dist, kind="stable")[:k]
+            dist, rows = dist[order], rows[order]
+        return rows, dist
+
+
+# Índice compartido por el proceso; se carga del disco y se actualiza (y se
+# vuelve a guardar) si el dataset de viviendas ha cambiado
+_index = None
+_dataset = None
+_lock = threading.Lock()
+
+
+def get_index(path=INDEX_PATH):
+    global _index, _dataset
+    df = load_dataset("modelos")
+    if _index is not None and _dataset is df:
+        return _index, df
+
+    with _lock:
+        if _index is None or _dataset is not df:
+            index = _index if _index is not None else ComparablesIndex.load(path)
+            if index is None:
+                index, estado = ComparablesIndex.build(df), "reconstruido"
+            else:
+                index, estado = index.update(df)
+            if estado != "actual":
+                try:
+                    index.save(path)
+                except OSError:
+                    pass
+            _index, _dataset = index, df
+    return _index, df
+
+
+# Tabla de comparables para mostrar junto a la predicción
+def find_comparables(vivienda, k=K, path=INDEX_PATH):
+    index, df = get_index(path)
+    rows, dist = index.query(query_vector(vivienda), k)
+    result = df.iloc[rows][["Price", "Surface", "Rooms", "Bathrooms", "Floor", "Latitude", "Longitude"]].copy()
+    dlat = (result["Latitude"].to_numpy() - float(vivienda["Latitude"])) * KM_LAT
+    dlon = (result["Longitude"].to_numpy() - float(vivienda["Longitude"])) * KM_LON
+    result["Distancia_km"] = np.sqrt(dlat ** 2 + dlon ** 2)
+    result["€/m²"] = result["Price"].to_numpy(dtype=np.float64) / result["Surface"].to_numpy(dtype=np.float64)
+    result["Similitud"] = 1 / (1 + dist)
+    return result.reset_index(drop=True)
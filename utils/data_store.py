@@ -0,0 +1,127 @@
+#Librerías
+import os
+import threading
+
+import pandas as pd
+
+DATA_DIR = "data"
+STORE_DIR = os.path.join(DATA_DIR, "store")
+
+AMENITIES = ["Elevator", "Air_Conditioner", "Heater", "Parking", "Balcony", "Terrace", "Swimming_Pool"]
+
+_MUNICIPIOS = {
+    "Municipio": "category",
+    "Valor_Tasado": "float32",
+    "Num_Tasaciones": "int32",
+    "Periodo": "category",
+    "Trimestre": "uint8",
+    "Año": "int16",
+    "Mes": "uint8"}
+
+_MODELOS = {
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "Price": "float32",
+    "Rooms": "int8",
+    "Bathrooms": "int8",
+    "Surface": "int16",
+    "Floor": "int8",
+    **{c: "uint8" for c in AMENITIES}}
+
+# Esquema fijo de cada dataset (columnas de fecha aparte)
+SCHEMAS = {
+    "municipios": _MUNICIPIOS,
+    "medias": {
+        "Region": "category",
+        "Año": "int16",
+        "Trimestre": "uint8",
+        "Valor_Tasado": "float32"},
+    "distritos": {
+        "Distrito": "category",
+        "Año": "int16",
+        "€/m²": "float32"},
+    "precios_municipios": {
+        **_MUNICIPIOS,
+        "Valor_Tasado_Madrid": "float32",
+        "Valor_Tasado_España": "float32",
+        "Dif_Madrid": "float32",
+        "Dif_España": "float32",
+        "Pct_Madrid": "float32",
+        "Pct_España": "float32"},
+    "modelos": _MODELOS,
+    "modelos_final": {
+        **_MODELOS,
+        "log_price": "float32",
+        "log_surface": "float32"},
+}
+
+DATE_COLUMNS = {
+    "municipios": ["Fecha"],
+    "medias": ["Fecha"],
+    "precios_municipios": ["Fecha"],
+}
+
+# Caché del proceso: nombre -> (mtime, DataFrame)
+_cache = {}
+_lock = threading.Lock()
+
+
+def csv_path(name):
+    return os.path.join(DATA_DIR, f"{name}.csv")
+
+
+def store_path(name):
+    return os.path.join(STORE_DIR, f"{name}.feather")
+
+
+# Lectura del CSV aplicando el esquema fijo
+def read_csv_typed(name):
+    df = pd.read_csv(csv_path(name), parse_dates=DATE_COLUMNS.get(name, []))
+    return df.astype(SCHEMAS[name])
+
+
+# Convierte un CSV a Feather sin comprimir (se puede leer con memory map)
+def convert(name):
+    import pyarrow.feather as feather
+    os.makedirs(STORE_DIR, exist_ok=True)
+    df = read_csv_typed(name)
+    feather.write_feather(df, store_path(name), compression="uncompressed")
+    return df
+
+
+def convert_all():
+    return {name: convert(name) for name in SCHEMAS}
+
+
+def _read_store(name):
+    import pyarrow.feather as feather
+    table = feather.read_table(store_path(name), memory_map=True)
+    return table.to_pandas()
+
+
+# Carga un dataset una vez por proceso desde el almacén Feather (o desde el CSV
+# con el esquema tipado si todavía no se ha convertido). Se vuelve a leer si
+# cambia el fichero.
+def load_dataset(name):
+    if name not in SCHEMAS:
+        raise KeyError(f"Dataset desconocido: {name}")
+
+    use_store = os.path.exists(store_path(name))
+    mtime = os.path.getmtime(store_path(name) if use_store else csv_path(name))
+
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(name)
+        if cached is None or cached[0] != mtime:
+            df = _read_store(name) if use_store else read_csv_typed(name)
+            cached = (mtime, df)
+            _cache[name] = cached
+    return cached[1]
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
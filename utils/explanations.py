@@ -0,0 +1,205 @@
+#Librerías
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.features import FEATURES
+from utils.model_registry import MODEL_PATH, file_signature, get_entry
+from utils.prediction_cache import COORD_DECIMALS
+
+# Nombre mostrado de cada variable; latitud y longitud se agrupan en "Ubicación"
+FACTORES = {
+    "log_surface": "Superficie",
+    "Rooms": "Habitaciones",
+    "Bathrooms": "Baños",
+    "Floor": "Planta",
+    "Latitude": "Ubicación",
+    "Longitude": "Ubicación",
+    "Elevator": "Ascensor",
+    "Air_Conditioner": "Aire acondicionado",
+    "Heater": "Calefacción",
+    "Parking": "Parking",
+    "Balcony": "Balcón",
+    "Terrace": "Terraza",
+    "Swimming_Pool": "Piscina",
+}
+GRUPOS = list(dict.fromkeys(FACTORES.values()))
+# Matriz variable -> factor para agrupar las contribuciones con un producto
+_AGRUPAR = np.array([[FACTORES[f] == g for g in GRUPOS] for f in FEATURES], dtype=np.float64)
+
+# Filas de modelos_final usadas para las importancias globales
+GLOBAL_SAMPLE = 2000
+
+
+def importances_path(model_path=MODEL_PATH):
+    return os.path.splitext(model_path)[0] + "_importancias.csv"
+
+
+# Las importancias se firman con el .pkl (el .npz exportado lleva la misma firma)
+def _source_model(model_path):
+    return os.path.splitext(model_path)[0] + ".pkl"
+
+
+# Contribuciones de un lote: (n, variables) en log-precio y el valor base; la
+# suma de ambos es la predicción. Con el booster de XGBoost son las de TreeSHAP
+# exacto (pred_contribs). El ensamble compacto de NumPy solo calcula las de
+# Saabas, una aproximación que atribuye más efecto a las variables de los cortes
+# cercanos a la raíz
+def contributions(booster, X):
+    if is_approximate(booster):
+        return booster.contributions(X)
+    import xgboost as xgb
+    contribs = booster.predict(xgb.DMatrix(np.asarray(X, dtype=np.float32)), pred_contribs=True)
+    return contribs[:, :-1], contribs[:, -1]
+
+
+def is_approximate(booster):
+    return hasattr(booster, "contributions")
+
+
+def group_contributions(contribs):
+    return np.asarray(contribs, dtype=np.float64) @ _AGRUPAR
+
+
+# Caché LRU de explicaciones por vector de variables cuantizado (misma clave que
+# la caché de predicciones). Los vectores que faltan se calculan en una sola
+# llamada a contributions con el mismo modelo que da el precio (aproximadas si
+# es el compacto, ver approximate()). Se vacía sola cuando cambia el modelo.
+class ExplanationCache:
+    def __init__(self, model_path=MODEL_PATH, maxsize=5_000, coord_decimals=COORD_DECIMALS):
+        self.model_path = model_path
+        self.maxsize = maxsize
+        self.coord_decimals = coord_decimals
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def quantize(self, features):
+        values = []
+        for name in FEATURES:
+            value = float(features[name])
+            if name in ("Latitude", "Longitude"):
+                value = round(value, self.coord_decimals)
+            values.append(value)
+        return tuple(values)
+
+    # Contribuciones agrupadas por factor para una lista de viviendas:
+    # (n, len(GRUPOS)) en log-precio y el valor base
+    def explain_many(self, features_list):
+        entry = get_entry(self.model_path)
+        keys = [self.quantize(f) for f in features_list]
+        out = np.empty((len(keys), len(GRUPOS)), dtype=np.float64)
+        missing = []
+        base = None
+
+        with self._lock:
+            version = (entry.path, entry.mtime)
+            if version != self._version:
+                self._data.clear()
+                self._version = version
+            for i, key in enumerate(keys):
+                cached = self._data.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._data.move_to_end(key)
+                    out[i] = cached[0]
+                    base = cached[1]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            contribs, bias = contributions(entry.booster, [keys[i] for i in missing])
+            grouped = group_contributions(contribs)
+            base = float(bias[0])
+            with self._lock:
+                for i, row in zip(missing, grouped):
+                    out[i] = row
+                    self._data[keys[i]] = (row, base)
+                    self._data.move_to_end(keys[i])
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return out, base
+
+    def approximate(self):
+        return is_approximate(get_entry(self.model_path).booster)
+
+    # Tabla de factores de una vivienda ordenada por efecto absoluto
+    def explain(self, features):
+        grouped, base = self.explain_many([features])
+        return explanation_table(grouped[0]), base
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "Aciertos": self.hits,
+            "Fallos": self.misses,
+            "Tasa de acierto (%)": round(100 * self.hits / total, 1) if total else 0.0,
+            "Entradas": len(self._data)}
+
+
+# Efecto de cada factor en log-precio y como porcentaje sobre el precio
+def explanation_table(grouped):
+    grouped = np.asarray(grouped, dtype=np.float64)
+    order = np.argsort(-np.abs(grouped), kind="stable")
+    return pd.DataFrame({
+        "Factor": np.asarray(GRUPOS)[order],
+        "Efecto_log": grouped[order],
+        "Efecto_%": np.expm1(grouped[order]) * 100})
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_explanation_cache(model_path=MODEL_PATH):
+    with _caches_lock:
+        if model_path not in _caches:
+            _caches[model_path] = ExplanationCache(model_path)
+        return _caches[model_path]
+
+
+# Importancia global de cada factor sobre una muestra de modelos_final: media del
+# efecto absoluto y media con signo (en log-precio). Se calcula con TreeSHAP
+# exacto sobre el booster del .pkl, no con el modelo compacto
+def global_importances(model_path=MODEL_PATH, n=GLOBAL_SAMPLE, seed=42):
+    from utils.training import load_training_data
+
+    X, _ = load_training_data()
+    rng = np.random.default_rng(seed)
+    if n and n < len(X):
+        X = X[np.sort(rng.choice(len(X), n, replace=False))]
+    contribs, _ = contributions(get_entry(_source_model(model_path)).booster, X)
+    grouped = group_contributions(contribs)
+    df = pd.DataFrame({
+        "Factor": GRUPOS,
+        "Importancia": np.abs(grouped).mean(axis=0),
+        "Efecto_medio": grouped.mean(axis=0)})
+    df = df.sort_values("Importancia", ascending=False).reset_index(drop=True)
+    df.attrs["firma"] = file_signature(_source_model(model_path))
+    return df
+
+
+def save_importances(df, model_path=MODEL_PATH):
+    with open(importances_path(model_path), "w", encoding="utf-8", newline="") as f:
+        f.write(f"# firma={df.attrs.get('firma', '')}\n")
+        df.to_csv(f, index=False)
+
+
+# Importancias precalculadas, o None si no existen o son de otra versión del modelo
+def load_importances(model_path=MODEL_PATH):
+    path = importances_path(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        firma = f.readline().strip().partition("firma=")[2]
+        df = pd.read_csv(f)
+    source = _source_model(model_path)
+    if os.path.exists(source) and firma != file_signature(source):
+        return None
+    return df
@@ -0,0 +1,120 @@
+#Librerías
+import numpy as np
+import pandas as pd
+
+# Columnas del modelo en el orden en que las recibe el booster de XGBoost
+# (salida del ColumnTransformer del pipeline: numéricas y después binarias)
+NUM_FEATURES = ["log_surface", "Rooms", "Bathrooms", "Floor", "Latitude", "Longitude"]
+BIN_FEATURES = ["Elevator", "Air_Conditioner", "Heater", "Parking", "Balcony", "Terrace", "Swimming_Pool"]
+FEATURES = NUM_FEATURES + BIN_FEATURES
+
+TARGET = "log_price"
+
+# Rangos admitidos (inclusive) para las variables numéricas; la localización
+# exacta se comprueba aparte con los polígonos de utils.spatial
+RANGES = {
+    "Surface": (1, 10_000),
+    "log_surface": (0.0, np.log(10_000)),
+    "Rooms": (0, 50),
+    "Bathrooms": (0, 50),
+    "Floor": (-5, 80),
+    "Latitude": (-90, 90),
+    "Longitude": (-180, 180),
+}
+
+
+# Columna como array numérico sin copiar si ya lo es; texto o fechas no se admiten.
+# Los tipos nulables de pandas (Int64, Float64, boolean) pasan a float con NaN en
+# los huecos, para que esas filas queden como no válidas
+def _column(data, name):
+    values = data[name]
+    if isinstance(values, pd.Series):
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+            raise ValueError(f"La columna '{name}' debe ser numérica.")
+        if isinstance(values.dtype, pd.api.extensions.ExtensionDtype) and (
+                pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype)):
+            values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = values.to_numpy()
+    values = np.asarray(values)
+    if values.dtype.kind not in "biuf":
+        raise ValueError(f"La columna '{name}' debe ser numérica (tipo {values.dtype}).")
+    return values
+
+
+# Filas por bloque al rellenar la matriz (el bloque cabe en caché, así que las
+# escrituras por columna y las comprobaciones no generan temporales grandes)
+BLOCK_ROWS = 65_536
+
+
+# Matriz del modelo (float32, contigua, orden FEATURES) construida por columnas.
+# Se reserva una sola vez y cada variable se escribe directamente en su columna,
+# así que la única copia de los datos es la propia matriz. data puede ser un
+# DataFrame o un dict de arrays; log_surface se deriva de Surface si no viene.
+# Devuelve (X, valida): las filas con huecos o fuera de rango quedan marcadas
+# como no válidas en lugar de lanzar un error (NaN e infinitos no cumplen
+# ningún rango, así que no hace falta comprobarlos aparte).
+def feature_matrix(data, out=None):
+    columns = data.columns if isinstance(data, pd.DataFrame) else data.keys()
+    faltan = [c for c in FEATURES if c not in columns and not (c == "log_surface" and "Surface" in columns)]
+    if faltan:
+        raise ValueError("Faltan columnas del modelo: " + ", ".join(faltan))
+
+    # (columna de origen, array, rango admitido; None = binaria 0/1)
+    sources = []
+    for name in FEATURES:
+        source = "Surface" if name == "log_surface" and "log_surface" not in columns else name
+        sources.append((source, _column(data, source), RANGES.get(source)))
+
+    n = len(sources[0][1])
+    for source, values, _ in sources:
+        if len(values) != n:
+            raise ValueError(f"La columna '{source}' no tiene {n} filas.")
+    X = out if out is not None else np.empty((n, len(FEATURES)), dtype=np.float32)
+    if X.shape != (n, len(FEATURES)) or X.dtype != np.float32 or not X.flags.c_contiguous:
+        raise ValueError("La matriz de salida debe ser float32, contigua y de forma (n, 13).")
+    valid = np.ones(n, dtype=bool)
+
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, n)
+        ok = valid[start:stop]
+        for j, (source, values, bounds) in enumerate(sources):
+            v = values[start:stop]
+            if source == "Surface":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    X[start:stop, j] = np.log(v, dtype=np.float64)
+            else:
+                X[start:stop, j] = v
+            if bounds is None:
+                ok &= (v == 0) | (v == 1)
+            else:
+                ok &= (v >= bounds[0]) & (v <= bounds[1])
+    return X, valid
+
+
+# Variables de una sola vivienda (página y servicio): mismos cálculos que el
+# lote, pero un valor fuera de rango es un error
+def vivienda_features(vivienda):
+    data = {k: np.asarray([v if not isinstance(v, bool) else int(v)], dtype=np.float64)
+            for k, v in vivienda.items() if k in FEATURES or k == "Surface"}
+    for c in BIN_FEATURES:
+        data.setdefault(c, np.zeros(1))
+        data[c] = (data[c] != 0).astype(np.float64)
+    X, valid = feature_matrix(data)
+    if not valid[0]:
+        malas = [c for c, v in zip(FEATURES, X[0]) if not np.isfinite(v)]
+        raise ValueError("Valores fuera de rango o no válidos" + (": " + ", ".join(malas) if malas else "."))
+    return X
+
+
+# Diferencias absolutas y porcentuales de cada municipio frente a las medias
+# de la Comunidad de Madrid y de España (columnas Dif_* y Pct_*)
+def add_comparisons(df):
+    valor = df["Valor_Tasado"].to_numpy(dtype=np.float64)
+    regiones = ["Madrid", "España"]
+    medias = {r: df[f"Valor_Tasado_{r}"].to_numpy(dtype=np.float64) for r in regiones}
+    for r in regiones:
+        df[f"Dif_{r}"] = valor - medias[r]
+    for r in regiones:
+        df[f"Pct_{r}"] = (valor - medias[r]) / medias[r] * 100
+    return df
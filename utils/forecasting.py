@@ -0,0 +1,254 @@
+#Librerías
+import hashlib
+import json
+import os
+import threading
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import STORE_DIR, load_dataset
+
+# Versión del formato de los parámetros guardados (otra versión se reajusta entera)
+FORECAST_VERSION = 1
+LEVEL = 0.9
+
+# Series que se predicen: dataset, columna que identifica la serie, valor,
+# columna de tiempo, periodos por año y horizontes servidos (próximo periodo y
+# próximo año)
+SERIES = {
+    "municipios": {"dataset": "municipios", "serie": "Municipio", "valor": "Valor_Tasado",
+                   "tiempo": "Fecha", "periodos_año": 4},
+    "distritos": {"dataset": "distritos", "serie": "Distrito", "valor": "€/m²",
+                  "tiempo": "Año", "periodos_año": 1},
+}
+
+# Rejilla de parámetros del modelo de Holt amortiguado (suavizado del nivel,
+# de la tendencia y amortiguación)
+ALPHAS = np.linspace(0.05, 1.0, 20)
+BETAS = np.linspace(0.0, 0.5, 11)
+PHIS = np.array([0.8, 0.9, 0.95, 0.98, 1.0])
+_GRID = np.array(np.meshgrid(ALPHAS, BETAS, PHIS, indexing="ij")).reshape(3, -1)
+
+# Observaciones nuevas que se incorporan solo actualizando el estado; al llegar
+# a esta cantidad desde el último ajuste se vuelven a optimizar los parámetros
+REFIT_EVERY = 8
+# Observaciones mínimas para ajustar una serie
+MIN_OBS = 4
+# El ajuste completo se reparte entre procesos a partir de este número de
+# series (por debajo arrancar el pool cuesta más que el propio ajuste)
+PARALLEL_MIN_SERIES = 256
+# Series por tarea del pool de procesos
+CHUNK = 64
+
+
+def forecast_path(nivel):
+    return os.path.join(STORE_DIR, f"previsiones_{nivel}.json")
+
+
+# Series en log como arrays alineados sobre todos los periodos del dataset
+# (NaN donde falta un periodo); devuelve (periodos, {serie: valores})
+def load_series(nivel, df=None):
+    cfg = SERIES[nivel]
+    df = load_dataset(cfg["dataset"]) if df is None else df
+    tabla = df.pivot_table(index=cfg["tiempo"], columns=cfg["serie"], values=cfg["valor"],
+                           aggfunc="mean", observed=True).sort_index()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valores = np.log(tabla.to_numpy(dtype=np.float64))
+    return tabla.index, {str(c): valores[:, j] for j, c in enumerate(tabla.columns)}
+
+
+# Huella de los primeros n valores de una serie (para saber si solo se han añadido periodos)
+def prefix_signature(y, n):
+    return hashlib.sha1(np.round(y[:n], 9).tobytes()).hexdigest()
+
+
+# Recursiones de Holt amortiguado en forma de corrección del error para una o
+# varias combinaciones de parámetros a la vez. Los huecos (NaN) avanzan la
+# previsión sin actualizar. Devuelve el estado final y la suma de errores al cuadrado
+def _holt(y, alpha, beta, phi, level, trend, sse, n_err):
+    for value in y:
+        pred = level + phi * trend
+        if np.isnan(value):
+            level, trend = pred, phi * trend
+            continue
+        error = value - pred
+        sse = sse + error ** 2
+        n_err += 1
+        level = pred + alpha * error
+        trend = phi * trend + alpha * beta * error
+    return level, trend, sse, n_err
+
+
+# Ajuste completo de una serie: la combinación de la rejilla con menor error a
+# un paso (todas las combinaciones se evalúan juntas con operaciones vectoriales)
+def fit_series(y):
+    start = int(np.flatnonzero(~np.isnan(y))[0])
+    y = y[start:]
+    alpha, beta, phi = _GRID
+    ones = np.ones_like(alpha)
+    level, trend, sse, n_err = _holt(y[1:], alpha, beta, phi, y[0] * ones, 0 * ones, 0 * ones, 0)
+    best = int(np.argmin(sse))
+    return {
+        "alpha": float(alpha[best]), "beta": float(beta[best]), "phi": float(phi[best]),
+        "nivel": float(level[best]), "tendencia": float(trend[best]),
+        "sse": float(sse[best]), "n_err": n_err,
+        "inicio": start, "n": start + len(y), "desde_ajuste": 0,
+        "firma": prefix_signature(y, len(y))}
+
+
+def _fit_chunk(items):
+    return [(name, fit_series(y)) for name, y in items]
+
+
+# Ajuste completo de varias series repartido entre procesos
+def fit_many(series, n_jobs=-1):
+    items = list(series.items())
+    if n_jobs == 1 or len(items) < PARALLEL_MIN_SERIES:
+        return dict(_fit_chunk(items))
+    from joblib import Parallel, delayed
+    chunks = [items[i:i + CHUNK] for i in range(0, len(items), CHUNK)]
+    return dict(pair for result in Parallel(n_jobs=n_jobs)(delayed(_fit_chunk)(c) for c in chunks)
+                for pair in result)
+
+
+# Incorpora los periodos nuevos al estado sin volver a optimizar los parámetros
+def update_state(state, y):
+    nuevos = y[state["n"]:]
+    level, trend, sse, n_err = _holt(nuevos, state["alpha"], state["beta"], state["phi"],
+                                     state["nivel"], state["tendencia"], state["sse"], state["n_err"])
+    state = dict(state, nivel=float(level), tendencia=float(trend), sse=float(sse), n_err=n_err,
+                 n=len(y), desde_ajuste=state["desde_ajuste"] + len(nuevos))
+    state["firma"] = prefix_signature(y[state["inicio"]:], len(y) - state["inicio"])
+    return state
+
+
+# Estado de cada serie de un nivel al día con los datos. Solo se reajustan las
+# series nuevas, las que han cambiado en el pasado o las que acumulan
+# REFIT_EVERY periodos sin optimizar; el resto se actualiza en O(periodos nuevos).
+# Devuelve (estados, resumen con el número de series de cada tipo)
+def update_level(nivel, stored=None, force=False, n_jobs=-1, df=None):
+    periodos, series = load_series(nivel, df)
+    states = {} if force or stored is None or stored.get("version") != FORECAST_VERSION \
+        else stored.get("series", {})
+    resumen = {"actual": 0, "incremental": 0, "reajuste": 0, "sin datos": 0}
+    nuevos = {}
+    pendientes = {}
+
+    for name, y in series.items():
+        if np.count_nonzero(~np.isnan(y)) < MIN_OBS:
+            resumen["sin datos"] += 1
+            continue
+        state = states.get(name)
+        if state is not None and len(y) >= state["n"] \
+                and prefix_signature(y[state["inicio"]:], state["n"] - state["inicio"]) == state["firma"]:
+            if len(y) == state["n"]:
+                nuevos[name] = state
+                resumen["actual"] += 1
+                continue
+            if state["desde_ajuste"] + len(y) - state["n"] < REFIT_EVERY:
+                nuevos[name] = update_state(state, y)
+                resumen["incremental"] += 1
+                continue
+        pendientes[name] = y
+        resumen["reajuste"] += 1
+
+    nuevos.update(fit_many(pendientes, n_jobs))
+    ultimo = periodos[-1]
+    return {
+        "version": FORECAST_VERSION,
+        "nivel": nivel,
+        "ultimo_periodo": str(ultimo.date()) if isinstance(ultimo, pd.Timestamp) else int(ultimo),
+        "series": dict(sorted(nuevos.items()))}, resumen
+
+
+def save_forecasts(data, nivel):
+    with open(forecast_path(nivel), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def _read_forecasts(nivel):
+    try:
+        with open(forecast_path(nivel), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Pone al día y guarda los parámetros de todos los niveles; devuelve el resumen de cada uno
+def update_forecasts(niveles=None, force=False, n_jobs=-1):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    resumenes = {}
+    for nivel in niveles or SERIES:
+        data, resumen = update_level(nivel, _read_forecasts(nivel), force, n_jobs)
+        if force or resumen["incremental"] or resumen["reajuste"]:
+            save_forecasts(data, nivel)
+        resumenes[nivel] = resumen
+    return resumenes
+
+
+# Previsión h periodos por delante en log-precio y su desviación típica
+# (varianza del modelo de Holt amortiguado con errores de un paso gaussianos)
+def forecast_log(state, h):
+    phi = state["phi"]
+    acumulado = np.cumsum(phi ** np.arange(1, h + 1))
+    media = state["nivel"] + acumulado * state["tendencia"]
+    sigma2 = state["sse"] / max(state["n_err"] - 3, 1)
+    c = state["alpha"] * (1 + state["beta"] * acumulado[:-1])
+    desviacion = np.sqrt(sigma2 * (1 + np.concatenate([[0.0], np.cumsum(c ** 2)])))
+    return media, desviacion
+
+
+def _future_periods(data, h):
+    cfg = SERIES[data["nivel"]]
+    ultimo = data["ultimo_periodo"]
+    if cfg["tiempo"] == "Fecha":
+        return list(pd.date_range(pd.Timestamp(ultimo), periods=h + 1, freq="QE")[1:])
+    return [int(ultimo) + i for i in range(1, h + 1)]
+
+
+# Previsiones hasta un año vista con su intervalo: una fila por serie y periodo
+def forecast_table(data, nombres=None, level=LEVEL):
+    cfg = SERIES[data["nivel"]]
+    h = cfg["periodos_año"]
+    periodos = _future_periods(data, h)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    sufijo = f"{round(level * 100)}"
+    filas = []
+    for name in nombres if nombres is not None else data["series"]:
+        state = data["series"].get(name)
+        if state is None:
+            continue
+        media, desviacion = forecast_log(state, h)
+        for i, periodo in enumerate(periodos):
+            filas.append((name, periodo, i + 1, np.exp(media[i]),
+                          np.exp(media[i] - z * desviacion[i]), np.exp(media[i] + z * desviacion[i])))
+    return pd.DataFrame(filas, columns=[
+        cfg["serie"], cfg["tiempo"], "Horizonte", "Prevision", f"Min_{sufijo}", f"Max_{sufijo}"])
+
+
+# Parámetros compartidos por el proceso: se leen del disco y, si el dataset ha
+# cambiado, se ponen al día (incrementalmente) y se vuelven a guardar
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_forecasts(nivel):
+    df = load_dataset(SERIES[nivel]["dataset"])
+    cached = _cache.get(nivel)
+    if cached is not None and cached[0] is df:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(nivel)
+        if cached is None or cached[0] is not df:
+            data, resumen = update_level(nivel, _read_forecasts(nivel), n_jobs=1, df=df)
+            if resumen["incremental"] or resumen["reajuste"]:
+                try:
+                    save_forecasts(data, nivel)
+                except OSError:
+                    pass
+            cached = (df, data)
+            _cache[nivel] = cached
+    return cached[1]
@@ -0,0 +1,207 @@
+#Librerías
+import json
+
+import pandas as pd
+
+# Fichero original del IGN (una geometría por municipio y año) y tablas derivadas
+LIMITES_PATH = "data/limites_madrid.geojson"
+GEOMETRIAS_PATH = "data/limites_geometrias.geojson"
+VALORES_PATH = "data/limites_valores.csv"
+
+# Propiedades que dependen solo del municipio (se guardan con la geometría)
+GEOM_PROPS = [
+    "INSPIREID", "COUNTRY", "NATLEV", "NATLEVNAME", "NATCODE", "NAMEUNIT",
+    "CODNUT1", "CODNUT2", "CODNUT3", "muni_key"]
+
+# Columnas de la tabla de valores año x municipio
+VALOR_COLS = ["NATCODE", "muni_key", "NAMEUNIT", "Año", "Valor_Tasado"]
+
+
+# Separar el geojson original en geometrías únicas y tabla de valores
+def split_limites(geojson):
+    geometrias = {}
+    filas = []
+    for feature in geojson["features"]:
+        props = feature["properties"]
+        key = props["muni_key"]
+        if key not in geometrias:
+            geometrias[key] = {
+                "type": "Feature",
+                "id": key,
+                "properties": {p: props[p] for p in GEOM_PROPS},
+                "geometry": feature["geometry"]}
+        filas.append({c: props[c] for c in VALOR_COLS})
+
+    geom_geojson = {
+        "type": "FeatureCollection",
+        "name": geojson.get("name", "municipios_madrid"),
+        "features": list(geometrias.values())}
+    if "crs" in geojson:
+        geom_geojson["crs"] = geojson["crs"]
+
+    valores = (
+        pd.DataFrame(filas, columns=VALOR_COLS)
+        .sort_values(["muni_key", "Año"])
+        .reset_index(drop=True))
+    return geom_geojson, valores
+
+
+def build_limites(src=LIMITES_PATH, geom_out=GEOMETRIAS_PATH, valores_out=VALORES_PATH):
+    with open(src, "r", encoding="utf-8") as f:
+        geojson = json.load(f)
+    geom_geojson, valores = split_limites(geojson)
+    with open(geom_out, "w", encoding="utf-8") as f:
+        json.dump(geom_geojson, f, ensure_ascii=False, separators=(",", ":"))
+    valores.to_csv(valores_out, index=False)
+    return geom_geojson, valores
+
+
+def load_geometrias(path=GEOMETRIAS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_valores(path=VALORES_PATH):
+    return pd.read_csv(path, dtype={"NATCODE": str})
+
+
+# Tabla de valores con los atributos de cada municipio, sin geometría
+def load_limites_tabla(geom_path=GEOMETRIAS_PATH, valores_path=VALORES_PATH):
+    geojson = load_geometrias(geom_path)
+    props = pd.DataFrame([f["properties"] for f in geojson["features"]])
+    valores = load_valores(valores_path)
+    return props.merge(valores[["muni_key", "Año", "Valor_Tasado"]], on="muni_key")
+
+
+# Niveles de detalle de las geometrías: tolerancia de simplificación (grados)
+# y decimales con los que se guardan las coordenadas
+NIVELES = {
+    "alto": {"tolerancia": 0.0, "decimales": 6},
+    "medio": {"tolerancia": 0.002, "decimales": 5},
+    "bajo": {"tolerancia": 0.005, "decimales": 4}}
+
+
+def geometrias_path(nivel="alto"):
+    if nivel == "alto":
+        return GEOMETRIAS_PATH
+    return GEOMETRIAS_PATH.replace(".geojson", f"_{nivel}.geojson")
+
+
+# Nivel de detalle adecuado para el zoom del mapa
+def nivel_para_zoom(zoom):
+    if zoom >= 10:
+        return "alto"
+    if zoom >= 8:
+        return "medio"
+    return "bajo"
+
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+# Douglas-Peucker sobre un arco manteniendo fijos sus extremos
+def _simplify_arc(arc, tolerance):
+    import shapely
+    if len(arc) <= 2 or tolerance <= 0:
+        return arc
+    line = shapely.simplify(shapely.LineString(arc), tolerance, preserve_topology=False)
+    return [tuple(p) for p in shapely.get_coordinates(line)]
+
+
+# Simplificación que conserva las fronteras compartidas: cada anillo se corta en
+# arcos por los nodos (puntos donde cambia el conjunto de anillos que lo comparten)
+# y cada arco se simplifica una sola vez, igual para todos los polígonos que lo usan.
+def simplify_geojson(geojson, tolerance, decimals=6):
+    import shapely
+
+    rings = []
+    for feature in geojson["features"]:
+        for polygon in _polygons(feature["geometry"]):
+            for ring in polygon:
+                rings.append([tuple(p) for p in ring[:-1]])
+
+    anillos_de = {}
+    for i, ring in enumerate(rings):
+        for p in ring:
+            anillos_de.setdefault(p, set()).add(i)
+
+    arcos = {}
+
+    def simplify_canonical(arc):
+        key = tuple(arc)
+        rev = tuple(reversed(arc))
+        if rev < key:
+            return list(reversed(simplify_canonical(list(rev))))
+        if key not in arcos:
+            arcos[key] = _simplify_arc(arc, tolerance)
+        return arcos[key]
+
+    def simplify_ring(ring):
+        n = len(ring)
+        nodos = [
+            i for i in range(n)
+            if anillos_de[ring[i]] != anillos_de[ring[i - 1]]
+            or anillos_de[ring[i]] != anillos_de[ring[(i + 1) % n]]]
+        if not nodos:
+            # Anillo sin nodos: se fija su punto mínimo y una orientación canónica
+            nodos = [ring.index(min(ring))]
+
+        start = nodos[0]
+        ring = ring[start:] + ring[:start]
+        nodos = [i - start for i in nodos] + [n]
+        ring = ring + [ring[0]]
+
+        out = []
+        for a, b in zip(nodos[:-1], nodos[1:]):
+            arc = simplify_canonical(ring[a:b + 1])
+            out.extend(arc if not out else arc[1:])
+        if len(out) < 4:
+            return ring
+        return out
+
+    features = []
+    invalidos = 0
+    for feature in geojson["features"]:
+        polygons = []
+        for polygon in _polygons(feature["geometry"]):
+            nuevo = [
+                simplify_ring([tuple(p) for p in ring[:-1]])
+                for ring in polygon]
+            if not shapely.Polygon(nuevo[0], nuevo[1:]).is_valid:
+                invalidos += 1
+                nuevo = polygon
+            polygons.append([
+                [[round(x, decimals), round(y, decimals)] for x, y in ring]
+                for ring in nuevo])
+
+        geometry = (
+            {"type": "Polygon", "coordinates": polygons[0]}
+            if feature["geometry"]["type"] == "Polygon"
+            else {"type": "MultiPolygon", "coordinates": polygons})
+        features.append({**feature, "geometry": geometry})
+
+    return {**geojson, "features": features}, invalidos
+
+
+def count_vertices(geojson):
+    return sum(
+        len(ring)
+        for feature in geojson["features"]
+        for polygon in _polygons(feature["geometry"])
+        for ring in polygon)
+
+
+def build_niveles(src=GEOMETRIAS_PATH, niveles=NIVELES):
+    geojson = load_geometrias(src)
+    resultados = {}
+    for nivel, params in niveles.items():
+        if nivel == "alto":
+            continue
+        simple, invalidos = simplify_geojson(geojson, params["tolerancia"], params["decimales"])
+        with open(geometrias_path(nivel), "w", encoding="utf-8") as f:
+            json.dump(simple, f, ensure_ascii=False, separators=(",", ":"))
+        resultados[nivel] = (simple, invalidos)
+    return resultados
@@ -0,0 +1,284 @@
+#Librerías
+import difflib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+CACHE_PATH = "data/geocode_cache.sqlite"
+CALLEJERO_PATH = "data/callejero_madrid.csv"
+CACHE_MAX_ENTRIES = 50_000
+
+# Abreviaturas habituales de tipos de vía
+ABREVIATURAS = {
+    "c": "calle", "cl": "calle", "cll": "calle",
+    "av": "avenida", "avd": "avenida", "avda": "avenida",
+    "pza": "plaza", "pl": "plaza", "plz": "plaza",
+    "p": "paseo", "po": "paseo", "pso": "paseo",
+    "ctra": "carretera", "cra": "carretera",
+    "gta": "glorieta", "rda": "ronda", "trva": "travesia", "cmno": "camino"}
+
+TIPOS_VIA = set(ABREVIATURAS.values()) | {"costanilla", "cuesta", "pasaje", "via", "bulevar", "callejon"}
+
+# Palabras que no ayudan a identificar la vía
+RUIDO = {"madrid", "espana", "comunidad", "de", "del", "la", "las", "el", "los", "y"}
+
+
+@dataclass
+class GeocodeResult:
+    latitude: float
+    longitude: float
+    source: str
+    address: str = ""
+
+
+def _strip_accents(texto):
+    texto = unicodedata.normalize("NFKD", texto)
+    return texto.encode("ascii", "ignore").decode("ascii")
+
+
+# Dirección normalizada: sin tildes, en minúsculas, sin puntuación y con las
+# abreviaturas de tipo de vía expandidas
+def normalize_address(address):
+    texto = _strip_accents(str(address)).lower()
+    texto = texto.replace("º", " ").replace("ª", " ")
+    texto = re.sub(r"[^a-z0-9]+", " ", texto)
+    palabras = [ABREVIATURAS.get(p, p) for p in texto.split()]
+    return " ".join(palabras)
+
+
+# Separa tipo de vía, nombre y número de portal
+# ("calle de serrano 45" -> ("calle", "serrano", 45)). El tipo es la primera
+# palabra si es un tipo de vía conocido (None si no); en el resto del nombre
+# se conservan ("calle camino de vinateros" -> ("calle", "camino vinateros"))
+def split_street_number(normalized):
+    tipo = None
+    numero = None
+    palabras = []
+    for p in normalized.split():
+        if p.isdigit() and numero is None and palabras:
+            numero = int(p)
+            continue
+        if p in RUIDO:
+            continue
+        if tipo is None and not palabras and p in TIPOS_VIA:
+            tipo = p
+            continue
+        palabras.append(p)
+    return tipo, " ".join(palabras), numero
+
+
+# Clave de una vía: tipo canónico y nombre ("calle serrano"), o solo el nombre si no hay tipo
+def street_key(tipo, nombre):
+    return f"{tipo} {nombre}" if tipo and nombre else nombre
+
+
+# Caché persistente dirección normalizada -> coordenadas, con expulsión de las
+# entradas usadas hace más tiempo al superar max_entries
+class GeocodeCache:
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "key TEXT PRIMARY KEY, latitude REAL, longitude REAL, "
+            "source TEXT, address TEXT, last_used REAL)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latitude, longitude, source, address FROM geocode WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE geocode SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return GeocodeResult(row[0], row[1], row[2], row[3])
+
+    def put(self, key, result):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?)",
+                (key, result.latitude, result.longitude, result.source, result.address, time.time()))
+            n = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+            if n > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM geocode WHERE key IN "
+                    "(SELECT key FROM geocode ORDER BY last_used LIMIT ?)",
+                    (n - self.max_entries,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM geocode")
+            self._conn.commit()
+
+
+# Callejero local del Municipio de Madrid con búsqueda aproximada por nombre de vía.
+# Cada fila es un portal (via, numero, lat, lon); las filas sin número representan
+# la vía completa. Las vías se agrupan por tipo y nombre, así que "Calle de
+# Toledo" y "Ronda de Toledo" son vías distintas.
+class Gazetteer:
+    def __init__(self, df, min_ratio=0.8):
+        self.min_ratio = min_ratio
+        df = df.dropna(subset=["Latitude", "Longitude"])
+        claves = df["Via"].map(lambda v: street_key(*split_street_number(normalize_address(v))[:2]))
+
+        self.nombres = {}
+        self.portales = {}
+        # Nombre sin tipo -> claves de las vías con ese nombre
+        self._por_nombre = {}
+        for clave, grupo in df.assign(clave=claves).groupby("clave", sort=False):
+            numeros = pd.to_numeric(grupo["Numero"], errors="coerce").to_numpy()
+            self.nombres[clave] = str(grupo["Via"].iloc[0])
+            self.portales[clave] = (
+                numeros,
+                grupo["Latitude"].to_numpy(dtype=float),
+                grupo["Longitude"].to_numpy(dtype=float))
+            nombre = split_street_number(normalize_address(self.nombres[clave]))[1]
+            self._por_nombre.setdefault(nombre, []).append(clave)
+
+        # Índice de trigramas (sobre el nombre sin tipo) para limitar las comparaciones aproximadas
+        self._trigramas = {}
+        for nombre in self._por_nombre:
+            for t in self._grams(nombre):
+                self._trigramas.setdefault(t, []).append(nombre)
+
+    @classmethod
+    def from_csv(cls, path=CALLEJERO_PATH, **kwargs):
+        return cls(pd.read_csv(path), **kwargs)
+
+    @staticmethod
+    def _grams(texto):
+        texto = f"  {texto} "
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    # Vía con el mismo tipo y nombre; si no existe, se busca solo por nombre
+    # (exacto o aproximado) y, entre las vías con ese nombre, se prefiere la del
+    # tipo pedido o la primera
+    def match_street(self, tipo, nombre):
+        clave = street_key(tipo, nombre)
+        if clave in self.portales:
+            return clave, 1.0
+        if nombre in self._por_nombre:
+            mejor, ratio = nombre, 1.0
+        else:
+            votos = {}
+            for t in self._grams(nombre):
+                for candidato in self._trigramas.get(t, ()):
+                    votos[candidato] = votos.get(candidato, 0) + 1
+            candidatos = sorted(votos, key=votos.get, reverse=True)[:20]
+            mejor, ratio = None, 0.0
+            for candidato in candidatos:
+                r = difflib.SequenceMatcher(None, nombre, candidato).ratio()
+                if r > ratio:
+                    mejor, ratio = candidato, r
+            if ratio < self.min_ratio:
+                return None, ratio
+        claves = self._por_nombre[mejor]
+        tipadas = [c for c in claves if c == street_key(tipo, mejor)]
+        return (tipadas or claves)[0], ratio
+
+    def geocode(self, address):
+        tipo, nombre, numero = split_street_number(normalize_address(address))
+        if not nombre:
+            return None
+        clave, _ = self.match_street(tipo, nombre)
+        if clave is None:
+            return None
+
+        numeros, lats, lons = self.portales[clave]
+        con_numero = ~np.isnan(numeros)
+        if numero is not None and con_numero.any():
+            # Portal más cercano, preferiblemente de la misma acera (paridad)
+            misma_acera = con_numero & (numeros % 2 == numero % 2)
+            sel = misma_acera if misma_acera.any() else con_numero
+            idx = np.flatnonzero(sel)[np.argmin(np.abs(numeros[sel] - numero))]
+            lat, lon = lats[idx], lons[idx]
+            texto = f"{self.nombres[clave]} {int(numeros[idx])}"
+        else:
+            lat, lon = lats.mean(), lons.mean()
+            texto = self.nombres[clave]
+        return GeocodeResult(float(lat), float(lon), "callejero", texto)
+
+
+# Geocodificador en cascada: caché en disco -> callejero local -> servicio remoto
+# (opcional). Cualquier objeto con un método geocode(address) que devuelva algo con
+# latitude/longitude sirve como remoto, lo que permite sustituirlo en pruebas.
+class Geocoder:
+    def __init__(self, cache=None, gazetteer=None, remote=None):
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.remote = remote
+
+    # Clave de caché: tipo de vía, nombre y número normalizados, para que
+    # "C/ Serrano 45" y "Calle de Serrano, 45, Madrid" compartan entrada pero
+    # "Ronda de Toledo 12" y "Calle de Toledo 12" no
+    @staticmethod
+    def cache_key(address):
+        normalized = normalize_address(address)
+        tipo, nombre, numero = split_street_number(normalized)
+        if not nombre:
+            return normalized
+        via = street_key(tipo, nombre)
+        return via if numero is None else f"{via} {numero}"
+
+    def geocode(self, address):
+        key = self.cache_key(address)
+        if not key:
+            return None
+
+        if self.cache is not None:
+            result = self.cache.get(key)
+            if result is not None:
+                return GeocodeResult(result.latitude, result.longitude, "caché", result.address)
+
+        result = None
+        if self.gazetteer is not None:
+            result = self.gazetteer.geocode(address)
+
+        if result is None and self.remote is not None:
+            try:
+                location = self.remote.geocode(address)
+            except Exception:
+                location = None
+            if location is not None:
+                result = GeocodeResult(
+                    float(location.latitude), float(location.longitude), "remoto",
+                    str(getattr(location, "address", "")))
+
+        if result is not None and self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+
+# Nominatim como respaldo remoto, salvo que se desactive con GEOCODER_REMOTE=0
+def default_remote():
+    if os.environ.get("GEOCODER_REMOTE", "1") == "0":
+        return None
+    try:
+        from geopy.geocoders import Nominatim
+    except ImportError:
+        return None
+    return Nominatim(user_agent="tfg_real_state_app", timeout=5)
+
+
+def build_geocoder(cache_path=CACHE_PATH, callejero_path=CALLEJERO_PATH, remote="default"):
+    gazetteer = Gazetteer.from_csv(callejero_path) if os.path.exists(callejero_path) else None
+    if remote == "default":
+        remote = default_remote()
+    return Geocoder(GeocodeCache(cache_path), gazetteer, remote)
@@ -0,0 +1,123 @@
+#Librerías
+import json
+import os
+import threading
+
+import numpy as np
+
+from utils.model_registry import MODEL_PATH, file_signature
+from utils.training import N_SPLITS, RANDOM_STATE, load_training_data, make_model
+
+LEVELS = [0.8, 0.9, 0.95]
+LEVEL = 0.9
+N_BINS = 5
+
+
+# Tabla de calibración junto al modelo: modelo_xgb_final_intervalos.json (la
+# misma para el .pkl y para su versión compacta .npz)
+def intervals_path(model_path=MODEL_PATH):
+    return os.path.splitext(model_path)[0] + "_intervalos.json"
+
+
+def _source_model(model_path):
+    return os.path.splitext(model_path)[0] + ".pkl"
+
+
+def _fit_predict(X, y, train_idx, test_idx):
+    model = make_model("xgb")
+    model.fit(X[train_idx], y[train_idx])
+    return test_idx, model.predict(X[test_idx])
+
+
+# Predicciones fuera de pliegue: cada fila la predice un modelo (mismos
+# hiperparámetros que el final) que no la ha visto durante el ajuste
+def oof_predictions(X, y, n_splits=N_SPLITS, n_jobs=-1):
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    folds = KFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE).split(X)
+    pred = np.empty(len(y), dtype=np.float64)
+    for test_idx, p in Parallel(n_jobs=n_jobs)(
+            delayed(_fit_predict)(X, y, train_idx, test_idx) for train_idx, test_idx in folds):
+        pred[test_idx] = p
+    return pred
+
+
+# Cuantil conformal: el valor de orden ceil((n + 1) * nivel) de los residuos absolutos
+def conformal_quantile(resid, level):
+    resid = np.sort(np.abs(resid))
+    k = int(np.ceil((len(resid) + 1) * level)) - 1
+    return float(resid[min(k, len(resid) - 1)])
+
+
+# Tabla de calibración por tramos de predicción (conformal "Mondrian"): el ancho
+# del intervalo depende del nivel de precio predicho
+def build_table(pred, y, levels=LEVELS, n_bins=N_BINS):
+    resid = y - pred
+    edges = np.quantile(pred, np.linspace(0, 1, n_bins + 1)[1:-1])
+    bins = np.searchsorted(edges, pred, side="right")
+    return {
+        "metodo": "conformal por pliegues, por tramos de log-precio predicho",
+        "n_calibracion": int(len(y)),
+        "niveles": [float(l) for l in levels],
+        "cortes": edges.tolist(),
+        "cuantiles": {
+            f"{l:.2f}": [conformal_quantile(resid[bins == b], l) for b in range(n_bins)]
+            for l in levels},
+        "global": {f"{l:.2f}": conformal_quantile(resid, l) for l in levels},
+    }
+
+
+def calibrate(model_path=MODEL_PATH, levels=LEVELS, n_bins=N_BINS, n_splits=N_SPLITS, n_jobs=-1):
+    X, y = load_training_data()
+    pred = oof_predictions(X, y, n_splits, n_jobs)
+    table = build_table(pred, y, levels, n_bins)
+    table["firma"] = file_signature(_source_model(model_path))
+    return table
+
+
+def save_table(table, model_path=MODEL_PATH):
+    with open(intervals_path(model_path), "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=2)
+
+
+# Caché del proceso: ruta -> (mtime, tabla). Devuelve None si no hay tabla o si
+# se calibró para otra versión del modelo
+_cache = {}
+_lock = threading.Lock()
+
+
+def load_table(model_path=MODEL_PATH):
+    path = intervals_path(model_path)
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with _lock:
+            with open(path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+            table["_cortes"] = np.asarray(table["cortes"])
+            table["_cuantiles"] = {k: np.asarray(v) for k, v in table["cuantiles"].items()}
+            cached = (mtime, table)
+            _cache[path] = cached
+
+    table = cached[1]
+    source = _source_model(model_path)
+    if os.path.exists(source) and table.get("firma") != file_signature(source):
+        return None
+    return table
+
+
+# Intervalo en log-precio para un array de predicciones (una búsqueda y una
+# indexación por lote, sin bucles)
+def log_interval(log_pred, table, level=LEVEL):
+    log_pred = np.asarray(log_pred, dtype=np.float64)
+    q = table["_cuantiles"][f"{level:.2f}"]
+    half = q[np.searchsorted(table["_cortes"], log_pred, side="right")]
+    return log_pred - half, log_pred + half
+
+
+def price_interval(log_pred, table, level=LEVEL):
+    lo, hi = log_interval(log_pred, table, level)
+    return np.exp(lo), np.exp(hi)
@@ -0,0 +1,203 @@
+#Librerías
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from utils.aggregates import get_incremento, source_signature
+from utils.data_store import STORE_DIR
+from utils.geo import NIVELES, VALORES_PATH, geometrias_path, load_geometrias
+
+# Versión del formato de las figuras guardadas (cambiarla fuerza a regenerarlas)
+SPEC_VERSION = 1
+
+ZOOM = 8.5
+CENTER = {"lat": 40.3468, "lon": -3.7038}
+
+# Modos del mapa: variable de color, escala y textos
+MODOS = {
+    "valor": {
+        "etiqueta": "Valor tasado (€ / m²)",
+        "columna": "Valor_Tasado",
+        "escala": "YlOrRd",
+        "rango": None,
+        "formato": ":.0f",
+        "titulo": "Valor tasado por municipio – Comunidad de Madrid (2005–2025)",
+        "leyenda": "€/m²"},
+    "incremento": {
+        "etiqueta": "Incremento anual (%)",
+        "columna": "Incremento_%",
+        "escala": "RdYlGn",
+        "rango": (-20, 15),
+        "formato": ":.2f",
+        "titulo": "Incremento anual del valor tasado por municipio (%) – Comunidad de Madrid",
+        "leyenda": "Incremento anual (%)"},
+}
+
+
+# Figura guardada de cada modo y nivel de detalle: data/store/mapa_<modo>_<nivel>.json
+def spec_path(modo, nivel):
+    return os.path.join(STORE_DIR, f"mapa_{modo}_{nivel}.json")
+
+
+# Huella de los datos de una figura: valores por año, geometrías del nivel y formato
+def data_signature(nivel):
+    h = hashlib.sha1(f"{SPEC_VERSION}:{source_signature('incremento')}".encode())
+    with open(geometrias_path(nivel), "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def _values(matrix, year, decimals):
+    column = np.round(matrix[year].to_numpy(dtype=np.float64), decimals)
+    return [None if np.isnan(v) else float(v) for v in column]
+
+
+# Botones de reproducción y deslizador de años (los mismos que crea plotly express)
+def _animation_controls(years):
+    animate = {"frame": {"duration": 500, "redraw": True}, "mode": "immediate",
+               "fromcurrent": True, "transition": {"duration": 500, "easing": "linear"}}
+    stop = {"frame": {"duration": 0, "redraw": True}, "mode": "immediate",
+            "fromcurrent": True, "transition": {"duration": 0, "easing": "linear"}}
+    updatemenus = [{
+        "type": "buttons", "direction": "left", "showactive": False,
+        "x": 0.1, "xanchor": "right", "y": 0, "yanchor": "top", "pad": {"r": 10, "t": 70},
+        "buttons": [
+            {"label": "&#9654;", "method": "animate", "args": [None, animate]},
+            {"label": "&#9724;", "method": "animate", "args": [[None], stop]}]}]
+    sliders = [{
+        "active": 0, "x": 0.1, "xanchor": "left", "y": 0, "yanchor": "top", "len": 0.9,
+        "pad": {"b": 10, "t": 60}, "currentvalue": {"prefix": "Año="},
+        "steps": [{"label": str(y), "method": "animate", "args": [[str(y)], stop]} for y in years]}]
+    return updatemenus, sliders
+
+
+# Figura animada como dict de plotly. La traza base lleva las geometrías, los
+# nombres y el formato del tooltip; cada fotograma (un año) lleva solo los
+# arrays de valores, que plotly combina con la traza base al animar
+def build_map_spec(df, geojson, modo, zoom=ZOOM):
+    import plotly.colors
+
+    cfg = MODOS[modo]
+    if modo == "incremento":
+        df = df[df["Año"] > 2005]
+    z = df.pivot(index="muni_key", columns="Año", values=cfg["columna"])
+    valor = df.pivot(index="muni_key", columns="Año", values="Valor_Tasado").reindex_like(z)
+    nombres = df.drop_duplicates("muni_key").set_index("muni_key")["NAMEUNIT"].reindex(z.index)
+    years = [int(y) for y in z.columns]
+    decimals = int(cfg["formato"][-2])
+
+    if cfg["rango"] is None:
+        zmin, zmax = float(np.nanmin(z.to_numpy())), float(np.nanmax(z.to_numpy()))
+    else:
+        zmin, zmax = cfg["rango"]
+
+    hover = f"<b>%{{text}}</b><br>{cfg['leyenda']}=%{{z{cfg['formato']}}}"
+    if modo == "incremento":
+        hover += "<br>Valor_Tasado=%{customdata:.0f}"
+
+    def frame_data(year):
+        data = {"type": "choroplethmapbox", "z": _values(z, year, decimals)}
+        if modo == "incremento":
+            data["customdata"] = _values(valor, year, 0)
+        return data
+
+    trace = {
+        "geojson": geojson,
+        "featureidkey": "properties.muni_key",
+        "locations": z.index.tolist(),
+        "text": nombres.tolist(),
+        "hovertemplate": hover + "<extra></extra>",
+        "colorscale": plotly.colors.get_colorscale(cfg["escala"]),
+        "zmin": zmin,
+        "zmax": zmax,
+        "marker": {"opacity": 0.7},
+        "colorbar": {"title": {"text": cfg["leyenda"]}},
+        **frame_data(years[0])}
+
+    updatemenus, sliders = _animation_controls(years)
+    return {
+        "data": [trace],
+        "frames": [{"name": str(y), "traces": [0], "data": [frame_data(y)]} for y in years],
+        "layout": {
+            "title": {"text": cfg["titulo"]},
+            "height": 700,
+            "margin": {"r": 0, "l": 0, "t": 40, "b": 0},
+            "mapbox": {"style": "carto-positron", "zoom": zoom, "center": CENTER},
+            "updatemenus": updatemenus,
+            "sliders": sliders}}
+
+
+def save_spec(spec, signature, modo, nivel):
+    with open(spec_path(modo, nivel), "w", encoding="utf-8") as f:
+        json.dump({"firma": signature, "figura": spec}, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _read_spec(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Regenera las figuras cuyos datos han cambiado; devuelve las regeneradas
+def build_map_specs(force=False):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    rebuilt = []
+    df = None
+    for nivel in NIVELES:
+        signature = data_signature(nivel)
+        geojson = None
+        for modo in MODOS:
+            if not force and _read_spec(spec_path(modo, nivel)).get("firma") == signature:
+                continue
+            df = get_incremento() if df is None else df
+            geojson = load_geometrias(geometrias_path(nivel)) if geojson is None else geojson
+            save_spec(build_map_spec(df, geojson, modo), signature, modo, nivel)
+            rebuilt.append(f"{modo}/{nivel}")
+    return rebuilt
+
+
+# Figura guardada, o construida (y guardada) si falta o es de otros datos
+def load_map_spec(modo, nivel):
+    signature = data_signature(nivel)
+    stored = _read_spec(spec_path(modo, nivel))
+    if stored.get("firma") == signature:
+        return stored["figura"]
+    spec = build_map_spec(get_incremento(), load_geometrias(geometrias_path(nivel)), modo)
+    try:
+        save_spec(spec, signature, modo, nivel)
+    except OSError:
+        pass
+    return spec
+
+
+# Caché del proceso: (modo, nivel) -> (mtimes de los ficheros, figura). La figura
+# de plotly se crea una vez a partir del dict guardado y después solo se lee
+_cache = {}
+_lock = threading.Lock()
+
+
+def _stat_key(modo, nivel):
+    files = [spec_path(modo, nivel), geometrias_path(nivel), VALORES_PATH]
+    return tuple(os.path.getmtime(f) if os.path.exists(f) else None for f in files)
+
+
+def get_map_figure(modo, nivel):
+    import plotly.graph_objects as go
+
+    key = _stat_key(modo, nivel)
+    cached = _cache.get((modo, nivel))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get((modo, nivel))
+        if cached is None or cached[0] != key:
+            figure = go.Figure(load_map_spec(modo, nivel))
+            cached = (_stat_key(modo, nivel), figure)
+            _cache[(modo, nivel)] = cached
+    return cached[1]
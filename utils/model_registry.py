@@ -0,0 +1,147 @@
+#Librerías
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+MODEL_PATH = "modelo_xgb_final.pkl"
+
+
+@dataclass
+class ModelEntry:
+    path: str
+    mtime: float
+    model: object
+    booster: object
+    load_seconds: float
+    file_bytes: int
+    booster_bytes: int
+    rss_bytes: int | None
+
+
+# Registro de modelos del proceso: ruta absoluta -> ModelEntry
+_registry = {}
+_lock = threading.Lock()
+
+
+# Memoria residente del proceso (solo disponible en Linux)
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _load(path, mtime):
+    rss_before = _rss_bytes()
+    t0 = time.perf_counter()
+    if path.endswith(".npz"):
+        # Modelo compacto exportado: solo necesita NumPy
+        from utils.tree_model import TreeEnsemble
+        model = booster = TreeEnsemble.load(path)
+    else:
+        import joblib
+        from utils.prediction import get_booster
+        model = joblib.load(path)
+        booster = get_booster(model)
+    load_seconds = time.perf_counter() - t0
+    rss_after = _rss_bytes()
+
+    return ModelEntry(
+        path=path,
+        mtime=mtime,
+        model=model,
+        booster=booster,
+        load_seconds=load_seconds,
+        file_bytes=os.path.getsize(path),
+        booster_bytes=getattr(booster, "nbytes", None) or len(booster.save_raw()),
+        rss_bytes=None if rss_before is None else rss_after - rss_before)
+
+
+# Devuelve el modelo cargado; solo se vuelve a leer el fichero si cambia su mtime
+def get_entry(path=MODEL_PATH):
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    entry = _registry.get(path)
+    if entry is not None and entry.mtime == mtime:
+        return entry
+
+    with _lock:
+        entry = _registry.get(path)
+        if entry is None or entry.mtime != mtime:
+            entry = _load(path, mtime)
+            _registry[path] = entry
+    return entry
+
+
+# Huella (sha1) del contenido de un fichero, recalculada solo si cambia su mtime
+_signatures = {}
+
+
+def file_signature(path):
+    path = os.path.abspath(path)
+    stat = (os.path.getmtime(path), os.path.getsize(path))
+    cached = _signatures.get(path)
+    if cached is None or cached[0] != stat:
+        with open(path, "rb") as f:
+            cached = (stat, hashlib.sha1(f.read()).hexdigest())
+        _signatures[path] = cached
+    return cached[1]
+
+
+def compact_path(path=MODEL_PATH):
+    return os.path.splitext(path)[0] + ".npz"
+
+
+# Usa el modelo compacto (.npz) si existe y se exportó desde la versión actual del .pkl
+def resolve_model_path(path=MODEL_PATH):
+    compact = compact_path(path)
+    if not os.path.exists(compact):
+        return path
+    if not os.path.exists(path):
+        return compact
+    if get_entry(compact).booster.signature == file_signature(path):
+        return compact
+    return path
+
+
+# Modelo para puntuar lotes: el booster nativo si xgboost está instalado (su
+# inplace_predict es varias veces más rápido que el evaluador de NumPy en lotes
+# grandes); si no, el compacto. El compacto queda para la predicción puntual
+def resolve_batch_model_path(path=MODEL_PATH):
+    if os.path.exists(path) and importlib.util.find_spec("xgboost") is not None:
+        return path
+    return resolve_model_path(path)
+
+
+def get_model(path=MODEL_PATH):
+    return get_entry(path).model
+
+
+def get_booster_for(path=MODEL_PATH):
+    return get_entry(path).booster
+
+
+# Fuerza la recarga en la siguiente llamada (p. ej. tras sustituir el fichero)
+def invalidate(path=None):
+    with _lock:
+        if path is None:
+            _registry.clear()
+        else:
+            _registry.pop(os.path.abspath(path), None)
+
+
+def model_info(path=MODEL_PATH):
+    entry = get_entry(path)
+    return {
+        "Fichero": os.path.basename(entry.path),
+        "Tipo": type(entry.booster).__name__,
+        "Modificado": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.mtime)),
+        "Tiempo de carga (s)": round(entry.load_seconds, 3),
+        "Tamaño en disco (KB)": round(entry.file_bytes / 1024, 1),
+        "Tamaño del booster (KB)": round(entry.booster_bytes / 1024, 1),
+        "Memoria al cargar (MB)": None if entry.rss_bytes is None else round(entry.rss_bytes / 2**20, 1),
+    }
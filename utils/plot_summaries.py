@@ -0,0 +1,123 @@
+#Librerías
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# A partir de este número de filas los gráficos se dibujan con resúmenes
+# calculados en el servidor (el tamaño enviado al navegador ya no depende de n)
+ROW_THRESHOLD = 5000
+
+HIST_BINS = 50
+DENSITY_BINS = 80
+MAX_OUTLIERS = 300
+
+
+# Conteos por intervalo (equivalente a px.histogram con nbins)
+def histogram_bins(values, nbins=HIST_BINS):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=nbins)
+    return counts, edges
+
+
+# Conteos en una rejilla 2D para sustituir a la nube de puntos
+def density_bins(x, y, nbins=DENSITY_BINS):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[ok], y[ok], bins=nbins)
+    return counts, x_edges, y_edges
+
+
+# Cuartiles, bigotes (1.5 IQR como plotly) y una muestra acotada de atípicos
+# por cada valor de la variable de agrupación
+def box_summary(df, group_col, value_col, max_outliers=MAX_OUTLIERS, seed=42):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for group, values in df.groupby(group_col, observed=True)[value_col]:
+        v = np.sort(values.dropna().to_numpy(dtype=np.float64))
+        if len(v) == 0:
+            continue
+        q1, median, q3 = np.quantile(v, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = v[(v >= q1 - 1.5 * iqr) & (v <= q3 + 1.5 * iqr)]
+        outliers = v[(v < q1 - 1.5 * iqr) | (v > q3 + 1.5 * iqr)]
+        if len(outliers) > max_outliers:
+            outliers = rng.choice(outliers, max_outliers, replace=False)
+        rows.append({
+            group_col: group,
+            "n": len(v),
+            "q1": q1,
+            "mediana": median,
+            "q3": q3,
+            "bigote_inf": inside.min(),
+            "bigote_sup": inside.max(),
+            "atipicos": outliers})
+    return pd.DataFrame(rows)
+
+
+def histogram_figure(df, x, labels=None, nbins=HIST_BINS, threshold=ROW_THRESHOLD):
+    if len(df) <= threshold:
+        return px.histogram(df, x=x, nbins=nbins, labels=labels)
+
+    counts, edges = histogram_bins(df[x], nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        hovertemplate="%{x:.3f}<br>Frecuencia: %{y}<extra></extra>"))
+    fig.update_layout(
+        bargap=0,
+        xaxis_title=(labels or {}).get(x, x),
+        yaxis_title="count")
+    return fig
+
+
+def scatter_figure(df, x, y, labels=None, opacity=0.4, nbins=DENSITY_BINS, threshold=ROW_THRESHOLD):
+    if len(df) <= threshold:
+        return px.scatter(df, x=x, y=y, opacity=opacity, labels=labels)
+
+    counts, x_edges, y_edges = density_bins(df[x], df[y], nbins)
+    z = counts.T.copy()
+    z[z == 0] = np.nan
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=z,
+        colorscale="Blues",
+        colorbar=dict(title="Viviendas"),
+        hovertemplate="x: %{x:.3f}<br>y: %{y:.3f}<br>Viviendas: %{z}<extra></extra>"))
+    labels = labels or {}
+    fig.update_layout(xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y))
+    return fig
+
+
+def box_figure(df, x, y, labels=None, title=None, threshold=ROW_THRESHOLD):
+    if len(df) <= threshold:
+        return px.box(df, x=x, y=y, labels=labels, title=title)
+
+    summary = box_summary(df, x, y)
+    fig = go.Figure()
+    for row in summary.itertuples(index=False):
+        group = str(getattr(row, x))
+        fig.add_trace(go.Box(
+            name=group,
+            q1=[row.q1],
+            median=[row.mediana],
+            q3=[row.q3],
+            lowerfence=[row.bigote_inf],
+            upperfence=[row.bigote_sup],
+            marker_color="#636efa",
+            showlegend=False))
+        if len(row.atipicos):
+            fig.add_trace(go.Scatter(
+                x=[group] * len(row.atipicos),
+                y=row.atipicos,
+                mode="markers",
+                marker=dict(color="#636efa", size=4),
+                showlegend=False,
+                hoverinfo="y"))
+    labels = labels or {}
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y))
+    return fig
@@ -0,0 +1,115 @@
+#Librerías
+import numpy as np
+import pandas as pd
+
+from utils.features import BIN_FEATURES, FEATURES, NUM_FEATURES, feature_matrix, vivienda_features
+
+# Límites geográficos del Municipio de Madrid
+LAT_MIN, LAT_MAX = 40.3120, 40.5630
+LON_MIN, LON_MAX = -3.8880, -3.5170
+
+# Tamaño de bloque para la predicción por lotes
+CHUNK_SIZE = 100_000
+
+
+# Rectángulo que contiene el municipio (filtro rápido; la comprobación exacta
+# está en utils.spatial). Funciona con escalares y con arrays de coordenadas
+def is_in_madrid(lat, lon):
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    dentro = (
+        (lat >= LAT_MIN) & (lat <= LAT_MAX) &
+        (lon >= LON_MIN) & (lon <= LON_MAX))
+    return bool(dentro) if dentro.ndim == 0 else dentro
+
+
+# Booster nativo del pipeline guardado (se salta el wrapper de sklearn)
+def get_booster(model):
+    if hasattr(model, "named_steps"):
+        model = model.named_steps["model"]
+    if hasattr(model, "get_booster"):
+        return model.get_booster()
+    return model
+
+
+# Variables del modelo para una vivienda como dict (mismo cálculo que los lotes)
+def build_features(vivienda):
+    return dict(zip(FEATURES, vivienda_features(vivienda)[0].tolist()))
+
+
+# Leer el fichero subido por el usuario (CSV o Parquet)
+def read_batch_file(file, name=None):
+    name = (name or getattr(file, "name", "") or str(file)).lower()
+    if name.endswith(".parquet") or name.endswith(".pq"):
+        return pd.read_parquet(file)
+    return pd.read_csv(file)
+
+
+# Comprobar columnas, pasar a numérico lo que venga como texto y derivar
+# log_surface si solo viene la superficie (las superficies no positivas quedan
+# como no válidas al construir la matriz). Como en una vivienda suelta, los
+# equipamientos que no vengan se toman como 0
+def prepare_batch(df):
+    df = df.copy()
+    if "log_surface" not in df.columns:
+        if "Surface" not in df.columns:
+            raise ValueError("El fichero debe incluir la columna 'log_surface' o 'Surface'.")
+        surface = pd.to_numeric(df["Surface"], errors="coerce").to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["log_surface"] = np.log(surface)
+
+    for c in BIN_FEATURES:
+        if c not in df.columns:
+            df[c] = 0
+
+    faltan = [c for c in FEATURES if c not in df.columns]
+    if faltan:
+        raise ValueError("Faltan columnas del modelo: " + ", ".join(faltan))
+
+    for c in FEATURES:
+        if df[c].dtype.kind not in "biuf":
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+# Matriz de entrada contigua en float32 con el orden del booster
+def to_matrix(df):
+    return feature_matrix(df)[0]
+
+
+# Predicción en log-precio por bloques usando el booster directamente
+def predict_log_price(booster, X, chunk_size=CHUNK_SIZE):
+    out = np.empty(X.shape[0], dtype=np.float32)
+    for start in range(0, X.shape[0], chunk_size):
+        stop = start + chunk_size
+        out[start:stop] = booster.inplace_predict(X[start:stop])
+    return out
+
+
+# Validar y puntuar un lote completo; las filas fuera de Madrid no se predicen.
+# Con una tabla de intervalos (utils.intervals) se añade el intervalo al nivel pedido
+def predict_batch(model, df, chunk_size=CHUNK_SIZE, intervals=None, level=0.9):
+    from utils.spatial import get_validator
+
+    df = prepare_batch(df)
+    X, valid = feature_matrix(df)
+    lat = df["Latitude"].to_numpy(dtype=float)
+    lon = df["Longitude"].to_numpy(dtype=float)
+    validator = get_validator()
+    valid &= validator.in_madrid(lat, lon)
+    df["Municipio"] = validator.municipio(lat, lon)
+
+    log_price = np.full(len(df), np.nan, dtype=np.float32)
+    if valid.all():
+        log_price[:] = predict_log_price(get_booster(model), X, chunk_size)
+    elif valid.any():
+        log_price[valid] = predict_log_price(get_booster(model), X[valid], chunk_size)
+
+    df["Valida"] = valid
+    df["log_price_pred"] = log_price
+    df["Precio_estimado"] = np.exp(log_price.astype(np.float64))
+    if intervals is not None:
+        from utils.intervals import price_interval
+        pct = round(level * 100)
+        df[f"Precio_min_{pct}"], df[f"Precio_max_{pct}"] = price_interval(log_price, intervals, level)
+    return df
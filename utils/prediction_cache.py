@@ -0,0 +1,91 @@
+#Librerías
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.model_registry import MODEL_PATH, get_entry
+from utils.prediction import FEATURES, predict_log_price
+
+# Decimales de las coordenadas en la clave (4 decimales ~ 11 m)
+COORD_DECIMALS = 4
+
+
+# Caché LRU con caducidad de predicciones en log-precio, indexada por el vector de
+# variables con las coordenadas redondeadas. Se vacía sola cuando cambia el modelo.
+class PredictionCache:
+    def __init__(self, model_path=MODEL_PATH, maxsize=10_000, ttl=3600, coord_decimals=COORD_DECIMALS):
+        self.model_path = model_path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.coord_decimals = coord_decimals
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    # Vector de variables en el orden del booster con las coordenadas cuantizadas
+    def quantize(self, features):
+        values = []
+        for name in FEATURES:
+            value = float(features[name])
+            if name in ("Latitude", "Longitude"):
+                value = round(value, self.coord_decimals)
+            values.append(value)
+        return tuple(values)
+
+    def _check_version(self, entry):
+        version = (entry.path, entry.mtime)
+        if version != self._version:
+            self._data.clear()
+            self._version = version
+
+    def predict_log_price(self, features):
+        entry = get_entry(self.model_path)
+        key = self.quantize(features)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_version(entry)
+            cached = self._data.get(key)
+            if cached is not None and cached[1] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+
+        X = np.asarray([key], dtype=np.float32)
+        value = float(predict_log_price(entry.booster, X)[0])
+
+        with self._lock:
+            self.misses += 1
+            self._data[key] = (value, now + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "Aciertos": self.hits,
+            "Fallos": self.misses,
+            "Tasa de acierto (%)": round(100 * self.hits / total, 1) if total else 0.0,
+            "Entradas": len(self._data)}
+
+
+# Caché compartida por todas las sesiones del proceso
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_prediction_cache(model_path=MODEL_PATH):
+    with _caches_lock:
+        if model_path not in _caches:
+            _caches[model_path] = PredictionCache(model_path)
+        return _caches[model_path]
@@ -0,0 +1,135 @@
+#Librerías
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.model_registry import MODEL_PATH, file_signature, get_entry
+from utils.prediction import FEATURES, LAT_MAX, LAT_MIN, LON_MAX, LON_MIN, predict_log_price
+from utils.spatial import in_madrid
+
+GRID_PATH = "data/price_grid.npz"
+GRID_STEP = 0.0025
+
+# Perfiles de vivienda típicos para los que se precalcula el mapa
+PROFILES = {
+    "Estudio (40 m²)": {
+        "Surface": 40, "Rooms": 1, "Bathrooms": 1, "Floor": 2,
+        "Elevator": 1, "Air_Conditioner": 0, "Heater": 1, "Parking": 0,
+        "Balcony": 0, "Terrace": 0, "Swimming_Pool": 0},
+    "Piso medio (80 m²)": {
+        "Surface": 80, "Rooms": 3, "Bathrooms": 2, "Floor": 3,
+        "Elevator": 1, "Air_Conditioner": 1, "Heater": 1, "Parking": 0,
+        "Balcony": 0, "Terrace": 0, "Swimming_Pool": 0},
+    "Piso familiar (120 m²)": {
+        "Surface": 120, "Rooms": 4, "Bathrooms": 2, "Floor": 3,
+        "Elevator": 1, "Air_Conditioner": 1, "Heater": 1, "Parking": 1,
+        "Balcony": 0, "Terrace": 1, "Swimming_Pool": 0},
+    "Vivienda con piscina (150 m²)": {
+        "Surface": 150, "Rooms": 4, "Bathrooms": 3, "Floor": 1,
+        "Elevator": 1, "Air_Conditioner": 1, "Heater": 1, "Parking": 1,
+        "Balcony": 0, "Terrace": 1, "Swimming_Pool": 1},
+}
+
+
+def model_signature(path=MODEL_PATH):
+    return file_signature(path)
+
+
+def grid_axes(step=GRID_STEP):
+    lats = np.arange(LAT_MIN, LAT_MAX + step / 2, step)
+    lons = np.arange(LON_MIN, LON_MAX + step / 2, step)
+    return lats, lons
+
+
+# Matriz de variables de un perfil para un bloque de filas de la rejilla
+def _profile_matrix(profile, lats, lons):
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+    n = lat_grid.size
+    X = np.empty((n, len(FEATURES)), dtype=np.float32)
+    for j, name in enumerate(FEATURES):
+        if name == "log_surface":
+            X[:, j] = np.log(profile["Surface"])
+        elif name == "Latitude":
+            X[:, j] = lat_grid.ravel()
+        elif name == "Longitude":
+            X[:, j] = lon_grid.ravel()
+        else:
+            X[:, j] = profile[name]
+    return X
+
+
+# Trabajo de un proceso: €/m² de un perfil en un bloque de latitudes
+def _score_block(args):
+    model_path, profile, lats, lons = args
+    booster = get_entry(model_path).booster
+    X = _profile_matrix(profile, lats, lons)
+    log_price = predict_log_price(booster, X)
+    price_m2 = np.exp(log_price.astype(np.float64)) / profile["Surface"]
+    # Las celdas fuera del municipio quedan vacías
+    price_m2[~in_madrid(X[:, FEATURES.index("Latitude")], X[:, FEATURES.index("Longitude")])] = np.nan
+    return price_m2.reshape(len(lats), len(lons)).astype(np.float32)
+
+
+def build_grid(model_path=MODEL_PATH, step=GRID_STEP, profiles=PROFILES, workers=None, block_rows=32):
+    lats, lons = grid_axes(step)
+    tasks = []
+    for profile in profiles.values():
+        for start in range(0, len(lats), block_rows):
+            tasks.append((model_path, profile, lats[start:start + block_rows], lons))
+
+    if workers == 1:
+        blocks = list(map(_score_block, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(_score_block, tasks))
+
+    n_blocks = len(tasks) // len(profiles)
+    values = np.stack([
+        np.concatenate(blocks[i * n_blocks:(i + 1) * n_blocks], axis=0)
+        for i in range(len(profiles))])
+    return PriceGrid(values, lats, lons, list(profiles), model_signature(model_path))
+
+
+class PriceGrid:
+    def __init__(self, values, lats, lons, profiles, signature=""):
+        self.values = values
+        self.lats = lats
+        self.lons = lons
+        self.profiles = list(profiles)
+        self.signature = signature
+
+    def save(self, path=GRID_PATH):
+        np.savez_compressed(
+            path, values=self.values, lats=self.lats, lons=self.lons,
+            profiles=np.array(self.profiles), signature=np.array(self.signature))
+
+    @classmethod
+    def load(cls, path=GRID_PATH):
+        with np.load(path) as data:
+            return cls(
+                data["values"], data["lats"], data["lons"],
+                [str(p) for p in data["profiles"]], str(data["signature"]))
+
+    def is_current(self, model_path=MODEL_PATH):
+        return os.path.exists(model_path) and self.signature == model_signature(model_path)
+
+    # Índice de la celda más cercana (aritmético, sin llamar al modelo) y máscara
+    # de los puntos que caen dentro de la rejilla; fuera de ella el índice es 0
+    def index(self, lat, lon):
+        step_lat = self.lats[1] - self.lats[0]
+        step_lon = self.lons[1] - self.lons[0]
+        i = np.rint((np.asarray(lat, dtype=np.float64) - self.lats[0]) / step_lat)
+        j = np.rint((np.asarray(lon, dtype=np.float64) - self.lons[0]) / step_lon)
+        inside = (i >= 0) & (i <= len(self.lats) - 1) & (j >= 0) & (j <= len(self.lons) - 1)
+        i = np.where(inside, i, 0).astype(int)
+        j = np.where(inside, j, 0).astype(int)
+        return i, j, inside
+
+    # €/m² del punto; NaN fuera de la rejilla (no se extrapola desde el borde)
+    def lookup(self, profile, lat, lon):
+        i, j, inside = self.index(lat, lon)
+        return np.where(inside, self.values[self.profiles.index(profile), i, j], np.nan)
+
+    def layer(self, profile):
+        return self.values[self.profiles.index(profile)]
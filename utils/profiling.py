@@ -0,0 +1,132 @@
+#Librerías (solo biblioteca estándar, para no distorsionar las medidas)
+import json
+import os
+import sys
+import threading
+import time
+
+LOG_PATH = os.environ.get("STARTUP_LOG", os.path.join("logs", "startup.jsonl"))
+FRAGMENT_LOG_PATH = os.environ.get("FRAGMENT_LOG", os.path.join("logs", "fragments.jsonl"))
+
+# Páginas ya renderizadas en este proceso (solo se registra la primera vez)
+_seen = set()
+_lock = threading.Lock()
+
+
+# Versión desplegada: APP_VERSION o el commit actual del repositorio
+def app_version():
+    version = os.environ.get("APP_VERSION")
+    if version:
+        return version
+    try:
+        with open(os.path.join(".git", "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+        if head.startswith("ref: "):
+            with open(os.path.join(".git", head[5:]), "r", encoding="utf-8") as f:
+                head = f.read().strip()
+        return head[:12]
+    except OSError:
+        return "desconocida"
+
+
+# Mide el arranque de una página: tiempo de imports (hasta mark("imports")) y
+# tiempo hasta terminar el primer renderizado en el proceso. Se activa con
+# PROFILE_STARTUP=1; se crea al principio del script de la página y se cierra con
+# finish() al final, o con stop() si la página se detiene antes (st.stop()).
+class PageProfiler:
+    def __init__(self, page, log_path=LOG_PATH):
+        self.page = page
+        self.log_path = log_path
+        self.enabled = os.environ.get("PROFILE_STARTUP", "0") == "1"
+        self.t0 = time.perf_counter()
+        self.modules0 = set(sys.modules)
+        self.marks = {}
+        self.first = page not in _seen
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter() - self.t0
+        if name == "imports":
+            self.new_modules = sorted(
+                m for m in set(sys.modules) - self.modules0
+                if "." not in m and not m.startswith("_"))
+
+    def finish(self):
+        total = time.perf_counter() - self.t0
+        if not self.enabled or not self.first:
+            return None
+        with _lock:
+            if self.page in _seen:
+                return None
+            _seen.add(self.page)
+
+        record = {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "version": app_version(),
+            "pid": os.getpid(),
+            "pagina": self.page,
+            "imports_s": round(self.marks.get("imports", 0.0), 4),
+            "render_s": round(total, 4),
+            "modulos_nuevos": getattr(self, "new_modules", []),
+            **{f"{k}_s": round(v, 4) for k, v in self.marks.items() if k != "imports"},
+        }
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+        return record
+
+    # Registra el arranque y detiene la página (sustituye a st.stop())
+    def stop(self):
+        import streamlit as st
+
+        self.finish()
+        st.stop()
+
+
+# Mide cada ejecución de un fragmento de página: tiempo de cálculo (datos y
+# figura) y de serialización (envío del gráfico al navegador). Se activa con
+# PROFILE_FRAGMENTS=1 y escribe una línea por ejecución en logs/fragments.jsonl
+class FragmentTimer:
+    def __init__(self, page, fragment, log_path=FRAGMENT_LOG_PATH):
+        self.page = page
+        self.fragment = fragment
+        self.log_path = log_path
+        self.enabled = os.environ.get("PROFILE_FRAGMENTS", "0") == "1"
+        self.laps = {}
+
+    def __enter__(self):
+        self.t0 = self.last = time.perf_counter()
+        return self
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.laps[name] = self.laps.get(name, 0.0) + now - self.last
+        self.last = now
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled or exc_type is not None:
+            return False
+        record = {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "pagina": self.page,
+            "fragmento": self.fragment,
+            "total_s": round(time.perf_counter() - self.t0, 5),
+            **{f"{k}_s": round(v, 5) for k, v in self.laps.items()},
+        }
+        with _lock:
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+        return False
+
+
+def read_log(path=LOG_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
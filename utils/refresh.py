@@ -0,0 +1,196 @@
+#Librerías
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import build_aggregates
+from utils.data_store import DATE_COLUMNS, SCHEMAS, convert, csv_path, load_dataset, store_path
+from utils.features import add_comparisons
+from utils.forecasting import update_forecasts
+from utils.geo import VALORES_PATH, load_geometrias, load_valores
+from utils.map_frames import build_map_specs
+
+MUNICIPIOS_COLS = ["Municipio", "Valor_Tasado", "Num_Tasaciones", "Periodo", "Trimestre", "Año", "Mes", "Fecha"]
+MEDIAS_COLS = ["Region", "Año", "Trimestre", "Valor_Tasado", "Fecha"]
+DISTRITOS_COLS = ["Distrito", "Año", "€/m²"]
+
+
+# Clave normalizada del municipio (sin tildes y en minúsculas), igual que muni_key
+def muni_key(nombre):
+    nombre = unicodedata.normalize("NFKD", str(nombre))
+    return nombre.encode("ascii", "ignore").decode("ascii").lower().strip()
+
+
+# "T3A2025" -> (trimestre, año, mes, fecha de fin de trimestre)
+def parse_periodo(periodo):
+    trimestre = int(periodo[1])
+    year = int(periodo[3:])
+    mes = trimestre * 3
+    fecha = (pd.Timestamp(year=year, month=mes, day=1) + pd.offsets.MonthEnd(0)).strftime("%Y-%m-%d")
+    return trimestre, year, mes, fecha
+
+
+def _store_frame(name):
+    if os.path.exists(store_path(name)) or os.path.exists(csv_path(name)):
+        return load_dataset(name)
+    return None
+
+
+# Filas guardadas cuya clave coincide con alguna de las nuevas (vectorizado)
+def _match(current, new_rows, key_cols):
+    mask = np.ones(len(current), dtype=bool)
+    for col in key_cols:
+        mask &= current[col].astype(str).isin(new_rows[col].astype(str).unique()).to_numpy()
+    return mask
+
+
+# Compara las filas ya guardadas con las nuevas usando los tipos del almacén
+def _same_rows(old, new):
+    if len(old) != len(new):
+        return False
+    new = new.copy()
+    for col in new.columns:
+        if old[col].dtype != "category":
+            new[col] = new[col].astype(old[col].dtype)
+    return bool((old.astype(str).to_numpy() == new.astype(str).to_numpy()).all())
+
+
+# Inserta las filas nuevas de forma idempotente. Si la clave no existe se añaden
+# al final del CSV (solo se escriben las filas nuevas); si ya existe con los mismos
+# valores no se hace nada; si existe con valores distintos se corrige el fichero.
+def upsert(name, new_rows, key_cols):
+    new_rows = new_rows.sort_values(key_cols, kind="stable").reset_index(drop=True)
+    current = _store_frame(name)
+    mask = None if current is None else _match(current, new_rows, key_cols)
+
+    if mask is not None and mask.any():
+        old = current.loc[mask, new_rows.columns]
+        old = old.sort_values(key_cols, kind="stable").reset_index(drop=True)
+        if _same_rows(old, new_rows):
+            return "sin cambios"
+        # Corrección de datos ya cargados: se reescribe el CSV original (caso poco frecuente)
+        raw = pd.read_csv(csv_path(name), dtype=str, keep_default_na=False)
+        raw = raw.loc[~_match(raw, new_rows, key_cols)]
+        full = pd.concat([raw, new_rows.astype(str)], ignore_index=True)
+        full.to_csv(csv_path(name), index=False)
+        if os.path.exists(store_path(name)):
+            convert(name)
+        return "corregido"
+
+    path = csv_path(name)
+    header = not os.path.exists(path)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        new_rows.to_csv(f, index=False, header=header, date_format="%Y-%m-%d")
+    full = new_rows if current is None else pd.concat([current, new_rows], ignore_index=True)
+    _write_store(name, full)
+    return "añadido"
+
+
+# Actualiza el Feather tipado a partir del frame ya cargado (sin releer el CSV)
+def _write_store(name, df):
+    import pyarrow.feather as feather
+    if not os.path.exists(store_path(name)):
+        return
+    df = df.copy()
+    for col in DATE_COLUMNS.get(name, []):
+        df[col] = pd.to_datetime(df[col])
+    for col, dtype in SCHEMAS[name].items():
+        if dtype == "category":
+            df[col] = df[col].astype(str)
+    df = df.astype(SCHEMAS[name])
+    feather.write_feather(df, store_path(name), compression="uncompressed")
+
+
+# Recupera el valor decimal original de una columna float32 del almacén
+def _as_float64(values):
+    return pd.to_numeric(pd.Series(values).astype(str))
+
+
+def _medias_periodo(periodo):
+    trimestre, year, _, _ = parse_periodo(periodo)
+    medias = load_dataset("medias")
+    sel = medias[(medias["Año"] == year) & (medias["Trimestre"] == trimestre)]
+    return dict(zip(sel["Region"].astype(str), _as_float64(sel["Valor_Tasado"])))
+
+
+# Filas de precios_municipios para un periodo: municipio frente a las medias
+def build_precios_periodo(municipios, medias):
+    df = municipios.copy()
+    df["Valor_Tasado_Madrid"] = medias.get("Madrid", np.nan)
+    df["Valor_Tasado_España"] = medias.get("España", np.nan)
+    return add_comparisons(df)
+
+
+# Recalcula el valor anual de los mapas (media de los trimestres) solo para un año
+def refresh_valores_year(year):
+    municipios = load_dataset("municipios")
+    sel = municipios[municipios["Año"] == year]
+    medias_year = (
+        pd.DataFrame({
+            "muni_key": sel["Municipio"].astype(str).map(muni_key).to_numpy(),
+            "Valor_Tasado": _as_float64(sel["Valor_Tasado"]).to_numpy()})
+        .groupby("muni_key")["Valor_Tasado"].mean())
+
+    props = pd.DataFrame([f["properties"] for f in load_geometrias()["features"]])
+    nuevos = props[props["muni_key"].isin(medias_year.index)][["NATCODE", "muni_key", "NAMEUNIT"]].copy()
+    nuevos["Año"] = year
+    nuevos["Valor_Tasado"] = nuevos["muni_key"].map(medias_year).round(6).to_numpy()
+
+    valores = load_valores()
+    valores = pd.concat([valores[valores["Año"] != year], nuevos], ignore_index=True)
+    valores = valores.sort_values(["muni_key", "Año"]).reset_index(drop=True)
+    valores.to_csv(VALORES_PATH, index=False)
+    return len(nuevos)
+
+
+# Series de previsión actualizadas y reajustadas (el resto no cambia)
+def _resumen_previsiones(resumenes):
+    return ", ".join(
+        f"{nivel}: {r['incremental']} actualizadas, {r['reajuste']} reajustadas" for nivel, r in resumenes.items())
+
+
+# Nuevo trimestre del MITMA: municipios (Municipio, Valor_Tasado, Num_Tasaciones)
+# y, opcionalmente, las medias de España y de la Comunidad de Madrid
+def append_periodo(periodo, municipios, medias=None):
+    trimestre, year, mes, fecha = parse_periodo(periodo)
+    resumen = {}
+
+    municipios = municipios[["Municipio", "Valor_Tasado", "Num_Tasaciones"]].copy()
+    municipios = municipios.sort_values("Municipio").reset_index(drop=True)
+    municipios["Periodo"] = periodo
+    municipios["Trimestre"] = trimestre
+    municipios["Año"] = year
+    municipios["Mes"] = mes
+    municipios["Fecha"] = fecha
+    municipios = municipios[MUNICIPIOS_COLS]
+    resumen["municipios"] = upsert("municipios", municipios, ["Periodo", "Municipio"])
+
+    if medias:
+        filas = pd.DataFrame(
+            [[region, year, trimestre, float(valor), fecha] for region, valor in medias.items()],
+            columns=MEDIAS_COLS)
+        resumen["medias"] = upsert("medias", filas, ["Region", "Año", "Trimestre"])
+
+    precios = build_precios_periodo(municipios, _medias_periodo(periodo))
+    resumen["precios_municipios"] = upsert("precios_municipios", precios, ["Periodo", "Municipio"])
+
+    if any(v != "sin cambios" for v in resumen.values()):
+        resumen["limites_valores"] = f"{refresh_valores_year(year)} municipios en {year}"
+        resumen["agregados"] = ", ".join(build_aggregates()) or "sin cambios"
+        resumen["mapas"] = ", ".join(build_map_specs()) or "sin cambios"
+        resumen["previsiones"] = _resumen_previsiones(update_forecasts(["municipios"]))
+    return resumen
+
+
+# Nuevo año del Colegio de Registradores: €/m² por distrito (incluida la ciudad)
+def append_year_distritos(year, distritos):
+    distritos = distritos[["Distrito", "€/m²"]].copy()
+    distritos["Año"] = int(year)
+    distritos = distritos[DISTRITOS_COLS]
+    resumen = {"distritos": upsert("distritos", distritos, ["Año", "Distrito"])}
+    if resumen["distritos"] != "sin cambios":
+        resumen["agregados"] = ", ".join(build_aggregates()) or "sin cambios"
+        resumen["previsiones"] = _resumen_previsiones(update_forecasts(["distritos"]))
+    return resumen
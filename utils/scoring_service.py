@@ -0,0 +1,475 @@
+#Librerías
+import asyncio
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils.intervals import LEVEL, load_table, price_interval
+from utils.model_registry import MODEL_PATH, get_entry
+from utils.prediction import FEATURES, build_features, predict_batch, predict_log_price
+
+# Ventana de agrupación: las peticiones que llegan dentro de este margen se
+# puntúan juntas en una sola llamada al booster
+BATCH_WINDOW = 0.002
+MAX_BATCH = 512
+
+# Filas por bloque en las respuestas en streaming de /predict/batch
+STREAM_CHUNK = 1000
+
+# Límites superiores (ms) de los intervalos del histograma de latencias
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+MAX_BODY = 50 * 1024 * 1024
+# Cuerpos de /predict por encima de este tamaño se decodifican en un hilo para
+# no bloquear el bucle de eventos (los pequeños cuestan menos que el cambio de hilo)
+INLINE_JSON = 64 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+# Histograma acumulado de latencias (en ms) con recuento y suma
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        i = 0
+        while i < len(self.buckets) and ms > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        acc = 0
+        for limit, n in zip(self.buckets + [self.max], self.counts):
+            acc += n
+            if acc >= target:
+                return limit
+        return self.max
+
+    def snapshot(self):
+        return {
+            "intervalos_ms": {
+                **{f"<={b}": n for b, n in zip(self.buckets, self.counts)},
+                f">{self.buckets[-1]}": self.counts[-1]},
+            "n": self.count,
+            "media_ms": round(self.total / self.count, 3) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max, 3)}
+
+
+# Contadores de peticiones por ruta y código, latencias por ruta y tamaño de los
+# lotes enviados al booster
+class ServiceMetrics:
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.batch_sizes = LatencyHistogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.booster_calls = 0
+        self.rows_scored = 0
+
+    def observe_request(self, route, status, ms):
+        key = f"{route} {status}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.latency.setdefault(route, LatencyHistogram()).observe(ms)
+
+    def observe_batch(self, n):
+        self.booster_calls += 1
+        self.rows_scored += n
+        self.batch_sizes.observe(n)
+
+    def snapshot(self):
+        return {
+            "peticiones": dict(sorted(self.requests.items())),
+            "latencia": {route: h.snapshot() for route, h in sorted(self.latency.items())},
+            "llamadas_booster": self.booster_calls,
+            "filas_puntuadas": self.rows_scored,
+            "tamaño_lote": self.batch_sizes.snapshot()}
+
+
+# Agrupa las predicciones individuales concurrentes: cada petición deja su vector
+# en la cola y espera; un único consumidor junta lo que llegue en BATCH_WINDOW
+# (hasta MAX_BATCH filas) y lo puntúa con una llamada al booster en un hilo aparte
+class MicroBatcher:
+    def __init__(self, model_path=MODEL_PATH, window=BATCH_WINDOW, max_batch=MAX_BATCH, metrics=None):
+        self.model_path = model_path
+        self.window = window
+        self.max_batch = max_batch
+        self.metrics = metrics
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            X = np.asarray([row for row, _ in items], dtype=np.float32)
+            try:
+                booster = get_entry(self.model_path).booster
+                preds = await loop.run_in_executor(None, predict_log_price, booster, X)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            if self.metrics is not None:
+                self.metrics.observe_batch(len(items))
+            for (_, future), value in zip(items, preds):
+                if not future.done():
+                    future.set_result(float(value))
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Servicio HTTP asíncrono (solo biblioteca estándar) que comparte modelo,
+# construcción de variables y validación geográfica con la página de predicción.
+#   GET  /health          estado y modelo cargado
+#   GET  /metrics         contadores e histogramas de latencia
+#   POST /predict         una vivienda (JSON) -> precio estimado
+#   POST /predict/batch   {"viviendas": [...]} -> NDJSON en streaming
+class ScoringService:
+    def __init__(self, model_path=MODEL_PATH, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.model_path = model_path
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(model_path, window, max_batch, self.metrics)
+        self.server = None
+        # Conexiones abiertas: tarea que la atiende -> writer
+        self._connections = {}
+        self._stopping = False
+
+    async def start(self, host="127.0.0.1", port=8502):
+        from utils.spatial import get_validator
+
+        # Modelo y polígonos cargados una sola vez, antes de aceptar conexiones
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, get_entry, self.model_path)
+        self.validator = await loop.run_in_executor(None, get_validator)
+        self.batcher.start()
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    # Se cierran las conexiones (las inactivas con keep-alive terminan al leer el
+    # fin de la conexión) y se cancelan las que sigan abiertas tras un segundo
+    async def stop(self, timeout=1.0):
+        self._stopping = True
+        if self.server is not None:
+            self.server.close()
+        for writer in list(self._connections.values()):
+            writer.close()
+        if self._connections:
+            _, pending = await asyncio.wait(list(self._connections), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        if self.server is not None:
+            await self.server.wait_closed()
+        await self.batcher.stop()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    # Cabeceras no válidas o cuerpo demasiado grande: el cuerpo no se
+                    # lee, así que se responde y se cierra la conexión
+                    self._send_json(writer, e.status, {"error": str(e)}, False)
+                    await writer.drain()
+                    self.metrics.observe_request("otras", e.status, 0.0)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._dispatch(method, path, body, writer, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Solo se cancelan conexiones al parar el servicio: se termina sin error
+            if not self._stopping:
+                raise
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise HTTPError(400, "Línea de petición no válida.")
+        method, target, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(400, "Cabecera Content-Length no válida.")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"El cuerpo supera el máximo de {MAX_BODY // 2**20} MB.")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), urlsplit(target).path, headers, body
+
+    async def _dispatch(self, method, path, body, writer, keep_alive):
+        t0 = time.perf_counter()
+        routes = {
+            "/health": ("GET", self._health),
+            "/metrics": ("GET", self._metrics),
+            "/predict": ("POST", self._predict),
+            "/predict/batch": ("POST", self._predict_batch),
+        }
+        route = path if path in routes else "otras"
+        try:
+            if path not in routes:
+                raise HTTPError(404, f"Ruta desconocida: {path}")
+            expected, handler = routes[path]
+            if method != expected:
+                raise HTTPError(405, f"Método no permitido: {method}")
+            status = await handler(body, writer, keep_alive)
+        except HTTPError as e:
+            status = e.status
+            self._send_json(writer, status, {"error": str(e)}, keep_alive)
+        except ValueError as e:
+            status = 400
+            self._send_json(writer, status, {"error": str(e)}, keep_alive)
+        except Exception as e:
+            status = 500
+            self._send_json(writer, status, {"error": repr(e)}, keep_alive)
+        await writer.drain()
+        self.metrics.observe_request(route, status, (time.perf_counter() - t0) * 1000)
+
+    def _send_json(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+
+    async def _health(self, body, writer, keep_alive):
+        entry = get_entry(self.model_path)
+        self._send_json(writer, 200, {"estado": "ok", "modelo": entry.path, "modificado": entry.mtime}, keep_alive)
+        return 200
+
+    async def _metrics(self, body, writer, keep_alive):
+        self._send_json(writer, 200, self.metrics.snapshot(), keep_alive)
+        return 200
+
+    async def _predict(self, body, writer, keep_alive):
+        if len(body) > INLINE_JSON:
+            vivienda = await asyncio.get_running_loop().run_in_executor(None, _parse_json, body)
+        else:
+            vivienda = _parse_json(body)
+        if not isinstance(vivienda, dict):
+            raise ValueError("Se espera un objeto JSON con las variables de la vivienda.")
+        features = build_features(vivienda)
+        lat, lon = features["Latitude"], features["Longitude"]
+
+        if not self.validator.in_madrid(lat, lon):
+            municipio = self.validator.municipio(lat, lon)[0]
+            self._send_json(writer, 200, {
+                "valida": False,
+                "municipio": municipio,
+                "error": "La ubicación está fuera del municipio de Madrid."}, keep_alive)
+            return 200
+
+        log_price = await self.batcher.predict([features[c] for c in FEATURES])
+        result = {
+            "valida": True,
+            "log_price": log_price,
+            "precio": float(np.exp(log_price))}
+        table = load_table(self.model_path)
+        if table is not None:
+            lo, hi = price_interval([log_price], table, LEVEL)
+            result[f"intervalo_{round(LEVEL * 100)}"] = [float(lo[0]), float(hi[0])]
+        self._send_json(writer, 200, result, keep_alive)
+        return 200
+
+    # Un lote ya es una sola llamada al booster: la decodificación del cuerpo, la
+    # puntuación con predict_batch y la codificación de la respuesta se hacen en un
+    # hilo (el bucle de eventos sigue atendiendo otras conexiones) y la respuesta
+    # se envía en bloques (chunked) como NDJSON
+    async def _predict_batch(self, body, writer, keep_alive):
+        booster = get_entry(self.model_path).booster
+        table = load_table(self.model_path)
+        n_validas, chunks = await asyncio.get_running_loop().run_in_executor(
+            None, _score_batch, body, booster, table)
+        self.metrics.booster_calls += 1
+        self.metrics.rows_scored += n_validas
+
+        writer.write(
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: application/x-ndjson; charset=utf-8\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1"))
+        for data in chunks:
+            writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        return 200
+
+
+def _parse_json(body):
+    try:
+        return json.loads(body or b"null")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON no válido: {e}")
+
+
+# Trabajo de /predict/batch fuera del bucle de eventos: cuerpo -> filas válidas y
+# bloques NDJSON codificados, con los mismos campos que /predict (el intervalo
+# solo si hay tabla calibrada)
+def _score_batch(body, booster, table):
+    payload = _parse_json(body)
+    viviendas = payload.get("viviendas") if isinstance(payload, dict) else payload
+    if not isinstance(viviendas, list) or not viviendas:
+        raise ValueError("Se espera {\"viviendas\": [...]} con al menos una vivienda.")
+    df = predict_batch(booster, pd.DataFrame(viviendas), intervals=table, level=LEVEL)
+
+    pct = round(LEVEL * 100)
+    cols = ["Valida", "Municipio", "log_price_pred", "Precio_estimado"]
+    if table is not None:
+        cols += [f"Precio_min_{pct}", f"Precio_max_{pct}"]
+    chunks = []
+    for start in range(0, len(df), STREAM_CHUNK):
+        block = df[cols].iloc[start:start + STREAM_CHUNK]
+        lines = []
+        for row in block.itertuples(index=False):
+            valida = bool(row[0])
+            result = {
+                "valida": valida,
+                "municipio": row[1] if isinstance(row[1], str) else None,
+                "log_price": float(row[2]) if valida else None,
+                "precio": float(row[3]) if valida else None}
+            if table is not None:
+                result[f"intervalo_{pct}"] = [float(row[4]), float(row[5])] if valida else None
+            lines.append(json.dumps(result, ensure_ascii=False))
+        chunks.append(("\n".join(lines) + "\n").encode("utf-8"))
+    return int(df["Valida"].sum()), chunks
+
+
+async def serve(host="127.0.0.1", port=8502, model_path=MODEL_PATH):
+    service = ScoringService(model_path)
+    port = await service.start(host, port)
+    print(f"Servicio de predicción en http://{host}:{port}")
+    async with service.server:
+        await service.server.serve_forever()
+
+
+# Arranca el servicio en un hilo con su propio bucle de eventos (pruebas y
+# benchmarks locales). Devuelve (servicio, puerto, función para pararlo)
+def start_in_thread(host="127.0.0.1", port=0, model_path=MODEL_PATH, **kwargs):
+    loop = asyncio.new_event_loop()
+    service = ScoringService(model_path, **kwargs)
+    ready = threading.Event()
+    result = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        result["port"] = loop.run_until_complete(service.start(host, port))
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(service.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return service, result["port"], stop
+
+
+# Cliente mínimo (http.client) con conexión persistente
+class ScoringClient:
+    def __init__(self, host="127.0.0.1", port=8502, timeout=30):
+        self.conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        return response.status, response.read()
+
+    def health(self):
+        return json.loads(self._request("GET", "/health")[1])
+
+    def metrics(self):
+        return json.loads(self._request("GET", "/metrics")[1])
+
+    def predict(self, vivienda):
+        status, data = self._request("POST", "/predict", vivienda)
+        return status, json.loads(data)
+
+    def predict_batch(self, viviendas):
+        status, data = self._request("POST", "/predict/batch", {"viviendas": viviendas})
+        if status != 200:
+            return status, json.loads(data)
+        return status, [json.loads(line) for line in data.decode("utf-8").splitlines() if line]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,82 @@
+#Librerías
+import threading
+
+import numpy as np
+
+from utils.geo import GEOMETRIAS_PATH, load_geometrias
+from utils.prediction import is_in_madrid
+
+MUNICIPIO_MADRID = "madrid"
+
+# Margen sobre el límite municipal (grados, ~100 m): las geometrías están
+# simplificadas y algunas viviendas junto a la frontera quedarían fuera
+BORDER_TOLERANCE = 0.001
+
+
+# Índice espacial (STRtree) sobre un conjunto de polígonos con consultas
+# vectorizadas sobre arrays de coordenadas
+class PolygonIndex:
+    def __init__(self, geojson, name_prop):
+        import shapely
+        from shapely.geometry import shape
+
+        self.geoms = np.array([shape(f["geometry"]) for f in geojson["features"]])
+        self.names = np.array([f["properties"].get(name_prop) for f in geojson["features"]], dtype=object)
+        shapely.prepare(self.geoms)
+        self.tree = shapely.STRtree(self.geoms)
+
+    # Nombre del polígono que contiene cada punto (None si no hay ninguno)
+    def locate(self, lat, lon):
+        import shapely
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        out = np.full(lat.shape, None, dtype=object)
+        pts, polys = self.tree.query(shapely.points(lon, lat), predicate="within")
+        out[pts] = self.names[polys]
+        return out
+
+
+class SpatialValidator:
+    def __init__(self, geom_path=GEOMETRIAS_PATH, tolerance=BORDER_TOLERANCE):
+        import shapely
+        from shapely.geometry import shape
+
+        geojson = load_geometrias(geom_path)
+        self.municipios = PolygonIndex(geojson, "NAMEUNIT")
+        madrid = next(
+            shape(f["geometry"]) for f in geojson["features"]
+            if f["properties"]["muni_key"] == MUNICIPIO_MADRID)
+        self.madrid = madrid.buffer(tolerance) if tolerance else madrid
+        shapely.prepare(self.madrid)
+
+    # Contención exacta en el Municipio de Madrid; el rectángulo se usa como filtro previo
+    def in_madrid(self, lat, lon):
+        import shapely
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        dentro = np.atleast_1d(is_in_madrid(lat, lon)).copy()
+        lat1, lon1 = np.atleast_1d(lat), np.atleast_1d(lon)
+        if dentro.any():
+            dentro[dentro] = shapely.contains_xy(self.madrid, lon1[dentro], lat1[dentro])
+        return bool(dentro[0]) if lat.ndim == 0 else dentro
+
+    def municipio(self, lat, lon):
+        return self.municipios.locate(lat, lon)
+
+
+# Validador compartido por el proceso
+_validator = None
+_lock = threading.Lock()
+
+
+def get_validator():
+    global _validator
+    if _validator is None:
+        with _lock:
+            if _validator is None:
+                _validator = SpatialValidator()
+    return _validator
+
+
+def in_madrid(lat, lon):
+    return get_validator().in_madrid(lat, lon)
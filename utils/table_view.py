@@ -0,0 +1,88 @@
+#Librerías
+import numpy as np
+import pandas as pd
+
+from utils.data_store import AMENITIES
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+MAX_PAGE_SIZE = PAGE_SIZES[-1]
+
+# Columnas que se ofrecen como filtro (si existen en el dataset)
+CATEGORY_COLUMNS = ["Municipio", "Region", "Distrito", "NAMEUNIT"]
+YEAR_COLUMN = "Año"
+PRICE_COLUMNS = ["Valor_Tasado", "€/m²", "Price"]
+
+
+# Filtros disponibles para un DataFrame: columnas categóricas con sus valores,
+# rango de años, columna de precio con su rango y columnas binarias de extras
+def filter_spec(df):
+    spec = {"categorias": {}, "año": None, "precio": None, "extras": []}
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            values = df[col].cat.categories if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].dropna().unique()
+            spec["categorias"][col] = sorted(str(v) for v in values)
+    if YEAR_COLUMN in df.columns:
+        spec["año"] = (int(df[YEAR_COLUMN].min()), int(df[YEAR_COLUMN].max()))
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            spec["precio"] = (col, float(np.floor(df[col].min())), float(np.ceil(df[col].max())))
+            break
+    spec["extras"] = [c for c in AMENITIES if c in df.columns]
+    return spec
+
+
+# Máscara booleana con todos los filtros. filters admite:
+#   {"categorias": {col: [valores]}, "año": (min, max),
+#    "precio": (col, min, max), "extras": [cols que deben valer 1]}
+def filter_mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    if not filters:
+        return mask
+
+    for col, values in (filters.get("categorias") or {}).items():
+        if values:
+            mask &= df[col].astype(str).isin(values).to_numpy()
+
+    if filters.get("año") is not None:
+        lo, hi = filters["año"]
+        years = df[YEAR_COLUMN].to_numpy()
+        mask &= (years >= lo) & (years <= hi)
+
+    if filters.get("precio") is not None:
+        col, lo, hi = filters["precio"]
+        prices = df[col].to_numpy()
+        mask &= (prices >= lo) & (prices <= hi)
+
+    for col in filters.get("extras") or []:
+        mask &= df[col].to_numpy() == 1
+
+    return mask
+
+
+# Aplica filtro, orden y selección de columnas sobre el DataFrame cacheado y
+# devuelve solo las filas de la página pedida junto con el total filtrado.
+# El orden se calcula sobre las posiciones filtradas, sin copiar la tabla, y
+# deja los huecos al final en ambos sentidos. Una página fuera de rango se
+# ajusta a la primera o la última; se devuelve la página realmente mostrada.
+def query_table(df, filters=None, sort_by=None, ascending=True, columns=None,
+                page=1, page_size=50):
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+    rows = np.flatnonzero(filter_mask(df, filters))
+    total = len(rows)
+
+    if sort_by is not None and total:
+        values = pd.Series(df[sort_by].to_numpy()[rows])
+        if isinstance(df[sort_by].dtype, pd.CategoricalDtype) or values.dtype == object:
+            values = values.astype(str).mask(values.isna())
+        order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        rows = rows[order.to_numpy()]
+
+    n_pages = max(1, -(-total // page_size))
+    page = min(max(1, int(page)), n_pages)
+    start = (page - 1) * page_size
+    page_rows = rows[start:start + page_size]
+
+    cols = [c for c in columns if c in df.columns] if columns else list(df.columns)
+    result = df.iloc[page_rows][cols]
+    return result, total, n_pages, page
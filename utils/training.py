@@ -0,0 +1,150 @@
+#Librerías
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import load_dataset
+from utils.features import TARGET, feature_matrix
+from utils.model_registry import MODEL_PATH
+RESULTS_PATH = "data/cv_resultados.csv"
+CACHE_DIR = os.path.join(".cache", "cv")
+N_SPLITS = 5
+RANDOM_STATE = 42
+
+# Nombre mostrado en la página -> clave del modelo
+MODEL_NAMES = {
+    "lineal": "Regresión lineal",
+    "arbol": "Decision Tree",
+    "svr": "SVR",
+    "rf": "Random Forest",
+    "xgb": "XGBoost",
+}
+
+
+# Estimadores comparados. XGBoost usa los hiperparámetros del modelo final
+# guardado (modelo_xgb_final.pkl); el cuaderno del estudio no está en el
+# repositorio, así que el resto usa los valores por defecto de scikit-learn
+def make_model(key):
+    from sklearn.linear_model import LinearRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if key == "lineal":
+        return make_pipeline(StandardScaler(), LinearRegression())
+    if key == "arbol":
+        from sklearn.tree import DecisionTreeRegressor
+        return DecisionTreeRegressor(random_state=RANDOM_STATE)
+    if key == "svr":
+        from sklearn.svm import SVR
+        return make_pipeline(StandardScaler(), SVR())
+    if key == "rf":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(n_jobs=1, random_state=RANDOM_STATE)
+    if key == "xgb":
+        import joblib
+        from sklearn.base import clone
+        final = joblib.load(MODEL_PATH).named_steps["model"]
+        return clone(final).set_params(n_jobs=1)
+    raise KeyError(f"Modelo desconocido: {key}")
+
+
+# Matriz y objetivo de modelos_final sin las filas con huecos o fuera de rango
+def load_training_data():
+    df = load_dataset("modelos_final")
+    X, valid = feature_matrix(df)
+    y = df[TARGET].to_numpy(dtype=np.float64)
+    valid &= np.isfinite(y)
+    return X[valid], y[valid]
+
+
+# Ajuste de un pliegue (se cachea en disco: mismo estimador sin ajustar, con sus
+# hiperparámetros, y mismos datos -> mismo ajuste). Un ajuste leído de la caché
+# devuelve el tiempo de la ejecución que lo entrenó
+def _fit_fold(model, X_train, y_train):
+    from sklearn.base import clone
+
+    model = clone(model)
+    t0 = time.perf_counter()
+    model.fit(X_train, y_train)
+    return model, time.perf_counter() - t0
+
+
+def _eval_fold(key, fold, X, y, train_idx, test_idx, fit):
+    X_train, y_train = X[train_idx], y[train_idx]
+    model = make_model(key)
+    in_cache = getattr(fit, "check_call_in_cache", None)
+    fit_cached = bool(in_cache is not None and in_cache(model, X_train, y_train))
+    model, fit_seconds = fit(model, X_train, y_train)
+    t0 = time.perf_counter()
+    pred = model.predict(X[test_idx])
+    predict_seconds = time.perf_counter() - t0
+
+    resid = y[test_idx] - pred
+    ss_res = float(resid @ resid)
+    ss_tot = float(((y[test_idx] - y[test_idx].mean()) ** 2).sum())
+    return {
+        "key": key,
+        "fold": fold,
+        "r2": 1 - ss_res / ss_tot,
+        "rmse": float(np.sqrt(ss_res / len(test_idx))),
+        "fit_seconds": fit_seconds,
+        "fit_cached": fit_cached,
+        "predict_seconds": predict_seconds,
+        "n_test": len(test_idx),
+    }
+
+
+# Validación cruzada de varios modelos con los pliegues repartidos entre procesos
+def run_cv(keys=tuple(MODEL_NAMES), n_splits=N_SPLITS, n_jobs=-1, cache_dir=CACHE_DIR):
+    from joblib import Memory, Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    X, y = load_training_data()
+    folds = list(KFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE).split(X))
+    fit = Memory(cache_dir, verbose=0).cache(_fit_fold) if cache_dir else _fit_fold
+
+    t0 = time.perf_counter()
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_eval_fold)(key, i, X, y, train_idx, test_idx, fit)
+        for key in keys
+        for i, (train_idx, test_idx) in enumerate(folds))
+    wall = time.perf_counter() - t0
+    return summarize(pd.DataFrame(rows)), wall
+
+
+def summarize(folds):
+    g = folds.groupby("key", sort=False)
+    out = pd.DataFrame({
+        "Modelo": [MODEL_NAMES[k] for k in g.groups],
+        "R2_mean": g["r2"].mean().to_numpy(),
+        "R2_std": g["r2"].std().to_numpy(),
+        "RMSE_mean": g["rmse"].mean().to_numpy(),
+        "RMSE_std": g["rmse"].std().to_numpy(),
+        "Fit_s": g["fit_seconds"].mean().to_numpy(),
+        "Fit_en_cache": g["fit_cached"].any().to_numpy(),
+        "Predict_filas_s": (g["n_test"].sum() / g["predict_seconds"].sum()).to_numpy(),
+    })
+    return out
+
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
+
+
+# Tabla markdown con el mismo formato que la página (mejor modelo en negrita; el
+# tiempo de ajuste lleva * si algún pliegue se leyó de la caché)
+def results_markdown(results):
+    best = results["R2_mean"].idxmax()
+    lines = [
+        "| Modelo | R² (mean) | RMSE (mean) | Ajuste (s/pliegue) | Predicción (filas/s) |",
+        "|:------:|:-------------:|:---------------:|:---------------:|:---------------:|"]
+    for i, r in results.iterrows():
+        celdas = [r["Modelo"], f"{r['R2_mean']:.3f}", f"{r['RMSE_mean']:.3f}", f"{r['Fit_s']:.2f}" + ("\\*" if r.get("Fit_en_cache", False) else ""), f"{r['Predict_filas_s']:,.0f}"]
+        if i == best:
+            celdas = [f"**{c}**" for c in celdas]
+        lines.append("| " + " | ".join(celdas) + " |")
+    return "\n".join(lines)
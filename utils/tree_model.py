@@ -0,0 +1,178 @@
+#Librerías (solo NumPy: este módulo no importa xgboost, sklearn ni pandas)
+import numpy as np
+
+
+# Ensamble de árboles de regresión aplanado en arrays de nodos. Reproduce la
+# predicción de un booster de XGBoost (objetivo reg:squarederror) recorriendo
+# todos los árboles a la vez para un bloque de filas.
+class TreeEnsemble:
+    def __init__(self, left, right, feature, threshold, default_left, value, roots,
+                 base_score, features=(), signature="", max_depth=None, block_rows=4096, mean=None):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.base_score = float(base_score)
+        self.features = list(features)
+        self.signature = signature
+        self.block_rows = block_rows
+        # Valor medio de cada nodo (hojas del subárbol ponderadas por su cobertura);
+        # solo hace falta para las contribuciones
+        self.mean = mean
+        self.max_depth = max_depth if max_depth is not None else self._depth()
+
+    def _depth(self):
+        depth = np.zeros(len(self.left), dtype=np.int32)
+        # Los hijos siempre tienen un índice mayor que el padre dentro de cada árbol
+        for node in range(len(self.left)):
+            if self.left[node] >= 0:
+                depth[self.left[node]] = depth[node] + 1
+                depth[self.right[node]] = depth[node] + 1
+        return int(depth.max())
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self.left, self.right, self.feature, self.threshold,
+            self.default_left, self.value, self.roots))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_features(self):
+        return len(self.features) or int(self.feature.max()) + 1
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["left"], data["right"], data["feature"], data["threshold"],
+                data["default_left"], data["value"], data["roots"],
+                float(data["base_score"]), [str(f) for f in data["features"]],
+                str(data["signature"]), int(data["max_depth"]),
+                mean=data["mean"] if "mean" in data.files else None)
+
+    def save(self, path):
+        extra = {} if self.mean is None else {"mean": self.mean}
+        np.savez(
+            path, left=self.left, right=self.right, feature=self.feature,
+            threshold=self.threshold, default_left=self.default_left, value=self.value,
+            roots=self.roots, base_score=np.float64(self.base_score),
+            features=np.array(self.features), signature=np.array(self.signature),
+            max_depth=np.int32(self.max_depth), **extra)
+
+    def _predict_block(self, X):
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            hoja = left < 0
+            if hoja.all():
+                break
+            x = X[rows, self.feature[node]]
+            ir_izq = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            nuevo = np.where(ir_izq, left, self.right[node])
+            node = np.where(hoja, node, nuevo)
+        return self.value[node].sum(axis=1, dtype=np.float64) + self.base_score
+
+    # Contribuciones de Saabas de un bloque: en cada paso del camino de decisión
+    # la variable del nodo recibe la diferencia entre el valor medio del hijo y el
+    # del padre. Es una aproximación de TreeSHAP (coincide con pred_contribs con
+    # approx_contribs=True en XGBoost, no con el pred_contribs exacto)
+    def _contributions_block(self, X):
+        n, n_features = X.shape[0], self.n_features
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        contribs = np.zeros(n * n_features, dtype=np.float64)
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            hoja = left < 0
+            if hoja.all():
+                break
+            feature = self.feature[node]
+            x = X[rows, feature]
+            ir_izq = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            nuevo = np.where(hoja, node, np.where(ir_izq, left, self.right[node]))
+            delta = self.mean[nuevo] - self.mean[node]
+            contribs += np.bincount((rows * n_features + feature).ravel(), weights=delta.ravel(),
+                                    minlength=n * n_features)
+            node = nuevo
+        return contribs.reshape(n, n_features)
+
+    # Contribuciones de Saabas por variable (n, variables) en log-precio y el
+    # valor base; su suma reproduce la predicción
+    def contributions(self, X):
+        if self.mean is None:
+            raise ValueError(
+                "El modelo compacto no incluye los valores medios de los nodos; "
+                "vuelve a exportarlo con python -m scripts.export_model.")
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty((X.shape[0], self.n_features), dtype=np.float64)
+        for start in range(0, X.shape[0], self.block_rows):
+            stop = start + self.block_rows
+            out[start:stop] = self._contributions_block(X[start:stop])
+        bias = self.base_score + float(self.mean[self.roots].sum())
+        return out, np.full(X.shape[0], bias)
+
+    # Misma interfaz que Booster.inplace_predict
+    def inplace_predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty(X.shape[0], dtype=np.float32)
+        for start in range(0, X.shape[0], self.block_rows):
+            stop = start + self.block_rows
+            out[start:stop] = self._predict_block(X[start:stop])
+        return out
+
+
+# Exportación desde un booster de XGBoost (requiere xgboost solo en este paso)
+def from_booster(booster, features=(), signature=""):
+    import json
+
+    model = json.loads(booster.save_raw("json"))
+    learner = model["learner"]
+    if learner["objective"]["name"] != "reg:squarederror":
+        raise ValueError("Solo se admiten modelos con objetivo reg:squarederror")
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+    left, right, feature, threshold, default_left, value, mean, roots = [], [], [], [], [], [], [], []
+    offset = 0
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        if any(tree["split_type"]):
+            raise ValueError("No se admiten variables categóricas")
+        l = np.asarray(tree["left_children"], dtype=np.int32)
+        r = np.asarray(tree["right_children"], dtype=np.int32)
+        hoja = l < 0
+        conds = np.asarray(tree["split_conditions"], dtype=np.float32)
+        left.append(np.where(hoja, -1, l + offset))
+        right.append(np.where(hoja, -1, r + offset))
+        feature.append(np.where(hoja, 0, tree["split_indices"]).astype(np.int32))
+        threshold.append(np.where(hoja, 0, conds).astype(np.float32))
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+        # En las hojas split_conditions guarda el valor de la hoja
+        value.append(np.where(hoja, conds, 0).astype(np.float32))
+        # Valor medio de cada nodo ponderado por la cobertura (suma de hessianos);
+        # los hijos tienen índice mayor que el padre, así que basta un recorrido inverso
+        cover = np.asarray(tree["sum_hessian"], dtype=np.float64)
+        m = np.where(hoja, conds, 0).astype(np.float64)
+        for node in range(len(l) - 1, -1, -1):
+            if not hoja[node]:
+                m[node] = (cover[l[node]] * m[l[node]] + cover[r[node]] * m[r[node]]) / cover[node]
+        mean.append(m)
+        roots.append(offset)
+        offset += len(l)
+
+    return TreeEnsemble(
+        np.concatenate(left), np.concatenate(right), np.concatenate(feature),
+        np.concatenate(threshold), np.concatenate(default_left), np.concatenate(value),
+        np.asarray(roots, dtype=np.int32), base_score, features, signature,
+        mean=np.concatenate(mean))
@@ -0,0 +1,203 @@
+#Librerías
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.features import BIN_FEATURES, FEATURES, NUM_FEATURES
+from utils.training import RANDOM_STATE, load_training_data
+
+TUNING_DIR = os.path.join(".cache", "tuning")
+CHECKPOINT_PATH = os.path.join(TUNING_DIR, "estado.json")
+TUNED_MODEL_PATH = "modelo_xgb_tuned.pkl"
+
+EARLY_STOPPING = 50
+LATENCY_ROWS = 100_000
+
+# Espacio de búsqueda (muestreo aleatorio)
+SPACE = {
+    "max_depth": [4, 5, 6, 7, 8, 10],
+    "learning_rate": (0.02, 0.2),
+    "subsample": (0.6, 1.0),
+    "colsample_bytree": (0.6, 1.0),
+    "min_child_weight": [1, 2, 5, 10],
+    "reg_lambda": (0.1, 10.0),
+}
+
+
+def sample_configs(n, seed=RANDOM_STATE):
+    rng = np.random.default_rng(seed)
+    configs = []
+    for i in range(n):
+        configs.append({
+            "id": i,
+            "max_depth": int(rng.choice(SPACE["max_depth"])),
+            "learning_rate": float(np.exp(rng.uniform(*np.log(SPACE["learning_rate"])))),
+            "subsample": float(rng.uniform(*SPACE["subsample"])),
+            "colsample_bytree": float(rng.uniform(*SPACE["colsample_bytree"])),
+            "min_child_weight": int(rng.choice(SPACE["min_child_weight"])),
+            "reg_lambda": float(np.exp(rng.uniform(*np.log(SPACE["reg_lambda"])))),
+        })
+    return configs
+
+
+# Presupuestos (rondas de boosting) de cada escalón: min_rounds * eta^k
+def rung_budgets(min_rounds, max_rounds, eta):
+    n = int(math.floor(math.log(max_rounds / min_rounds, eta))) + 1
+    return [int(min_rounds * eta ** k) for k in range(n)]
+
+
+# Datos de entrenamiento/validación, una vez por proceso
+_data = {}
+
+
+def _get_data():
+    if "dtrain" not in _data:
+        import xgboost as xgb
+        from sklearn.model_selection import train_test_split
+        X, y = load_training_data()
+        X_tr, X_va, y_tr, y_va = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+        _data["dtrain"] = xgb.DMatrix(X_tr, label=y_tr)
+        _data["dvalid"] = xgb.DMatrix(X_va, label=y_va)
+        _data["X_valid"] = X_va
+    return _data
+
+
+def _params(config):
+    params = {k: v for k, v in config.items() if k != "id"}
+    params.update(objective="reg:squarederror", eval_metric="rmse", seed=RANDOM_STATE, nthread=1)
+    return params
+
+
+# Un ensayo: entrenar con early stopping hasta el presupuesto del escalón
+def run_trial(args):
+    import xgboost as xgb
+    config, budget = args
+    data = _get_data()
+    t0 = time.perf_counter()
+    booster = xgb.train(
+        _params(config), data["dtrain"], num_boost_round=budget,
+        evals=[(data["dvalid"], "valid")], early_stopping_rounds=EARLY_STOPPING,
+        verbose_eval=False)
+    return {
+        "id": config["id"],
+        "budget": budget,
+        "rmse": float(booster.best_score),
+        "best_iteration": int(booster.best_iteration) + 1,
+        "train_seconds": time.perf_counter() - t0,
+    }
+
+
+# Latencia de puntuación por lotes (µs por fila) con el número de árboles elegido
+def measure_latency(config, n_rounds, rows=LATENCY_ROWS):
+    import xgboost as xgb
+    data = _get_data()
+    booster = xgb.train(_params(config), data["dtrain"], num_boost_round=n_rounds)
+    X = data["X_valid"]
+    X = np.ascontiguousarray(np.resize(X, (rows, X.shape[1])))
+    booster.inplace_predict(X[:1000])
+    t0 = time.perf_counter()
+    booster.inplace_predict(X)
+    return (time.perf_counter() - t0) / rows * 1e6
+
+
+def _load_checkpoint(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+# Successive halving: todos los candidatos empiezan con pocas rondas y en cada
+# escalón sigue solo el mejor 1/eta con eta veces más presupuesto. Los resultados
+# se guardan tras cada ensayo para poder reanudar la búsqueda.
+def successive_halving(n_configs=27, min_rounds=100, max_rounds=2700, eta=3,
+                       workers=None, checkpoint=CHECKPOINT_PATH, log=print):
+    configs = {c["id"]: c for c in sample_configs(n_configs)}
+    state = _load_checkpoint(checkpoint)
+    if state.get("configs") != list(configs.values()):
+        state = {"configs": list(configs.values()), "trials": {}}
+
+    alive = list(configs)
+    budgets = rung_budgets(min_rounds, max_rounds, eta)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rung, budget in enumerate(budgets):
+            pending = [i for i in alive if f"{i}:{budget}" not in state["trials"]]
+            log(f"Escalón {rung}: {len(alive)} candidatos, {budget} rondas ({len(pending)} pendientes)")
+            for result in pool.map(run_trial, [(configs[i], budget) for i in pending]):
+                state["trials"][f"{result['id']}:{budget}"] = result
+                _save_checkpoint(checkpoint, state)
+
+            ranked = sorted(alive, key=lambda i: state["trials"][f"{i}:{budget}"]["rmse"])
+            if rung < len(budgets) - 1:
+                alive = ranked[:max(1, len(ranked) // eta)]
+
+    # Candidatos del frente: los que llegaron a los dos últimos escalones, cada uno
+    # con su resultado de mayor presupuesto
+    finalists = []
+    for i in configs:
+        trials = [state["trials"].get(f"{i}:{b}") for b in budgets[-2:]]
+        trials = [t for t in trials if t is not None]
+        if trials:
+            finalists.append(dict(trials[-1]))
+    for result in finalists:
+        key = f"latency:{result['id']}"
+        if key not in state:
+            state[key] = measure_latency(configs[result["id"]], result["best_iteration"])
+            _save_checkpoint(checkpoint, state)
+        result["latency_us"] = state[key]
+        result["config"] = configs[result["id"]]
+    return finalists, state
+
+
+# Frente de Pareto (menor RMSE y menor latencia)
+def pareto_front(results):
+    front = []
+    for r in results:
+        dominated = any(
+            o["rmse"] <= r["rmse"] and o["latency_us"] <= r["latency_us"] and
+            (o["rmse"] < r["rmse"] or o["latency_us"] < r["latency_us"])
+            for o in results)
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r["rmse"])
+
+
+# Del frente, el más rápido cuyo RMSE no empeora más de rmse_tolerance respecto al mejor
+def select_model(front, rmse_tolerance=0.01):
+    best = min(r["rmse"] for r in front)
+    ok = [r for r in front if r["rmse"] <= best * (1 + rmse_tolerance)]
+    return min(ok, key=lambda r: r["latency_us"])
+
+
+# Reentrena el elegido con todos los datos y lo guarda como pipeline de sklearn,
+# con el mismo formato que modelo_xgb_final.pkl (ColumnTransformer que deja pasar
+# numéricas y binarias y después el XGBRegressor)
+def fit_final(result, path=TUNED_MODEL_PATH):
+    import joblib
+    import pandas as pd
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from xgboost import XGBRegressor
+
+    X, y = load_training_data()
+    params = {k: v for k, v in result["config"].items() if k != "id"}
+    model = Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("num", "passthrough", NUM_FEATURES),
+            ("bin", "passthrough", BIN_FEATURES)])),
+        ("model", XGBRegressor(n_estimators=result["best_iteration"], random_state=RANDOM_STATE, **params))])
+    model.fit(pd.DataFrame(X, columns=FEATURES), y)
+    joblib.dump(model, path)
+    return model